@@ -0,0 +1,97 @@
+"""bench_components.py — Component assembly in dedup_vault.group_candidate_pairs.
+
+Usage:
+    python3 benchmarks/bench_components.py [--pairs 100000] [--skip-reference]
+
+Builds a synthetic pair list (clusters of related notes plus a few large
+clusters, as seen when the dedup threshold is lowered) and times grouping it
+into candidate groups. The reference is the previous assembly, which scanned
+the full pair list once per component and emitted every pair of a large
+component; its group count is printed for comparison.
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from scripts.dedup_vault import (  # noqa: E402
+    CandidateGroup,
+    VaultNote,
+    _find,
+    _union,
+    group_candidate_pairs,
+)
+
+
+def make_pairs(count: int) -> tuple[list[VaultNote], list[tuple[str, str, float]]]:
+    rng = random.Random(42)
+    notes: list[VaultNote] = []
+    pairs: list[tuple[str, str, float]] = []
+    while len(pairs) < count:
+        size = rng.choice([2, 2, 3, 4, 6, 10, 40]) if rng.random() < 0.98 else 400
+        titles = [f"note {len(notes) + i}" for i in range(size)]
+        notes.extend(VaultNote(Path(f"/tmp/{t}.md"), t, "", [], "atomic", "", 0) for t in titles)
+        edges = {(i - 1, i) for i in range(1, size)}           # keep the cluster connected
+        while len(edges) < min(size * (size - 1) // 2, size * 3):
+            i, j = sorted(rng.sample(range(size), 2))
+            edges.add((i, j))
+        pairs.extend((titles[i], titles[j], round(rng.uniform(0.5, 1.0), 3)) for i, j in sorted(edges))
+    rng.shuffle(pairs)
+    return notes, pairs[:count]
+
+
+def reference_groups(notes: list[VaultNote], pairs: list[tuple[str, str, float]]) -> list[CandidateGroup]:
+    all_titles = {p[0] for p in pairs} | {p[1] for p in pairs}
+    parent = {t: t for t in all_titles}
+    rank = {t: 0 for t in all_titles}
+    for a, b, _ in pairs:
+        _union(parent, rank, a, b)
+    components: dict[str, list[str]] = {}
+    for t in all_titles:
+        components.setdefault(_find(parent, t), []).append(t)
+
+    note_by_title = {n.title: n for n in notes}
+    groups: list[CandidateGroup] = []
+    for component_titles in components.values():
+        component_notes = [note_by_title[t] for t in component_titles if t in note_by_title]
+        component_pairs = [
+            (a, b, s) for a, b, s in pairs
+            if a in component_titles and b in component_titles
+        ]
+        if len(component_notes) <= 4:
+            groups.append(CandidateGroup(len(groups), component_notes, component_pairs))
+        else:
+            groups.extend(
+                CandidateGroup(len(groups) + k, [note_by_title[a], note_by_title[b]], [(a, b, s)])
+                for k, (a, b, s) in enumerate(component_pairs)
+            )
+    return groups
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark dedup candidate group assembly.")
+    parser.add_argument("--pairs", type=int, default=100_000)
+    parser.add_argument("--skip-reference", action="store_true")
+    args = parser.parse_args()
+
+    notes, pairs = make_pairs(args.pairs)
+    start = time.perf_counter()
+    groups = group_candidate_pairs(notes, pairs)
+    elapsed = time.perf_counter() - start
+    print(f"notes: {len(notes)}, pairs: {len(pairs)}")
+    print(f"bucketed:  {elapsed:8.2f}s  groups: {len(groups)}")
+    if args.skip_reference:
+        return
+
+    start = time.perf_counter()
+    reference = reference_groups(notes, pairs)
+    elapsed = time.perf_counter() - start
+    print(f"reference: {elapsed:8.2f}s  groups: {len(reference)}")
+
+
+if __name__ == "__main__":
+    main()
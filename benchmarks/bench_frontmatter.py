@@ -0,0 +1,63 @@
+"""bench_frontmatter.py — Micro-benchmark of frontmatter parsing paths.
+
+Usage:
+    python3 benchmarks/bench_frontmatter.py [--notes 5000]
+
+Compares the v1 fast path used by parse_frontmatter with yaml.safe_load (the
+previous implementation) and with the libyaml CSafeLoader fallback.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import yaml
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from scripts.generate_notes import render_note_md  # noqa: E402
+from scripts.vault_writer import _YAML_LOADER, parse_frontmatter  # noqa: E402
+
+
+def make_notes(count: int) -> list[str]:
+    return [
+        render_note_md({
+            "title": f"Note {i}",
+            "tags": ["tech/ai", f"domain/sub-{i % 7}", "productivity/pkm"][: 2 + i % 2],
+            "date": f"2026-0{1 + i % 9}-1{i % 10}",
+            "source_doc": f"Research {i % 13}: part.docx",
+            "note_type": "atomic" if i % 10 else "moc",
+            "body": "Body text. " * 50,
+        })
+        for i in range(count)
+    ]
+
+
+def time_it(label: str, fn, notes: list[str]) -> float:
+    start = time.perf_counter()
+    for content in notes:
+        fn(content)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<22} {elapsed * 1e6 / len(notes):8.2f} us/note")
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark frontmatter parsing.")
+    parser.add_argument("--notes", type=int, default=5000)
+    args = parser.parse_args()
+
+    notes = make_notes(args.notes)
+    baseline = time_it("yaml.safe_load", lambda c: yaml.safe_load(c.split("---", 2)[1]), notes)
+    time_it(
+        f"yaml {_YAML_LOADER.__name__}",
+        lambda c: yaml.load(c.split("---", 2)[1], Loader=_YAML_LOADER),
+        notes,
+    )
+    fast = time_it("v1 fast path", parse_frontmatter, notes)
+    print(f"speedup vs safe_load: {baseline / fast:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""bench_paragraphs.py — Indexed vs all-pairs paragraph dedup when merging notes.
+
+Usage:
+    python3 benchmarks/bench_paragraphs.py [--paragraphs 500]
+
+Builds two synthetic note bodies with the given number of paragraphs each,
+where roughly a third of the second body repeats or lightly edits paragraphs
+of the first, and times merge_unique_paragraphs against the quadratic
+reference that compares each paragraph with every kept one.
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from scripts.fix_similar_notes import merge_unique_paragraphs, paragraph_similarity  # noqa: E402
+
+LETTERS = "abcdefghijklmnopqrstuvwxyzабвгдежзиклмнопрстуфхцчшщыэюя"
+
+
+def make_words(rng: random.Random, count: int) -> list[str]:
+    return ["".join(rng.choices(LETTERS, k=rng.randint(2, 9))) for _ in range(count)]
+
+
+def make_bodies(count: int) -> tuple[str, str]:
+    rng = random.Random(42)
+    vocabulary = make_words(rng, 3000)
+    # Zipf-like word frequencies, so paragraphs share common words as prose does
+    words = [word for rank, word in enumerate(vocabulary, 1) for _ in range(max(1, 300 // rank))]
+    first = [
+        " ".join(rng.choice(words) for _ in range(rng.randint(20, 80)))
+        for _ in range(count)
+    ]
+    second = []
+    for _ in range(count):
+        roll = rng.random()
+        if roll < 0.15:
+            second.append(rng.choice(first))
+        elif roll < 0.3:
+            text = rng.choice(first)
+            pos = rng.randrange(len(text))
+            second.append(text[:pos] + "edited" + text[pos + 3:])
+        else:
+            second.append(" ".join(rng.choice(words) for _ in range(rng.randint(20, 80))))
+    return "\n\n".join(first), "\n\n".join(second)
+
+
+def reference_merge(a_body: str, b_body: str) -> list[str]:
+    merged: list[str] = []
+    for paragraph in [*a_body.split("\n\n"), *b_body.split("\n\n")]:
+        text = paragraph.strip()
+        if text and not any(paragraph_similarity(text, existing) >= 0.9 for existing in merged):
+            merged.append(text)
+    return merged
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark paragraph dedup in note merges.")
+    parser.add_argument("--paragraphs", type=int, default=500)
+    parser.add_argument(
+        "--skip-reference", action="store_true",
+        help="Only time the indexed merge (the all-pairs run takes minutes at 500)",
+    )
+    args = parser.parse_args()
+
+    a_body, b_body = make_bodies(args.paragraphs)
+
+    start = time.perf_counter()
+    indexed = merge_unique_paragraphs(a_body, b_body)
+    indexed_time = time.perf_counter() - start
+    print(f"paragraphs: {2 * args.paragraphs}, kept: {len(indexed)}")
+    print(f"indexed:   {indexed_time:.3f}s")
+    if args.skip_reference:
+        return
+
+    start = time.perf_counter()
+    reference = reference_merge(a_body, b_body)
+    reference_time = time.perf_counter() - start
+    assert indexed == reference
+    print(f"all-pairs: {reference_time:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
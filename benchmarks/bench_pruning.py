@@ -0,0 +1,81 @@
+"""bench_pruning.py — How many SequenceMatcher.ratio() calls the score bounds skip.
+
+Usage:
+    python3 benchmarks/bench_pruning.py [--notes 800]
+
+Scores every pair of a synthetic title corpus with the audit weights (0.7 title,
+0.3 tags) at several thresholds, counting pairs pruned by the length bound and
+by the character-multiset bound, and compares the runtime with always computing
+the full score. Candidate blocking is bypassed so every pair is visited.
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from scripts.audit_vault import NoteRecord  # noqa: E402
+from scripts.similarity import AUDIT_WEIGHTS, PruneStats, SimilarityCorpus  # noqa: E402
+
+WORDS = [
+    "agent", "memory", "prompt", "caching", "vault", "notes", "graph", "retrieval",
+    "evaluation", "tools", "инструменты", "агента", "память", "контекст", "модели",
+]
+TAGS = ["tech/ai", "tech/tools", "tech/llm", "productivity/pkm", "science/biology"]
+
+
+def make_notes(count: int) -> list[NoteRecord]:
+    rng = random.Random(42)
+    return [
+        NoteRecord(
+            path=Path(f"/tmp/{i}.md"),
+            title=" ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 6))),
+            note_type="atomic",
+            source_doc="",
+            frontmatter={},
+            body="",
+            tags=set(rng.sample(TAGS, rng.randint(0, 3))),
+            links=set(),
+        )
+        for i in range(count)
+    ]
+
+
+def run(corpus: SimilarityCorpus, threshold: float, bounded: bool) -> tuple[float, int, PruneStats]:
+    stats = PruneStats()
+    kept = 0
+    start = time.perf_counter()
+    for i in range(len(corpus)):
+        for j in range(i + 1, len(corpus)):
+            if bounded:
+                kept += corpus.score_at_least(i, j, threshold, stats=stats) is not None
+            else:
+                kept += corpus.score(i, j) >= threshold
+    return time.perf_counter() - start, kept, stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark threshold-aware similarity pruning.")
+    parser.add_argument("--notes", type=int, default=800)
+    args = parser.parse_args()
+
+    corpus = SimilarityCorpus.from_notes(make_notes(args.notes), AUDIT_WEIGHTS)
+    print(
+        f"{'threshold':>9} {'pairs':>9} {'length':>8} {'quick':>8} {'pruned':>7} "
+        f"{'full':>9} {'bounded':>9}"
+    )
+    for threshold in (0.5, 0.6, 0.72, 0.85):
+        full_time, full_kept, _ = run(corpus, threshold, bounded=False)
+        bounded_time, bounded_kept, stats = run(corpus, threshold, bounded=True)
+        assert bounded_kept == full_kept
+        print(
+            f"{threshold:>9.2f} {stats.total:>9} {stats.length:>8} {stats.quick:>8} "
+            f"{stats.pruned / stats.total:>6.1%} {full_time:>8.2f}s {bounded_time:>8.2f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""bench_walk.py — Compare Path.rglob + SKIP_DIRS filtering with the pruning walker.
+
+Usage:
+    python3 benchmarks/bench_walk.py [--notes 2000] [--git-files 50000] [--repeat 3]
+
+Builds a throwaway vault in a temp directory with a large .git tree and reports the
+best-of-N wall time for both strategies.
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from scripts.scan_vault import SKIP_DIRS, iter_vault_files  # noqa: E402
+
+
+def build_vault(root: Path, notes: int, git_files: int) -> None:
+    for i in range(notes):
+        folder = root / f"Folder {i % 20}"
+        folder.mkdir(exist_ok=True)
+        (folder / f"Note {i}.md").write_text("body\n", encoding="utf-8")
+    objects = root / ".git" / "objects"
+    for i in range(git_files):
+        bucket = objects / f"{i % 256:02x}"
+        bucket.mkdir(parents=True, exist_ok=True)
+        # A few .md files inside .git make the post-filter do real work too
+        suffix = ".md" if i % 50 == 0 else ""
+        (bucket / f"{i:038x}{suffix}").write_bytes(b"")
+
+
+def walk_rglob(root: Path) -> int:
+    count = 0
+    for md_file in root.rglob("*.md"):
+        if any(part in SKIP_DIRS for part in md_file.relative_to(root).parts):
+            continue
+        count += 1
+    return count
+
+
+def walk_scandir(root: Path) -> int:
+    return sum(1 for _ in iter_vault_files(root))
+
+
+def best_of(fn, root: Path, repeat: int) -> tuple[float, int]:
+    best = float("inf")
+    result = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(root)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark vault directory walkers.")
+    parser.add_argument("--notes", type=int, default=2000)
+    parser.add_argument("--git-files", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="bench-walk-") as tmp:
+        root = Path(tmp)
+        build_vault(root, args.notes, args.git_files)
+        rglob_time, rglob_count = best_of(walk_rglob, root, args.repeat)
+        scandir_time, scandir_count = best_of(walk_scandir, root, args.repeat)
+
+    assert rglob_count == scandir_count == args.notes
+    print(f"notes={args.notes} git_files={args.git_files}")
+    print(f"rglob + filter : {rglob_time * 1000:8.1f} ms")
+    print(f"pruning walker : {scandir_time * 1000:8.1f} ms")
+    print(f"speedup        : {rglob_time / scandir_time:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,11 +10,11 @@ from pathlib import Path
 try:
     from scripts.audit_vault import parse_note
     from scripts.config import load_config
-    from scripts.scan_vault import SKIP_DIRS
+    from scripts.vault_index import load_indexed_notes
 except ModuleNotFoundError:
     from audit_vault import parse_note
     from config import load_config
-    from scan_vault import SKIP_DIRS
+    from vault_index import load_indexed_notes
 
 
 def should_archive_empty_note(path: Path) -> bool:
@@ -57,10 +57,11 @@ def main() -> None:
     vault_path = Path(config["vault"]["vault_path"])
     candidates = []
     stamp = date.today().isoformat()
-    for note_path in vault_path.rglob("*.md"):
-        rel = note_path.relative_to(vault_path)
-        if any(part in SKIP_DIRS for part in rel.parts):
+    for note in load_indexed_notes(vault_path, with_body=False):
+        # Cheap index pre-filter; the file itself is re-checked before archiving
+        if note.word_count or note.frontmatter:
             continue
+        note_path = note.path
         if not should_archive_empty_note(note_path):
             continue
         destination = archive_destination(vault_path, note_path, stamp=stamp)
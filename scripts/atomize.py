@@ -2,6 +2,8 @@
 
 Usage:
     python3 scripts/atomize.py <parsed.json> [-o atom-plan.json] [--dry-run]
+                               [--no-cache | --refresh]
+                               [--chunk-tokens N [--parallel N]] [--persistent-backend]
 """
 
 import json
@@ -9,15 +11,36 @@ import yaml
 import sys
 import argparse
 import re
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from difflib import get_close_matches
 from pathlib import Path
 from datetime import date
 
 try:
-    from scripts.config import PROJECT_ROOT, load_config
-    from scripts.rewrite_backend import call_rewriter
+    from scripts.config import PROJECT_ROOT, load_config, response_cache_dir, telemetry_path
+    from scripts.json_stream import JsonStream
+    from scripts.rewrite_backend import (
+        BackendPool,
+        ResponseCache,
+        call_rewriter,
+        continuation_stats,
+        estimate_tokens,
+        get_backend_pool,
+    )
+    from scripts.telemetry import telemetry
 except ModuleNotFoundError:
-    from config import PROJECT_ROOT, load_config
-    from rewrite_backend import call_rewriter
+    from config import PROJECT_ROOT, load_config, response_cache_dir, telemetry_path
+    from json_stream import JsonStream
+    from rewrite_backend import (
+        BackendPool,
+        ResponseCache,
+        call_rewriter,
+        continuation_stats,
+        estimate_tokens,
+        get_backend_pool,
+    )
+    from telemetry import telemetry
 
 REQUIRED_ATOM_FIELDS = {
     "id",
@@ -33,6 +56,8 @@ OPTIONAL_ATOM_FIELDS_DEFAULTS = {
     "proposed_new_tags": [],
 }
 VALID_NOTE_TYPES = {"atomic", "moc", "source"}
+# Smallest section budget per chunk once the fixed prompt is subtracted
+MIN_CHUNK_SECTION_TOKENS = 256
 
 
 # ── File loaders ───────────────────────────────────────────────────────────────
@@ -76,8 +101,14 @@ def assemble_prompt(
     skill_md: str,
     atomization_rules: str,
     taxonomy_rules: str,
+    *,
+    extra_instructions: str | None = None,
 ) -> str:
-    """Build the complete prompt for Claude."""
+    """Build the complete prompt for Claude.
+
+    extra_instructions, if given, are placed right before the final
+    instruction (used to describe a chunk of a larger document).
+    """
     lines: list[str] = []
 
     # SKILL.md content (master instructions)
@@ -111,6 +142,10 @@ def assemble_prompt(
     lines.append(json.dumps(parsed_json, ensure_ascii=False, indent=2))
     lines.append("```")
 
+    if extra_instructions:
+        lines.append("")
+        lines.append(extra_instructions)
+
     # Final instruction
     lines.append("")
     lines.append(
@@ -120,55 +155,6 @@ def assemble_prompt(
     return "\n".join(lines)
 
 
-# ── Rewrite backend invocation ────────────────────────────────────────────────
-
-
-def _repair_truncated_json(text: str) -> dict | None:
-    """Attempt to close unclosed JSON structures and parse.
-
-    Returns parsed dict on success, None on failure.
-    """
-    # Strip trailing comma or incomplete tokens
-    repaired = text.rstrip()
-    # Remove trailing comma
-    while repaired and repaired[-1] in (",", ":", " ", "\n", "\r", "\t"):
-        repaired = repaired[:-1]
-
-    # Close open brackets/braces
-    stack: list[str] = []
-    in_str = False
-    escape = False
-    for ch in repaired:
-        if escape:
-            escape = False
-            continue
-        if ch == "\\":
-            escape = True
-            continue
-        if ch == '"':
-            in_str = not in_str
-            continue
-        if in_str:
-            continue
-        if ch in ("{", "["):
-            stack.append("}" if ch == "{" else "]")
-        elif ch in ("}", "]"):
-            if stack:
-                stack.pop()
-
-    # Close unterminated string
-    if in_str:
-        repaired += '"'
-
-    # Append closing chars in reverse order
-    repaired += "".join(reversed(stack))
-
-    try:
-        return json.loads(repaired)
-    except json.JSONDecodeError:
-        return None
-
-
 # ── JSON extraction ────────────────────────────────────────────────────────────
 
 
@@ -192,8 +178,10 @@ def extract_json(response: str) -> dict:
         return json.loads(text)
     except json.JSONDecodeError as e:
         # Attempt structural repair before giving up
-        repaired = _repair_truncated_json(text)
-        if repaired is not None:
+        stream = JsonStream()
+        stream.feed(text)
+        repaired = stream.repaired()
+        if isinstance(repaired, dict):
             print(
                 "WARNING: JSON was malformed; auto-repaired truncated structure.",
                 file=sys.stderr,
@@ -208,6 +196,43 @@ def extract_json(response: str) -> dict:
 # ── Validation ─────────────────────────────────────────────────────────────────
 
 
+def validate_atom_note(note: dict, index: int) -> list[str]:
+    """Validate one notes[] entry on its own. Returns list of error strings."""
+    errors: list[str] = []
+    note_id = note.get("id", f"<note[{index}]>")
+
+    # Check required fields
+    missing = REQUIRED_ATOM_FIELDS - set(note.keys())
+    if missing:
+        errors.append(
+            f"Note '{note_id}' missing fields: {sorted(missing)}"
+        )
+
+    # Check note_type validity
+    note_type = note.get("note_type")
+    if note_type not in VALID_NOTE_TYPES:
+        errors.append(
+            f"Note '{note_id}' has invalid note_type '{note_type}'; "
+            f"must be one of {sorted(VALID_NOTE_TYPES)}"
+        )
+
+    # Check tag count
+    tags = note.get("tags", [])
+    if not (2 <= len(tags) <= 5):
+        errors.append(
+            f"Note '{note_id}' has {len(tags)} tags; must be 2–5"
+        )
+
+    return errors
+
+
+def report_streamed_note(note: dict, index: int) -> None:
+    """Print a progress line, and any per-note errors, as notes[index] streams in."""
+    print(f"  Received note '{note.get('id', '?')}': {note.get('title', '')}", file=sys.stderr)
+    for err in validate_atom_note(note, index):
+        print(f"  WARNING: {err}", file=sys.stderr)
+
+
 def validate_atom_plan(plan: dict) -> list[str]:
     """Validate the atom plan structure. Returns list of error strings."""
     errors: list[str] = []
@@ -222,31 +247,10 @@ def validate_atom_plan(plan: dict) -> list[str]:
 
     for i, note in enumerate(notes):
         note_id = note.get("id", f"<note[{i}]>")
-
-        # Check required fields
-        missing = REQUIRED_ATOM_FIELDS - set(note.keys())
-        if missing:
-            errors.append(
-                f"Note '{note_id}' missing fields: {sorted(missing)}"
-            )
-
-        # Check note_type validity
-        note_type = note.get("note_type")
-        if note_type not in VALID_NOTE_TYPES:
-            errors.append(
-                f"Note '{note_id}' has invalid note_type '{note_type}'; "
-                f"must be one of {sorted(VALID_NOTE_TYPES)}"
-            )
-
-        # Check tag count
-        tags = note.get("tags", [])
-        if not (2 <= len(tags) <= 5):
-            errors.append(
-                f"Note '{note_id}' has {len(tags)} tags; must be 2–5"
-            )
+        errors.extend(validate_atom_note(note, i))
 
         # Count MOCs
-        if note_type == "moc":
+        if note.get("note_type") == "moc":
             moc_count += 1
 
         # Check ID uniqueness
@@ -302,6 +306,305 @@ def validate_wikilinks(plan: dict) -> list[str]:
     return errors
 
 
+# ── Chunked atomization ───────────────────────────────────────────────────────
+
+WIKILINK_RE = re.compile(r"\[\[([^\]|#]+)((?:#[^\]|]*)?(?:\|[^\]]*)?)\]\]")
+
+
+def _heading_blocks(sections: list[dict], level: int) -> list[list[dict]]:
+    """Group sections into blocks that each start at a heading of <= level.
+
+    Sections before the first such heading (e.g. a pre-heading level-0
+    section) stay with the first block.
+    """
+    blocks: list[list[dict]] = []
+    for section in sections:
+        starts = section.get("heading") and 0 < section.get("level", 0) <= level
+        if starts or not blocks:
+            blocks.append([section])
+        else:
+            blocks[-1].append(section)
+    return blocks
+
+
+def split_sections(sections: list[dict], token_budget: int, level: int = 1) -> list[list[dict]]:
+    """Split sections into chunks at top-level headings within token_budget.
+
+    Consecutive top-level blocks are packed greedily into one chunk while they
+    fit the budget. A block that alone exceeds the budget is split at its next
+    heading level; a block with no deeper headings becomes its own chunk.
+    """
+    def cost(block: list[dict]) -> int:
+        return sum(estimate_tokens(json.dumps(s, ensure_ascii=False)) for s in block)
+
+    chunks: list[list[dict]] = []
+    current: list[dict] = []
+    current_cost = 0
+    for block in _heading_blocks(sections, level):
+        block_cost = cost(block)
+        if block_cost > token_budget:
+            deeper = any(s.get("level", 0) > level for s in block)
+            if current:
+                chunks.append(current)
+                current, current_cost = [], 0
+            if deeper and level < 6:
+                chunks.extend(split_sections(block, token_budget, level + 1))
+            else:
+                chunks.append(block)
+            continue
+        if current and current_cost + block_cost > token_budget:
+            chunks.append(current)
+            current, current_cost = [], 0
+        current.extend(block)
+        current_cost += block_cost
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def chunk_instructions(index: int, count: int, outline: list[str]) -> str:
+    """Describe one chunk of a larger document to the rewrite backend."""
+    lines = [
+        "## Chunk Context",
+        "",
+        f"The document above is part {index + 1} of {count} of a larger document; "
+        "other parts are processed separately.",
+        "Create atomic notes only for the content of this part. Still output exactly one "
+        "MOC, covering only this part's headings — it will be merged into the document MOC.",
+        f'Prefix every note id with "c{index + 1}-" so ids stay unique across parts.',
+        "Top-level headings of the whole document, for orientation:",
+    ]
+    lines.extend(f"- {heading}" for heading in outline)
+    return "\n".join(lines)
+
+
+def moc_title(source_file: str) -> str:
+    """MOC title per taxonomy rules: cleaned document name, at most 60 characters."""
+    title = Path(source_file).stem.replace(":", " ")
+    title = re.sub(r"\s+", " ", title).strip()
+    return title[:60].rstrip()
+
+
+def _normalize_title(title: str) -> str:
+    return re.sub(r"[^\w]+", " ", title.casefold()).strip()
+
+
+def resolve_wikilinks(notes: list[dict]) -> int:
+    """Point wikilinks at the exact titles of notes in the plan; return links changed.
+
+    Links whose target differs from a plan title only in case or punctuation
+    are rewritten; otherwise the closest title (difflib, cutoff 0.85) is used.
+    Unmatched links are left for validate_wikilinks to report.
+    """
+    titles = [note.get("title", "") for note in notes]
+    exact = set(titles)
+    by_normalized = {_normalize_title(title): title for title in titles}
+    normalized_titles = list(by_normalized)
+    changed = 0
+
+    def replace(match: re.Match) -> str:
+        nonlocal changed
+        target = match.group(1).strip()
+        if target in exact:
+            return match.group(0)
+        normalized = _normalize_title(target)
+        resolved = by_normalized.get(normalized)
+        if resolved is None:
+            close = get_close_matches(normalized, normalized_titles, n=1, cutoff=0.85)
+            resolved = by_normalized[close[0]] if close else None
+        if resolved is None:
+            return match.group(0)
+        changed += 1
+        return f"[[{resolved}{match.group(2)}]]"
+
+    for note in notes:
+        note["body"] = WIKILINK_RE.sub(replace, note.get("body", ""))
+    return changed
+
+
+def _retarget_links(text: str, renames: dict[str, str]) -> str:
+    """Rewrite [[old]] links (keeping #heading and |alias) per renames."""
+    def replace(match: re.Match) -> str:
+        target = match.group(1).strip()
+        if target not in renames:
+            return match.group(0)
+        return f"[[{renames[target]}{match.group(2)}]]"
+
+    return WIKILINK_RE.sub(replace, text)
+
+
+def stitch_atom_plans(chunk_plans: list[dict], source_file: str) -> dict:
+    """Merge per-chunk atom plans into one plan with a single MOC.
+
+    Atomic notes keep chunk order; duplicate ids get a numeric suffix. A title
+    an earlier chunk already used (ignoring case, as note files would collide)
+    becomes "Title (2)", and links inside its own chunk follow it. The
+    chunk MOCs' bodies (minus their H1 lines) are concatenated under one MOC
+    titled after the source document, tagged with the most common MOC tags.
+    A chunk without a MOC contributes a plain list of links to its notes.
+    Cross-chunk wikilinks are then resolved against the merged titles.
+    """
+    notes: list[dict] = []
+    seen_ids: set[str] = set()
+    seen_titles: set[str] = set()
+    moc_parts: list[str] = []
+    moc_tags: Counter = Counter()
+    note_tags: Counter = Counter()
+    proposed: list[dict] = []
+    plan_date = ""
+
+    for plan in chunk_plans:
+        chunk_notes = plan.get("notes", [])
+        mocs = [n for n in chunk_notes if n.get("note_type") == "moc"]
+        atoms = [n for n in chunk_notes if n.get("note_type") != "moc"]
+
+        earlier = set(seen_titles)
+        renames: dict[str, str] = {}
+        titled: list[dict] = []
+        for note in atoms:
+            title = str(note.get("title", ""))
+            unique_title, suffix = title, 2
+            while unique_title.casefold() in seen_titles:
+                unique_title, suffix = f"{title} ({suffix})", suffix + 1
+            seen_titles.add(unique_title.casefold())
+            if title.casefold() in earlier:
+                renames.setdefault(title, unique_title)
+            titled.append({**note, "title": unique_title} if unique_title != title else note)
+        atoms = titled
+        if renames:
+            atoms = [{**n, "body": _retarget_links(n.get("body", ""), renames)} for n in atoms]
+            mocs = [{**n, "body": _retarget_links(n.get("body", ""), renames)} for n in mocs]
+
+        for note in atoms:
+            note_id = str(note.get("id", f"note-{len(notes) + 1}"))
+            unique_id, suffix = note_id, 2
+            while unique_id in seen_ids:
+                unique_id, suffix = f"{note_id}-{suffix}", suffix + 1
+            seen_ids.add(unique_id)
+            notes.append({**note, "id": unique_id})
+            note_tags.update(note.get("tags", []))
+            plan_date = plan_date or note.get("date", "")
+
+        if mocs:
+            for moc in mocs:
+                body = "\n".join(
+                    line for line in moc.get("body", "").splitlines() if not line.startswith("# ")
+                ).strip()
+                if body:
+                    moc_parts.append(body)
+                moc_tags.update(moc.get("tags", []))
+        elif atoms:
+            moc_parts.append("\n".join(f"- [[{n.get('title', '')}]]" for n in atoms))
+
+        for entry in plan.get("proposed_tags", []):
+            if entry not in proposed:
+                proposed.append(entry)
+
+    tags = [tag for tag, _ in moc_tags.most_common(5)]
+    for tag, _ in note_tags.most_common():
+        if len(tags) >= 2:
+            break
+        if tag not in tags:
+            tags.append(tag)
+
+    moc_id = "moc"
+    while moc_id in seen_ids:
+        moc_id += "-doc"
+    notes.append({
+        "id": moc_id,
+        "title": moc_title(source_file),
+        "note_type": "moc",
+        "tags": tags,
+        "source_doc": source_file,
+        "date": plan_date or date.today().isoformat(),
+        "body": "\n\n".join(moc_parts),
+        "proposed_new_tags": [],
+    })
+    resolve_wikilinks(notes)
+
+    stitched: dict = {"source_file": source_file, "notes": notes}
+    if proposed:
+        stitched["proposed_tags"] = proposed
+    return stitched
+
+
+def chunk_prompts(
+    parsed_json: dict,
+    tags: list[str],
+    skill_md: str,
+    atomization_rules: str,
+    taxonomy_rules: str,
+    *,
+    token_budget: int,
+) -> list[str]:
+    """One prompt per split_sections chunk, each told where it sits in the document.
+
+    token_budget is for the whole prompt; the fixed part (skill, rules, tags,
+    chunk context) is subtracted before sections are split. Raises ValueError
+    when that leaves fewer than MIN_CHUNK_SECTION_TOKENS, which would otherwise
+    send every section as its own call.
+    """
+    sections = parsed_json.get("sections", [])
+    outline = [s["heading"] for s in sections if s.get("heading") and s.get("level") == 1]
+    overhead = estimate_tokens(assemble_prompt(
+        {**parsed_json, "sections": []}, tags, skill_md, atomization_rules, taxonomy_rules,
+        extra_instructions=chunk_instructions(0, 1, outline),
+    ))
+    room = token_budget - overhead
+    if room < MIN_CHUNK_SECTION_TOKENS:
+        raise ValueError(
+            f"--chunk-tokens {token_budget} leaves {room} tokens for sections after "
+            f"the {overhead}-token prompt overhead; use at least "
+            f"{overhead + MIN_CHUNK_SECTION_TOKENS}"
+        )
+    chunks = split_sections(sections, room)
+    return [
+        assemble_prompt(
+            {**parsed_json, "sections": chunk}, tags, skill_md, atomization_rules, taxonomy_rules,
+            extra_instructions=chunk_instructions(index, len(chunks), outline),
+        )
+        for index, chunk in enumerate(chunks)
+    ]
+
+
+def atomize_chunked(
+    prompts: list[str],
+    source_file: str,
+    *,
+    parallel: int = 1,
+    backend: str = "auto",
+    timeout_seconds: int = 300,
+    cache: ResponseCache | None = None,
+    backend_pool: BackendPool | None = None,
+) -> tuple[str, dict]:
+    """Run chunk prompts on up to `parallel` backend calls at once and stitch one plan.
+
+    Returns (backend, stitched plan). Raises RuntimeError/ValueError like
+    call_rewriter and extract_json. backend_pool is passed to call_rewriter.
+    """
+    def run(index: int) -> tuple[str, dict]:
+        print(
+            f"  Chunk {index + 1}/{len(prompts)}: ~{estimate_tokens(prompts[index])} prompt tokens",
+            file=sys.stderr,
+        )
+        resolved, raw = call_rewriter(
+            prompts[index],
+            backend=backend,
+            timeout_seconds=timeout_seconds,
+            project_root=PROJECT_ROOT,
+            cache=cache,
+            pool=backend_pool,
+            on_note=report_streamed_note,
+            call_site="atomize.chunk",
+        )
+        return resolved, extract_json(raw)
+
+    with ThreadPoolExecutor(max_workers=max(1, parallel)) as pool:
+        results = list(pool.map(run, range(len(prompts))))
+    resolved = results[0][0] if results else backend
+    return resolved, stitch_atom_plans([plan for _, plan in results], source_file)
+
+
 # ── Output ─────────────────────────────────────────────────────────────────────
 
 
@@ -379,6 +682,43 @@ def main() -> None:
         default=300,
         help="Timeout for each rewrite backend call (default: 300)",
     )
+    parser.add_argument(
+        "--chunk-tokens",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Split documents whose prompt exceeds ~N tokens at top-level headings and "
+        "atomize the chunks separately (default: 0, single prompt)",
+    )
+    parser.add_argument(
+        "--parallel",
+        type=int,
+        default=4,
+        metavar="N",
+        help="Chunks to atomize concurrently with --chunk-tokens (default: 4)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always call the rewrite backend; do not read or write the response cache",
+    )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Call the rewrite backend even on a cache hit and store the new response",
+    )
+    parser.add_argument(
+        "--persistent-backend",
+        action="store_true",
+        help="Pre-start Claude processes so chunks and continuations skip CLI startup; "
+        "each process still answers one prompt (claude backend only)",
+    )
+    parser.add_argument(
+        "--telemetry-summary",
+        action="store_true",
+        help="Print a per-call-site table of backend calls (latency, sizes, retries) "
+        "to stderr; calls are always logged to <staging_dir>/telemetry.jsonl",
+    )
     args = parser.parse_args()
 
     # Load parsed JSON input
@@ -391,40 +731,82 @@ def main() -> None:
     # Load config and derive staging dir
     config = load_config()
     staging_dir = Path(config.get("rclone", {}).get("staging_dir", "/tmp/dw/staging"))
+    telemetry.enable(telemetry_path(config))
 
     # Load supporting artifacts
     tags = load_tags()
     skill_md = load_skill_md()
     atomization_rules, taxonomy_rules = load_rules()
 
-    # Assemble prompt
+    # Assemble prompt(s): one, or one per chunk when the document exceeds --chunk-tokens
     prompt = assemble_prompt(parsed_json, tags, skill_md, atomization_rules, taxonomy_rules)
+    prompts = [prompt]
+    if args.chunk_tokens and estimate_tokens(prompt) > args.chunk_tokens:
+        try:
+            prompts = chunk_prompts(
+                parsed_json, tags, skill_md, atomization_rules, taxonomy_rules,
+                token_budget=args.chunk_tokens,
+            )
+        except ValueError as e:
+            print(f"ERROR: {e}", file=sys.stderr)
+            sys.exit(1)
 
-    # Dry-run: print prompt and exit
+    # Dry-run: print prompt(s) and exit
     if args.dry_run:
-        print(prompt)
+        print("\n\n".join(prompts))
         sys.exit(0)
 
     # Call rewrite backend
-    print("Calling rewrite backend...", file=sys.stderr)
-    try:
-        resolved_backend, raw_response = call_rewriter(
-            prompt,
-            backend=args.backend,
-            timeout_seconds=args.timeout_seconds,
-            project_root=PROJECT_ROOT,
+    cache = (
+        None if args.no_cache
+        else ResponseCache(response_cache_dir(config), refresh=args.refresh)
+    )
+    backend_pool = (
+        get_backend_pool(min(args.parallel, len(prompts))) if args.persistent_backend else None
+    )
+    if len(prompts) > 1:
+        print(
+            f"Calling rewrite backend on {len(prompts)} chunks (parallel={args.parallel})...",
+            file=sys.stderr,
         )
-    except RuntimeError as e:
-        print(f"ERROR: {e}", file=sys.stderr)
-        sys.exit(1)
-    print(f"Rewrite backend: {resolved_backend}", file=sys.stderr)
-
-    # Extract JSON from response
+    else:
+        print("Calling rewrite backend...", file=sys.stderr)
     try:
-        atom_plan = extract_json(raw_response)
-    except ValueError as e:
+        if len(prompts) > 1:
+            resolved_backend, atom_plan = atomize_chunked(
+                prompts,
+                parsed_json.get("source_file", input_path.name),
+                parallel=args.parallel,
+                backend=args.backend,
+                timeout_seconds=args.timeout_seconds,
+                cache=cache,
+                backend_pool=backend_pool,
+            )
+        else:
+            resolved_backend, raw_response = call_rewriter(
+                prompt,
+                backend=args.backend,
+                timeout_seconds=args.timeout_seconds,
+                project_root=PROJECT_ROOT,
+                cache=cache,
+                pool=backend_pool,
+                on_note=report_streamed_note,
+                call_site="atomize",
+            )
+            atom_plan = extract_json(raw_response)
+    except (RuntimeError, ValueError) as e:
         print(f"ERROR: {e}", file=sys.stderr)
         sys.exit(1)
+    finally:
+        if backend_pool is not None:
+            backend_pool.close()
+        if cache is not None:
+            print(cache.summary(), file=sys.stderr)
+        if args.telemetry_summary:
+            print(telemetry.summary(), file=sys.stderr)
+    print(f"Rewrite backend: {resolved_backend}", file=sys.stderr)
+    if continuation_stats.requested:
+        print(continuation_stats.summary(), file=sys.stderr)
 
     # Backfill optional fields with defaults (handles truncated responses)
     for note in atom_plan.get("notes", []):
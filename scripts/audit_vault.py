@@ -4,35 +4,33 @@ from __future__ import annotations
 
 import argparse
 import json
-import re
+import sys
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
 from dataclasses import dataclass
-from difflib import SequenceMatcher
 from pathlib import Path
 
 try:
-    import yaml
-except ModuleNotFoundError as exc:  # pragma: no cover
-    raise SystemExit(f"ERROR: Missing dependency: {exc}") from exc
-
-try:
-    from scripts.config import load_config
-    from scripts.scan_vault import SKIP_DIRS
+    from scripts.config import load_config, resolve_workers, use_parse_processes
+    from scripts.report_stream import JsonlWriter, TopN
+    from scripts.similarity import (
+        AUDIT_WEIGHTS, SimilarityCorpus, cached_pairs_above, tag_mask,
+    )
+    from scripts.vault_index import (
+        VaultIndex, extract_wikilink_targets, load_indexed_notes,
+    )
+    from scripts.vault_writer import parse_frontmatter
 except ModuleNotFoundError:
-    from config import load_config
-    from scan_vault import SKIP_DIRS
-
-
-WIKILINK_RE = re.compile(r"\[\[([^\]]+)\]\]")
-
-
-def extract_wikilink_targets(text: str) -> set[str]:
-    """Extract normalized wikilink targets, ignoring aliases and headings."""
-    targets: set[str] = set()
-    for raw in WIKILINK_RE.findall(text):
-        target = raw.split("|", 1)[0].split("#", 1)[0].strip()
-        if target:
-            targets.add(target)
-    return targets
+    from config import load_config, resolve_workers, use_parse_processes
+    from report_stream import JsonlWriter, TopN
+    from similarity import (
+        AUDIT_WEIGHTS, SimilarityCorpus, cached_pairs_above, tag_mask,
+    )
+    from vault_index import (
+        VaultIndex, extract_wikilink_targets, load_indexed_notes,
+    )
+    from vault_writer import parse_frontmatter
 
 
 @dataclass
@@ -63,10 +61,7 @@ def parse_note(path: Path) -> NoteRecord | None:
     if text.startswith("---"):
         parts = text.split("---", 2)
         if len(parts) >= 3:
-            try:
-                frontmatter = yaml.safe_load(parts[1]) or {}
-            except yaml.YAMLError:
-                frontmatter = {}
+            frontmatter = parse_frontmatter(text)
             body = parts[2].strip()
 
     title = path.stem
@@ -91,108 +86,268 @@ def parse_note(path: Path) -> NoteRecord | None:
     )
 
 
-def iter_notes(vault_path: Path) -> list[NoteRecord]:
-    """Load notes from the vault, excluding known system directories."""
+def iter_notes(
+    vault_path: Path,
+    *,
+    index_path: Path | None = None,
+    workers: int = 1,
+    use_processes: bool = False,
+) -> list[NoteRecord]:
+    """Load notes from the vault index, excluding known system directories.
+
+    Changed files are re-parsed in parallel when workers > 1; results are
+    ordered by relative path either way.
+    """
     records: list[NoteRecord] = []
-    for md_file in vault_path.rglob("*.md"):
-        rel = md_file.relative_to(vault_path)
-        if any(part in SKIP_DIRS for part in rel.parts):
-            continue
-        record = parse_note(md_file)
-        if record is not None:
-            records.append(record)
+    indexed = load_indexed_notes(
+        vault_path,
+        index_path=index_path,
+        workers=workers,
+        use_processes=use_processes,
+    )
+    for entry in indexed:
+        frontmatter = entry.frontmatter
+        records.append(
+            NoteRecord(
+                path=entry.path,
+                title=entry.title,
+                note_type=str(frontmatter.get("note_type", "")),
+                source_doc=str(frontmatter.get("source_doc", "")),
+                frontmatter=frontmatter,
+                body=entry.body,
+                tags=set(entry.tags),
+                links=set(entry.links),
+            )
+        )
     return records
 
 
 def score_similarity(a: NoteRecord, b: NoteRecord) -> float:
-    """Weighted title/tag similarity for duplicate-linking candidates."""
-    title_sim = SequenceMatcher(None, a.title.lower(), b.title.lower()).ratio()
-    union = a.tags | b.tags
-    tag_sim = len(a.tags & b.tags) / len(union) if union else 0.0
-    return 0.7 * title_sim + 0.3 * tag_sim
+    """Weighted title/tag similarity for duplicate-linking candidates.
 
+    Pair loops should build one SimilarityCorpus (AUDIT_WEIGHTS) instead of
+    calling this per pair.
+    """
+    return SimilarityCorpus.from_notes([a, b], AUDIT_WEIGHTS).score(0, 1)
 
-def audit_notes(
+
+# ── Pairwise scoring (serial or sharded across processes) ────────────────────
+
+# Below this many notes a process pool costs more than it saves.
+PARALLEL_MIN_NOTES = 400
+
+_shard_state: tuple[SimilarityCorpus, float] | None = None
+
+
+def _init_shard_worker(titles: list[str], masks: list[int], threshold: float) -> None:
+    global _shard_state
+    _shard_state = (SimilarityCorpus(titles, masks, AUDIT_WEIGHTS), threshold)
+
+
+def _score_shard(rows: tuple[int, int]) -> list[tuple[int, int, float]]:
+    corpus, threshold = _shard_state
+    return corpus.pairs_above(threshold, rows=range(*rows))
+
+
+def _shard_rows(count: int, shards: int) -> list[tuple[int, int]]:
+    """Split rows of the upper-triangular pair space into ranges of ~equal pair count."""
+    target = max(1, count * (count - 1) // 2 // shards)
+    bounds: list[tuple[int, int]] = []
+    start = pairs = 0
+    for row in range(count):
+        pairs += count - 1 - row
+        if pairs >= target:
+            bounds.append((start, row + 1))
+            start, pairs = row + 1, 0
+    if start < count:
+        bounds.append((start, count))
+    return bounds
+
+
+def score_pairs(
+    titles: list[str],
+    masks: list[int],
+    threshold: float,
+    *,
+    workers: int = 1,
+) -> list[tuple[int, int, float]]:
+    """Return (i, j, score) for all i < j with score_similarity >= threshold.
+
+    With workers > 1 (and enough notes), row ranges are scored in a process
+    pool. Workers receive only titles and tag masks; contiguous row shards are
+    concatenated in order, so the result matches the serial scan exactly.
+    """
+    return list(iter_score_pairs(titles, masks, threshold, workers=workers))
+
+
+def iter_score_pairs(
+    titles: list[str],
+    masks: list[int],
+    threshold: float,
+    *,
+    workers: int = 1,
+) -> Iterator[tuple[int, int, float]]:
+    """Generator form of score_pairs; the serial scan holds no pair list."""
+    if workers <= 1 or len(titles) < PARALLEL_MIN_NOTES:
+        yield from SimilarityCorpus(titles, masks, AUDIT_WEIGHTS).iter_pairs_above(threshold)
+        return
+
+    shards = _shard_rows(len(titles), workers * 4)
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_shard_worker,
+        initargs=(titles, masks, threshold),
+    ) as pool:
+        for shard in pool.map(_score_shard, shards):
+            yield from shard
+
+
+REPORT_SECTIONS = (
+    "empty_notes",
+    "thin_atomic_notes",
+    "atomic_notes_without_links",
+    "unlinked_similar_pairs",
+)
+
+
+def _pair_order(item: dict) -> tuple:
+    return (-item["score"], item["a"], item["b"])
+
+
+def iter_audit_records(
     notes: list[NoteRecord],
     *,
     min_words: int = 80,
     similarity_threshold: float = 0.72,
-) -> dict:
-    """Build a structured audit report."""
-    empty = [
-        {
-            "title": note.title,
-            "path": str(note.path),
-            "source_doc": note.source_doc,
-            "note_type": note.note_type,
-        }
-        for note in notes
-        if note.words == 0 and not note.frontmatter
-    ]
-
-    thin = [
-        {
-            "title": note.title,
-            "path": str(note.path),
-            "words": note.words,
-            "links": len(note.links),
-            "source_doc": note.source_doc,
-            "note_type": note.note_type,
-        }
-        for note in notes
-        if note.note_type == "atomic" and 0 < note.words < min_words
-    ]
-
-    no_links = [
-        {
-            "title": note.title,
-            "path": str(note.path),
-            "words": note.words,
-            "source_doc": note.source_doc,
-        }
-        for note in notes
-        if note.note_type == "atomic" and note.words >= min_words and not note.links
-    ]
+    workers: int = 1,
+    pair_cache: VaultIndex | None = None,
+) -> Iterator[tuple[str, dict]]:
+    """Yield (section, record) audit findings as they are produced.
+
+    Sections come in REPORT_SECTIONS order. Similar pairs are yielded in scan
+    order, not sorted; audit_notes sorts them for the full report.
+    """
+    for note in notes:
+        if note.words == 0 and not note.frontmatter:
+            yield "empty_notes", {
+                "title": note.title,
+                "path": str(note.path),
+                "source_doc": note.source_doc,
+                "note_type": note.note_type,
+            }
+
+    for note in notes:
+        if note.note_type == "atomic" and 0 < note.words < min_words:
+            yield "thin_atomic_notes", {
+                "title": note.title,
+                "path": str(note.path),
+                "words": note.words,
+                "links": len(note.links),
+                "source_doc": note.source_doc,
+                "note_type": note.note_type,
+            }
+
+    for note in notes:
+        if note.note_type == "atomic" and note.words >= min_words and not note.links:
+            yield "atomic_notes_without_links", {
+                "title": note.title,
+                "path": str(note.path),
+                "words": note.words,
+                "source_doc": note.source_doc,
+            }
 
-    similar_pairs: list[dict] = []
     atomic_notes = [note for note in notes if note.note_type != "moc"]
-    for i in range(len(atomic_notes)):
-        for j in range(i + 1, len(atomic_notes)):
-            a = atomic_notes[i]
-            b = atomic_notes[j]
-            score = score_similarity(a, b)
-            if score < similarity_threshold:
-                continue
-            linked = b.title in a.links or a.title in b.links
-            if linked:
-                continue
-            similar_pairs.append(
-                {
-                    "score": round(score, 3),
-                    "a": a.title,
-                    "a_path": str(a.path),
-                    "b": b.title,
-                    "b_path": str(b.path),
-                }
-            )
+    if pair_cache is not None:
+        corpus = SimilarityCorpus.from_notes(atomic_notes, AUDIT_WEIGHTS)
+        scored, cache_stats = cached_pairs_above(
+            corpus, similarity_threshold, pair_cache, workers=workers,
+        )
+        print(cache_stats.summary(), file=sys.stderr)
+    else:
+        scored = iter_score_pairs(
+            [note.title for note in atomic_notes],
+            [tag_mask(note.tags) for note in atomic_notes],
+            similarity_threshold,
+            workers=workers,
+        )
+    for i, j, score in scored:
+        a = atomic_notes[i]
+        b = atomic_notes[j]
+        linked = b.title in a.links or a.title in b.links
+        if linked:
+            continue
+        yield "unlinked_similar_pairs", {
+            "score": round(score, 3),
+            "a": a.title,
+            "a_path": str(a.path),
+            "b": b.title,
+            "b_path": str(b.path),
+        }
+
+
+def audit_notes(
+    notes: list[NoteRecord],
+    *,
+    min_words: int = 80,
+    similarity_threshold: float = 0.72,
+    workers: int = 1,
+    pair_cache: VaultIndex | None = None,
+) -> dict:
+    """Build a structured audit report.
+
+    workers > 1 scores candidate pairs in a process pool; with pair_cache,
+    scores persisted by earlier runs are reused and only pairs involving new or
+    changed notes are scored (in the pool, when workers > 1). The report is
+    identical in every mode.
+    """
+    sections: dict[str, list[dict]] = {name: [] for name in REPORT_SECTIONS}
+    for section, record in iter_audit_records(
+        notes,
+        min_words=min_words,
+        similarity_threshold=similarity_threshold,
+        workers=workers,
+        pair_cache=pair_cache,
+    ):
+        sections[section].append(record)
 
-    similar_pairs.sort(key=lambda item: (-item["score"], item["a"], item["b"]))
+    sections["unlinked_similar_pairs"].sort(key=_pair_order)
 
     return {
         "summary": {
             "total_notes": len(notes),
-            "empty_notes": len(empty),
-            "thin_atomic_notes": len(thin),
-            "atomic_notes_without_links": len(no_links),
-            "unlinked_similar_pairs": len(similar_pairs),
+            **{name: len(items) for name, items in sections.items()},
         },
-        "empty_notes": empty,
-        "thin_atomic_notes": thin,
-        "atomic_notes_without_links": no_links,
-        "unlinked_similar_pairs": similar_pairs,
+        **sections,
     }
 
 
+def stream_audit(
+    records: Iterable[tuple[str, dict]],
+    writer: JsonlWriter,
+    *,
+    total_notes: int,
+    limit: int,
+) -> dict:
+    """Write audit records as JSONL lines and return the trimmed stdout summary.
+
+    Each line is the record with a leading "section" key. Only the first
+    `limit` records per section and the `limit` best-scored pairs are kept in
+    memory, so the summary equals trimming the full report.
+    """
+    heads: dict[str, list[dict]] = {name: [] for name in REPORT_SECTIONS}
+    best_pairs = TopN(limit, key=_pair_order)
+    counts = dict.fromkeys(REPORT_SECTIONS, 0)
+    for section, record in records:
+        writer.write({"section": section, **record})
+        counts[section] += 1
+        if section == "unlinked_similar_pairs":
+            best_pairs.push(record)
+        elif len(heads[section]) < limit:
+            heads[section].append(record)
+    heads["unlinked_similar_pairs"] = best_pairs.items()
+    return {"summary": {"total_notes": total_notes, **counts}, **heads}
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(
         description="Audit vault quality issues: empty notes, thin atomic notes, and unlinked similar pairs."
@@ -211,7 +366,14 @@ def main() -> None:
     )
     parser.add_argument(
         "--output",
-        help="Optional JSON file path for the full audit report",
+        help="Optional file path for the full audit report (JSON, or JSONL with --format jsonl)",
+    )
+    parser.add_argument(
+        "--format",
+        choices=("json", "jsonl"),
+        default="json",
+        help="Report format: one JSON document (default) or JSONL records streamed as "
+        "they are found, to --output or else stdout (summary then goes to stderr)",
     )
     parser.add_argument(
         "--limit",
@@ -219,16 +381,49 @@ def main() -> None:
         default=25,
         help="Max items per section to print in stdout summary (default: 25)",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Parallel note loaders and pair-scoring processes (default: [performance] workers or 1)",
+    )
+    parser.add_argument(
+        "--no-pair-cache",
+        action="store_true",
+        help="Score every pair instead of reusing scores from the vault index",
+    )
     args = parser.parse_args()
 
     config = load_config(strict=True)
     vault_path = Path(config["vault"]["vault_path"])
-    notes = iter_notes(vault_path)
-    report = audit_notes(
-        notes,
-        min_words=args.min_words,
-        similarity_threshold=args.similarity_threshold,
+    workers = resolve_workers(config, args.workers)
+    notes = iter_notes(
+        vault_path,
+        workers=workers,
+        use_processes=use_parse_processes(config),
     )
+    options = {
+        "min_words": args.min_words,
+        "similarity_threshold": args.similarity_threshold,
+        "workers": workers,
+    }
+    with ExitStack() as stack:
+        if not args.no_pair_cache:
+            options["pair_cache"] = stack.enter_context(VaultIndex(vault_path))
+
+        if args.format == "jsonl":
+            writer = stack.enter_context(JsonlWriter(args.output))
+            trimmed = stream_audit(
+                iter_audit_records(notes, **options), writer,
+                total_notes=len(notes), limit=args.limit,
+            )
+        else:
+            report = audit_notes(notes, **options)
+
+    if args.format == "jsonl":
+        # The stream owns stdout when no --output file is given
+        out = sys.stderr if writer.to_stdout else sys.stdout
+        print(json.dumps(trimmed, ensure_ascii=False, indent=2), file=out)
+        return
 
     if args.output:
         output_path = Path(args.output)
@@ -0,0 +1,164 @@
+"""body_index.py — Local TF-IDF index over note bodies for related-note lookups.
+
+Term counts per note are stored in the vault index SQLite file and refreshed
+incrementally: only notes whose content hash changed since the last sync are
+re-tokenized. For queries the counts are loaded into an in-memory inverted
+index (term -> postings), and top-k cosine neighbours of a note are found by
+walking only the postings of that note's own terms. Everything is local; no
+network access or model downloads are involved.
+"""
+
+from __future__ import annotations
+
+import heapq
+import math
+import re
+from collections import Counter, defaultdict
+from pathlib import Path
+
+try:
+    from scripts.vault_index import VaultIndex
+except ModuleNotFoundError:
+    from vault_index import VaultIndex
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS body_docs (
+    rel_path TEXT PRIMARY KEY,
+    content_hash TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS body_terms (
+    rel_path TEXT NOT NULL,
+    term TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (rel_path, term)
+);
+"""
+
+TERM_RE = re.compile(r"\w+")
+
+
+def tokenize_body(body: str) -> Counter:
+    """Count lowercase word terms of a body (3+ characters, not pure digits)."""
+    return Counter(
+        term for term in TERM_RE.findall(body.lower())
+        if len(term) >= 3 and not term.isdigit()
+    )
+
+
+def sync_body_terms(index: VaultIndex) -> int:
+    """Bring stored term counts in line with the index; return notes re-tokenized.
+
+    Call after VaultIndex.refresh(). Notes are matched by relative path and
+    content hash, so unchanged notes are never tokenized again.
+    """
+    conn = index.conn
+    conn.executescript(_SCHEMA)
+    known = dict(conn.execute("SELECT rel_path, content_hash FROM body_docs"))
+    current = dict(conn.execute("SELECT rel_path, content_hash FROM notes"))
+    removed = [(rel,) for rel in known if rel not in current]
+    changed = sorted(rel for rel, hash_ in current.items() if known.get(rel) != hash_)
+
+    term_rows: list[tuple[str, str, int]] = []
+    for start in range(0, len(changed), 500):
+        chunk = changed[start:start + 500]
+        placeholders = ", ".join("?" * len(chunk))
+        for rel, body in conn.execute(
+            f"SELECT rel_path, body FROM notes WHERE rel_path IN ({placeholders})", chunk
+        ):
+            term_rows.extend((rel, term, count) for term, count in tokenize_body(body).items())
+
+    stale = removed + [(rel,) for rel in changed]
+    with conn:
+        conn.executemany("DELETE FROM body_terms WHERE rel_path = ?", stale)
+        conn.executemany("DELETE FROM body_docs WHERE rel_path = ?", stale)
+        conn.executemany(
+            "INSERT INTO body_docs (rel_path, content_hash) VALUES (?, ?)",
+            ((rel, current[rel]) for rel in changed),
+        )
+        conn.executemany(
+            "INSERT INTO body_terms (rel_path, term, count) VALUES (?, ?, ?)", term_rows
+        )
+    return len(changed)
+
+
+class BodyVectors:
+    """In-memory TF-IDF vectors with an inverted index for cosine top-k queries.
+
+    Weights are (1 + log tf) * idf with smoothed idf = log((1 + N) / (1 + df)) + 1.
+    """
+
+    def __init__(self, vault_path: Path, doc_terms: dict[str, Counter]) -> None:
+        self.vault_path = Path(vault_path)
+        self.rel_paths = sorted(doc_terms)
+        self._doc_ids = {rel: doc for doc, rel in enumerate(self.rel_paths)}
+
+        postings: dict[str, list[tuple[int, float]]] = defaultdict(list)
+        self._terms: list[list[tuple[str, float]]] = []
+        for doc, rel in enumerate(self.rel_paths):
+            weighted = [(term, 1.0 + math.log(count)) for term, count in doc_terms[rel].items()]
+            self._terms.append(weighted)
+            for term, tf in weighted:
+                postings[term].append((doc, tf))
+        self._postings = dict(postings)
+
+        total = len(self.rel_paths)
+        self._idf = {
+            term: math.log((1 + total) / (1 + len(docs))) + 1.0
+            for term, docs in self._postings.items()
+        }
+        self._norms = [
+            math.sqrt(sum((tf * self._idf[term]) ** 2 for term, tf in terms))
+            for terms in self._terms
+        ]
+
+    def __len__(self) -> int:
+        return len(self.rel_paths)
+
+    def _rel(self, path: Path) -> str | None:
+        try:
+            return Path(path).relative_to(self.vault_path).as_posix()
+        except ValueError:
+            return None
+
+    def neighbors(self, path: Path, k: int) -> list[tuple[float, Path]]:
+        """Top-k (cosine, path) body neighbours of the note at path, best first.
+
+        Only documents sharing at least one term are visited. Ties are broken
+        by path. Unknown or empty notes have no neighbours.
+        """
+        doc = self._doc_ids.get(self._rel(path) or "")
+        if doc is None or not self._norms[doc] or k <= 0:
+            return []
+
+        dots: dict[int, float] = defaultdict(float)
+        for term, tf in self._terms[doc]:
+            idf = self._idf[term]
+            weight = tf * idf * idf
+            for other, other_tf in self._postings[term]:
+                if other != doc:
+                    dots[other] += weight * other_tf
+
+        norm = self._norms[doc]
+        best = heapq.nsmallest(
+            k,
+            ((dot / (norm * self._norms[other]), self.rel_paths[other]) for other, dot in dots.items()),
+            key=lambda item: (-item[0], item[1]),
+        )
+        return [(score, self.vault_path / rel) for score, rel in best]
+
+
+def load_body_vectors(index: VaultIndex) -> BodyVectors:
+    """Sync stored term counts and load them as BodyVectors."""
+    sync_body_terms(index)
+    doc_terms: dict[str, Counter] = {
+        rel: Counter() for (rel,) in index.conn.execute("SELECT rel_path FROM body_docs")
+    }
+    for rel, term, count in index.conn.execute("SELECT rel_path, term, count FROM body_terms"):
+        doc_terms[rel][term] = count
+    return BodyVectors(index.vault_path, doc_terms)
+
+
+def build_body_vectors(vault_path: Path, *, index_path: Path | None = None) -> BodyVectors:
+    """Open the vault index (without refreshing it) and load body vectors."""
+    with VaultIndex(vault_path, index_path) as index:
+        return load_body_vectors(index)
@@ -5,9 +5,14 @@ Single source of truth for:
 - PROJECT_ROOT path
 - STAGING_DIR default
 - REGISTRY_PATH
+- INDEX_PATH
 - load_config() with soft/strict modes
+- [performance] settings for parallel note loading
+- telemetry_path() for backend call telemetry
+- response_cache_dir() for cached backend responses
 """
 
+import os
 import sys
 from pathlib import Path
 
@@ -26,6 +31,7 @@ except ImportError:
 PROJECT_ROOT = Path(__file__).parent.parent
 DEFAULT_STAGING_DIR = "/tmp/dw/staging"
 REGISTRY_PATH = PROJECT_ROOT / "processed.json"
+INDEX_PATH = PROJECT_ROOT / "vault_index.sqlite"
 
 # ── Config loader ─────────────────────────────────────────────────────────────
 
@@ -73,3 +79,42 @@ def load_config(*, strict: bool = False) -> dict:
 
     with open(config_path, "rb") as f:
         return tomllib.load(f)
+
+
+# ── Performance settings ──────────────────────────────────────────────────────
+
+
+def resolve_workers(config: dict, override: int | None = None) -> int:
+    """Number of parallel note loaders.
+
+    Precedence: CLI override, then [performance] workers, then 1 (serial).
+    """
+    if override is None:
+        override = config.get("performance", {}).get("workers", 1)
+    try:
+        return max(1, int(override))
+    except (TypeError, ValueError):
+        return 1
+
+
+def use_parse_processes(config: dict) -> bool:
+    """Whether note parsing should run in a process pool ([performance] parse_processes)."""
+    return bool(config.get("performance", {}).get("parse_processes", False))
+
+
+# ── Telemetry ─────────────────────────────────────────────────────────────────
+
+
+def telemetry_path(config: dict) -> Path:
+    """Backend call telemetry file: <staging_dir>/telemetry.jsonl."""
+    staging_dir = config.get("rclone", {}).get("staging_dir", DEFAULT_STAGING_DIR)
+    return Path(staging_dir) / "telemetry.jsonl"
+
+
+def response_cache_dir(config: dict) -> Path:
+    """Backend response cache: $OBSIDIAN_DATAWEAVE_CACHE_DIR or <staging_dir>/response-cache."""
+    override = os.environ.get("OBSIDIAN_DATAWEAVE_CACHE_DIR")
+    if override:
+        return Path(override)
+    staging_dir = config.get("rclone", {}).get("staging_dir", DEFAULT_STAGING_DIR)
+    return Path(staging_dir) / "response-cache"
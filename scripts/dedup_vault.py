@@ -2,51 +2,92 @@
 
 5-phase pipeline:
     1. Deep Vault Scan — read all notes with content and frontmatter
-    2. Local Candidate Detection — title/tag/token similarity
+    2. Local Candidate Detection — title/tag/token similarity, plus
+       (with --body-threshold) MinHash/LSH over body shingles for
+       near-identical bodies
     3. Semantic Verification — batch semantic dedup check via local CLI
     4. Merge Decision — merge/keep/skip per group
     5. Wikilink Update — replace old titles across vault
 
 Usage:
     python3 scripts/dedup_vault.py [--dry-run] [--auto] [--threshold 0.55]
+                                   [--body-threshold T]
                                    [--confidence 0.85] [--folder <subfolder>]
                                    [--skip-claude] [--non-interactive]
-                                   [--decision merge|keep|skip]
+                                   [--decision merge|keep|skip] [--workers N]
+                                   [--parallel N] [--persistent-backend]
+                                   [--batch-tokens N]
 """
 
 import argparse
+import hashlib
 import json
 import os
+import random
 import re
 import shutil
 import sys
 import tempfile
+from array import array
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from datetime import date
-from difflib import SequenceMatcher
 from pathlib import Path
 
 try:
-    from scripts.config import PROJECT_ROOT, load_config as _load_config
+    from scripts.config import (
+        PROJECT_ROOT,
+        load_config as _load_config,
+        resolve_workers,
+        telemetry_path,
+        use_parse_processes,
+    )
     from scripts.atomize import extract_json, load_tags
-    from scripts.rewrite_backend import call_rewriter
-    from scripts.generate_notes import render_note_md, sanitize_filename
-    from scripts.scan_vault import SKIP_DIRS
-    from scripts.vault_writer import (
-        get_vault_dest, load_registry, parse_frontmatter, save_registry,
+    from scripts.rewrite_backend import (
+        BackendPool, call_rewriter, estimate_tokens, get_backend_pool, pack_batches,
     )
+    from scripts.telemetry import telemetry
+    from scripts.similarity import DEDUP_WEIGHTS, PruneStats, SimilarityCorpus
+    from scripts.generate_notes import render_note_md, sanitize_filename
+    from scripts.vault_index import WIKILINK_RE, VaultIndex, load_indexed_notes
+    from scripts.vault_writer import get_vault_dest, load_registry, save_registry
 except ModuleNotFoundError:
-    from config import PROJECT_ROOT, load_config as _load_config
+    from config import (
+        PROJECT_ROOT,
+        load_config as _load_config,
+        resolve_workers,
+        telemetry_path,
+        use_parse_processes,
+    )
     from atomize import extract_json, load_tags
-    from rewrite_backend import call_rewriter
-    from generate_notes import render_note_md, sanitize_filename
-    from scan_vault import SKIP_DIRS
-    from vault_writer import (
-        get_vault_dest, load_registry, parse_frontmatter, save_registry,
+    from rewrite_backend import (
+        BackendPool, call_rewriter, estimate_tokens, get_backend_pool, pack_batches,
     )
+    from telemetry import telemetry
+    from similarity import DEDUP_WEIGHTS, PruneStats, SimilarityCorpus
+    from generate_notes import render_note_md, sanitize_filename
+    from vault_index import WIKILINK_RE, VaultIndex, load_indexed_notes
+    from vault_writer import get_vault_dest, load_registry, save_registry
 
 REVIEWED_PATH = PROJECT_ROOT / "dedup_reviewed.json"
 
+# Token budget per semantic verification call (prompt plus expected reply).
+VERIFY_BATCH_TOKENS = 16000
+# Reply allowance per group: a duplicate comes back with a 150-600 word body.
+VERIFY_REPLY_TOKENS = 1000
+
+# MinHash over hashed word shingles; bump the namespace if any of these change.
+MINHASH_PERMUTATIONS = 128
+SHINGLE_SIZE = 5
+MINHASH_CACHE_NAMESPACE = f"minhash-v1-{MINHASH_PERMUTATIONS}x{SHINGLE_SIZE}"
+_MERSENNE_PRIME = (1 << 61) - 1
+_rng = random.Random(0x5EED)
+_MINHASH_PARAMS = [
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME))
+    for _ in range(MINHASH_PERMUTATIONS)
+]
+del _rng
+
 
 # ── Data classes ──────────────────────────────────────────────────────────────
 
@@ -60,6 +101,7 @@ class VaultNote:
     note_type: str
     source_doc: str
     word_count: int
+    content_hash: str = ""
 
 
 @dataclass
@@ -77,8 +119,20 @@ class CandidateGroup:
 # ── Phase 1: Deep Vault Scan ─────────────────────────────────────────────────
 
 
-def deep_scan_vault(vault_path: Path, folder: str | None = None) -> list[VaultNote]:
-    """Read all notes with content and frontmatter. MOC notes are filtered out."""
+def deep_scan_vault(
+    vault_path: Path,
+    folder: str | None = None,
+    *,
+    index_path: Path | None = None,
+    workers: int = 1,
+    use_processes: bool = False,
+) -> list[VaultNote]:
+    """Read all notes with content and frontmatter. MOC notes are filtered out.
+
+    Notes come from the persistent vault index, so only files changed since the
+    previous run are re-read and re-parsed (in parallel when workers > 1).
+    Results are ordered by relative path.
+    """
     notes: list[VaultNote] = []
     scan_root = vault_path / folder if folder else vault_path
 
@@ -86,40 +140,29 @@ def deep_scan_vault(vault_path: Path, folder: str | None = None) -> list[VaultNo
         print(f"ERROR: Scan path does not exist: {scan_root}", file=sys.stderr)
         sys.exit(1)
 
-    for md_file in scan_root.rglob("*.md"):
-        # Skip excluded directories
-        rel = md_file.relative_to(vault_path)
-        if any(part in SKIP_DIRS for part in rel.parts):
-            continue
-
-        try:
-            content = md_file.read_text(encoding="utf-8")
-        except OSError:
-            continue
-
-        fm = parse_frontmatter(content)
-        note_type = fm.get("note_type", "")
+    indexed = load_indexed_notes(
+        vault_path,
+        folder=folder,
+        index_path=index_path,
+        workers=workers,
+        use_processes=use_processes,
+    )
+    for entry in indexed:
+        note_type = entry.frontmatter.get("note_type", "")
 
         # Skip MOC notes — they are auto-generated, not merge targets
-        if note_type == "moc" or md_file.stem.endswith(" \u2014 MOC"):
+        if note_type == "moc" or entry.stem.endswith(" \u2014 MOC"):
             continue
 
-        # Extract body (after frontmatter)
-        parts = content.split("---", 2)
-        body = parts[2].strip() if len(parts) >= 3 else content.strip()
-
-        tags = fm.get("tags", [])
-        if not isinstance(tags, list):
-            tags = []
-
         notes.append(VaultNote(
-            path=md_file,
-            title=md_file.stem,
-            body=body,
-            tags=tags,
+            path=entry.path,
+            title=entry.stem,
+            body=entry.body,
+            tags=entry.tags,
             note_type=note_type,
-            source_doc=fm.get("source_doc", ""),
-            word_count=len(body.split()),
+            source_doc=entry.frontmatter.get("source_doc", ""),
+            word_count=entry.word_count,
+            content_hash=entry.content_hash,
         ))
 
     return notes
@@ -135,23 +178,11 @@ def compute_similarity(a: VaultNote, b: VaultNote) -> float:
         Title similarity (SequenceMatcher)  — weight 0.5
         Tag overlap (Jaccard)               — weight 0.3
         Title token overlap (Jaccard)       — weight 0.2
-    """
-    # Title similarity
-    title_sim = SequenceMatcher(None, a.title.lower(), b.title.lower()).ratio()
-
-    # Tag overlap (Jaccard)
-    tags_a = set(a.tags)
-    tags_b = set(b.tags)
-    tag_union = tags_a | tags_b
-    tag_jaccard = len(tags_a & tags_b) / len(tag_union) if tag_union else 0.0
-
-    # Title token overlap (Jaccard on words)
-    tokens_a = set(re.findall(r"\w+", a.title.lower()))
-    tokens_b = set(re.findall(r"\w+", b.title.lower()))
-    token_union = tokens_a | tokens_b
-    token_jaccard = len(tokens_a & tokens_b) / len(token_union) if token_union else 0.0
 
-    return 0.5 * title_sim + 0.3 * tag_jaccard + 0.2 * token_jaccard
+    Pair loops should build one SimilarityCorpus (DEDUP_WEIGHTS) instead of
+    calling this per pair.
+    """
+    return SimilarityCorpus.from_notes([a, b], DEDUP_WEIGHTS).score(0, 1)
 
 
 def _find(parent: dict[str, str], x: str) -> str:
@@ -174,6 +205,29 @@ def _union(parent: dict[str, str], rank: dict[str, int], a: str, b: str) -> None
         rank[ra] += 1
 
 
+def _maximum_spanning_pairs(
+    pairs: list[tuple[str, str, float]],
+) -> list[tuple[str, str, float]]:
+    """Pairs of a maximum spanning tree (Kruskal), in their original order.
+
+    Ties keep the earlier pair, so the result is deterministic.
+    """
+    parent: dict[str, str] = {}
+    rank: dict[str, int] = {}
+    for a, b, _ in pairs:
+        for t in (a, b):
+            parent.setdefault(t, t)
+            rank.setdefault(t, 0)
+
+    chosen: list[int] = []
+    for idx in sorted(range(len(pairs)), key=lambda k: -pairs[k][2]):
+        a, b, _ = pairs[idx]
+        if _find(parent, a) != _find(parent, b):
+            _union(parent, rank, a, b)
+            chosen.append(idx)
+    return [pairs[idx] for idx in sorted(chosen)]
+
+
 def load_reviewed() -> list[dict]:
     """Load previously reviewed pairs from dedup_reviewed.json."""
     if not REVIEWED_PATH.exists():
@@ -210,28 +264,192 @@ def _reviewed_set(reviewed: list[dict]) -> set[frozenset[str]]:
     return result
 
 
+def find_similar_pairs(
+    notes: list[VaultNote],
+    threshold: float,
+    reviewed_pairs: set[frozenset[str]],
+    *,
+    stats: PruneStats | None = None,
+) -> list[tuple[str, str, float]]:
+    """Score candidate pairs and keep those >= threshold that were not reviewed.
+
+    Output is identical to scoring every i<j pair with compute_similarity.
+    """
+    corpus = SimilarityCorpus.from_notes(notes, DEDUP_WEIGHTS)
+    pairs: list[tuple[str, str, float]] = []
+    for i, j, sim in corpus.pairs_above(threshold, stats=stats):
+        pair_key = frozenset([notes[i].title, notes[j].title])
+        if pair_key not in reviewed_pairs:
+            pairs.append((notes[i].title, notes[j].title, sim))
+    return pairs
+
+
+def body_shingles(body: str, size: int = SHINGLE_SIZE) -> set[int]:
+    """Hash the word n-grams of a note body into 61-bit integers.
+
+    Bodies shorter than size words become a single shingle; empty bodies yield
+    an empty set.
+    """
+    tokens = re.findall(r"\w+", body.lower())
+    if not tokens:
+        return set()
+    if len(tokens) < size:
+        grams = [" ".join(tokens)]
+    else:
+        grams = [" ".join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)]
+    return {
+        int.from_bytes(hashlib.blake2b(g.encode("utf-8"), digest_size=8).digest(), "big")
+        & _MERSENNE_PRIME
+        for g in grams
+    }
+
+
+def minhash_signature(shingles: set[int]) -> tuple[int, ...]:
+    """MinHash signature: the minimum of each universal hash over the shingles."""
+    return tuple(
+        min((a * x + b) % _MERSENNE_PRIME for x in shingles)
+        for a, b in _MINHASH_PARAMS
+    )
+
+
+def compute_body_signatures(
+    notes: list[VaultNote],
+    index: VaultIndex | None = None,
+) -> list[tuple[int, ...] | None]:
+    """Return one MinHash signature per note (None for empty bodies).
+
+    With an open VaultIndex, signatures are read from and written to its cache
+    keyed by content hash, so only new or edited notes are shingled again.
+    """
+    keys = [
+        note.content_hash or hashlib.sha1(note.body.encode("utf-8")).hexdigest()
+        for note in notes
+    ]
+    cached = index.cache_get(MINHASH_CACHE_NAMESPACE, keys) if index is not None else {}
+
+    signatures: list[tuple[int, ...] | None] = []
+    fresh: dict[str, bytes] = {}
+    for note, key in zip(notes, keys):
+        blob = cached.get(key, fresh.get(key))
+        if blob is None:
+            shingles = body_shingles(note.body)
+            blob = array("Q", minhash_signature(shingles)).tobytes() if shingles else b""
+            fresh[key] = blob
+        signatures.append(tuple(array("Q", blob)) if blob else None)
+
+    if index is not None and fresh:
+        index.cache_put(MINHASH_CACHE_NAMESPACE, fresh.items())
+    return signatures
+
+
+def load_body_signatures(
+    vault_path: Path,
+    notes: list[VaultNote],
+    *,
+    index_path: Path | None = None,
+) -> list[tuple[int, ...] | None]:
+    """Compute body signatures through the vault index cache, pruning stale entries."""
+    with VaultIndex(vault_path, index_path) as index:
+        signatures = compute_body_signatures(notes, index)
+        index.cache_prune(MINHASH_CACHE_NAMESPACE)
+    return signatures
+
+
+def _lsh_bands(threshold: float, num_perm: int) -> tuple[int, int]:
+    """Pick (bands, rows) so the LSH S-curve rises well below threshold.
+
+    The curve midpoint (1/bands)**(1/rows) is kept at least 0.1 under the
+    threshold to keep false negatives negligible; false positives are removed
+    by the signature estimate afterwards.
+    """
+    best = (num_perm, 1)
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        if (1 / bands) ** (1 / rows) <= threshold - 0.1:
+            best = (bands, rows)
+    return best
+
+
+def find_body_pairs(
+    notes: list[VaultNote],
+    threshold: float,
+    reviewed_pairs: set[frozenset[str]],
+    signatures: list[tuple[int, ...] | None],
+) -> list[tuple[str, str, float]]:
+    """Find note pairs whose estimated body Jaccard similarity is >= threshold.
+
+    Signatures are split into LSH bands; notes sharing any band bucket become
+    candidates, which are then kept only if the fraction of equal signature
+    slots reaches the threshold. Pairs are returned in (i, j) order.
+    """
+    bands, rows = _lsh_bands(threshold, MINHASH_PERMUTATIONS)
+    buckets: dict[tuple, list[int]] = {}
+    for idx, signature in enumerate(signatures):
+        if signature is None:
+            continue
+        for band in range(bands):
+            buckets.setdefault((band, signature[band * rows:(band + 1) * rows]), []).append(idx)
+
+    candidates: set[tuple[int, int]] = set()
+    for members in buckets.values():
+        for pos, i in enumerate(members):
+            candidates.update((i, j) for j in members[pos + 1:])
+
+    pairs: list[tuple[str, str, float]] = []
+    for i, j in sorted(candidates):
+        sig_a, sig_b = signatures[i], signatures[j]
+        estimate = sum(x == y for x, y in zip(sig_a, sig_b)) / len(sig_a)
+        if estimate >= threshold:
+            pair_key = frozenset([notes[i].title, notes[j].title])
+            if pair_key not in reviewed_pairs:
+                pairs.append((notes[i].title, notes[j].title, estimate))
+    return pairs
+
+
 def find_candidate_groups(
     notes: list[VaultNote],
     threshold: float,
     reviewed: list[dict],
+    *,
+    body_threshold: float | None = None,
+    body_signatures: list[tuple[int, ...] | None] | None = None,
 ) -> list[CandidateGroup]:
     """Find groups of similar notes using Union-Find on pairs above threshold.
 
     Filters out pairs already in reviewed list.
-    Limits groups to max 4 notes (larger groups split into pairs).
+    Limits groups to max 4 notes; larger groups are split into the pairs of a
+    maximum spanning tree (see group_candidate_pairs), so each note is still
+    reviewed against its closest neighbour without sending every pair.
+    With body_threshold, pairs with near-identical bodies (MinHash/LSH) are
+    added as well; their score is the estimated body Jaccard similarity.
     """
     reviewed_pairs = _reviewed_set(reviewed)
 
-    # Compute all pairwise similarities above threshold
-    pairs: list[tuple[str, str, float]] = []
-    for i in range(len(notes)):
-        for j in range(i + 1, len(notes)):
-            sim = compute_similarity(notes[i], notes[j])
-            if sim >= threshold:
-                pair_key = frozenset([notes[i].title, notes[j].title])
-                if pair_key not in reviewed_pairs:
-                    pairs.append((notes[i].title, notes[j].title, sim))
+    # Pairwise similarities above threshold (blocked candidate generation)
+    pairs = find_similar_pairs(notes, threshold, reviewed_pairs)
+
+    if body_threshold:
+        if body_signatures is None:
+            body_signatures = compute_body_signatures(notes)
+        seen = {frozenset((a, b)) for a, b, _ in pairs}
+        pairs.extend(
+            pair for pair in find_body_pairs(notes, body_threshold, reviewed_pairs, body_signatures)
+            if frozenset(pair[:2]) not in seen
+        )
 
+    return group_candidate_pairs(notes, pairs)
+
+
+def group_candidate_pairs(
+    notes: list[VaultNote], pairs: list[tuple[str, str, float]],
+) -> list[CandidateGroup]:
+    """Group (title_a, title_b, score) pairs into connected components.
+
+    Components of up to 4 notes become one group with all their pairs; larger
+    components are split into the pairs of a maximum spanning tree.
+    """
     if not pairs:
         return []
 
@@ -243,11 +461,15 @@ def find_candidate_groups(
     for a, b, _ in pairs:
         _union(parent, rank, a, b)
 
-    # Collect connected components
-    components: dict[str, list[str]] = {}
-    for t in all_titles:
-        root = _find(parent, t)
-        components.setdefault(root, []).append(t)
+    # Bucket titles and pairs by component root in one pass over the pairs
+    components: dict[str, dict[str, None]] = {}
+    component_pairs: dict[str, list[tuple[str, str, float]]] = {}
+    for a, b, s in pairs:
+        root = _find(parent, a)
+        titles = components.setdefault(root, {})
+        titles[a] = None
+        titles[b] = None
+        component_pairs.setdefault(root, []).append((a, b, s))
 
     # Build note lookup
     note_by_title = {n.title: n for n in notes}
@@ -255,23 +477,19 @@ def find_candidate_groups(
     groups: list[CandidateGroup] = []
     group_id = 0
 
-    for component_titles in components.values():
+    for root, component_titles in components.items():
         component_notes = [note_by_title[t] for t in component_titles if t in note_by_title]
-        component_pairs = [
-            (a, b, s) for a, b, s in pairs
-            if a in component_titles and b in component_titles
-        ]
 
         if len(component_notes) <= 4:
             groups.append(CandidateGroup(
                 group_id=group_id,
                 notes=component_notes,
-                pairs=component_pairs,
+                pairs=component_pairs[root],
             ))
             group_id += 1
         else:
-            # Split large groups into pairs
-            for a, b, s in component_pairs:
+            # Split large groups into the pairs of a maximum spanning tree
+            for a, b, s in _maximum_spanning_pairs(component_pairs[root]):
                 na = note_by_title.get(a)
                 nb = note_by_title.get(b)
                 if na and nb:
@@ -288,9 +506,8 @@ def find_candidate_groups(
 # ── Phase 3: Semantic Verification ───────────────────────────────────────────
 
 
-def assemble_dedup_prompt(groups: list[CandidateGroup], tags: list[str]) -> str:
-    """Build a batch semantic dedup verification prompt."""
-    lines: list[str] = [
+def _dedup_prompt_header(tags: list[str]) -> list[str]:
+    return [
         "You are verifying potential duplicate notes in an Obsidian vault.",
         "For each group of candidate duplicates, determine if they are truly about "
         "the same concept/topic (semantic duplicates) or legitimately different notes.",
@@ -311,83 +528,181 @@ def assemble_dedup_prompt(groups: list[CandidateGroup], tags: list[str]) -> str:
         "",
     ]
 
-    for group in groups:
-        lines.append(f"## Group {group.group_id}")
-        lines.append(f"Similarity pairs: {[(a, b, round(s, 3)) for a, b, s in group.pairs]}")
-        lines.append("")
 
-        for note in group.notes:
-            # First 300 words of body
-            words = note.body.split()
-            truncated = " ".join(words[:300])
-            if len(words) > 300:
-                truncated += " [...]"
-
-            lines.append(f"### {note.title}")
-            lines.append(f"Tags: {note.tags}")
-            lines.append(f"Source: {note.source_doc}")
-            lines.append(f"Word count: {note.word_count}")
-            lines.append("")
-            lines.append(truncated)
-            lines.append("")
-
-        lines.append("---")
+def _dedup_group_section(group: CandidateGroup) -> list[str]:
+    lines = [
+        f"## Group {group.group_id}",
+        f"Similarity pairs: {[(a, b, round(s, 3)) for a, b, s in group.pairs]}",
+        "",
+    ]
+
+    for note in group.notes:
+        # First 300 words of body
+        words = note.body.split()
+        truncated = " ".join(words[:300])
+        if len(words) > 300:
+            truncated += " [...]"
+
+        lines.append(f"### {note.title}")
+        lines.append(f"Tags: {note.tags}")
+        lines.append(f"Source: {note.source_doc}")
+        lines.append(f"Word count: {note.word_count}")
+        lines.append("")
+        lines.append(truncated)
         lines.append("")
 
+    lines.append("---")
+    lines.append("")
+    return lines
+
+
+def assemble_dedup_prompt(groups: list[CandidateGroup], tags: list[str]) -> str:
+    """Build a batch semantic dedup verification prompt."""
+    lines = _dedup_prompt_header(tags)
+    for group in groups:
+        lines.extend(_dedup_group_section(group))
     return "\n".join(lines)
 
 
-def verify_with_claude(
+def plan_verify_batches(
     groups: list[CandidateGroup],
     tags: list[str],
+    batch_tokens: int = VERIFY_BATCH_TOKENS,
+) -> list[list[CandidateGroup]]:
+    """Pack groups into as few verification prompts as fit batch_tokens each.
+
+    A group costs its prompt section plus VERIFY_REPLY_TOKENS; the shared
+    prompt header is charged once per batch.
+    """
+    overhead = estimate_tokens("\n".join(_dedup_prompt_header(tags)))
+    costs = [
+        estimate_tokens("\n".join(_dedup_group_section(group))) + VERIFY_REPLY_TOKENS
+        for group in groups
+    ]
+    return [
+        [groups[idx] for idx in batch]
+        for batch in pack_batches(costs, batch_tokens - overhead)
+    ]
+
+
+def _verify_batch(
+    batch: list[CandidateGroup],
+    tags: list[str],
     *,
-    backend: str = "auto",
-    timeout_seconds: int = 300,
+    backend: str,
+    timeout_seconds: int,
+    pool: BackendPool | None = None,
 ) -> list[CandidateGroup]:
-    """Send candidate groups to the active semantic verification backend.
+    """Verify one batch; return the groups the response covered, in batch order.
 
-    Processes in batches of up to 5 groups.
+    Raises RuntimeError if the backend call fails and ValueError if the
+    response is not parseable JSON.
     """
-    verified: list[CandidateGroup] = []
+    _, raw = call_rewriter(
+        assemble_dedup_prompt(batch, tags),
+        backend=backend,
+        timeout_seconds=timeout_seconds,
+        project_root=PROJECT_ROOT,
+        pool=pool,
+        call_site="dedup_vault.verify",
+    )
+    result = extract_json(raw)
 
-    for batch_start in range(0, len(groups), 5):
-        batch = groups[batch_start:batch_start + 5]
-        prompt = assemble_dedup_prompt(batch, tags)
+    by_id = {group.group_id: group for group in batch}
+    answered: set[int] = set()
+    for g_result in result.get("groups", []):
+        group = by_id.get(g_result.get("group_id"))
+        if group is None:
+            continue
+        group.is_duplicate = g_result.get("is_duplicate", False)
+        group.confidence = g_result.get("confidence", 0.0)
+        group.canonical_title = g_result.get("canonical_title")
+        group.canonical_tags = g_result.get("canonical_tags")
+        group.canonical_body = g_result.get("canonical_body")
+        answered.add(group.group_id)
+    return [group for group in batch if group.group_id in answered]
 
-        print(
-            f"  Verifying batch {batch_start // 5 + 1} "
-            f"({len(batch)} groups)...",
-            file=sys.stderr,
-        )
 
-        _, raw = call_rewriter(
-            prompt,
-            backend=backend,
-            timeout_seconds=timeout_seconds,
-            project_root=PROJECT_ROOT,
+def _verify_batch_with_retry(
+    batch: list[CandidateGroup],
+    tags: list[str],
+    label: str,
+    *,
+    backend: str,
+    timeout_seconds: int,
+    pool: BackendPool | None = None,
+) -> list[CandidateGroup]:
+    """Verify a batch, retrying failed or unanswered groups one at a time."""
+    print(f"  Verifying batch {label} ({len(batch)} groups)...", file=sys.stderr)
+    try:
+        verified = _verify_batch(
+            batch, tags, backend=backend, timeout_seconds=timeout_seconds, pool=pool
         )
-        try:
-            result = extract_json(raw)
-        except ValueError as e:
-            print(f"WARNING: Failed to parse Claude response: {e}", file=sys.stderr)
+    except (RuntimeError, ValueError) as e:
+        print(f"WARNING: Batch {label} failed: {e}", file=sys.stderr)
+        verified = []
+    if len(batch) == 1:
+        return verified
+
+    done = {group.group_id for group in verified}
+    for group in batch:
+        if group.group_id in done:
             continue
+        print(f"  Retrying group {group.group_id} on its own...", file=sys.stderr)
+        try:
+            verified.extend(
+                _verify_batch(
+                    [group], tags, backend=backend, timeout_seconds=timeout_seconds, pool=pool
+                )
+            )
+        except (RuntimeError, ValueError) as e:
+            print(f"WARNING: Group {group.group_id} failed verification: {e}", file=sys.stderr)
+    position = {group.group_id: k for k, group in enumerate(batch)}
+    return sorted(verified, key=lambda group: position[group.group_id])
 
-        for g_result in result.get("groups", []):
-            gid = g_result.get("group_id")
-            # Find matching group
-            matching = [g for g in batch if g.group_id == gid]
-            if not matching:
-                continue
-            group = matching[0]
 
-            group.is_duplicate = g_result.get("is_duplicate", False)
-            group.confidence = g_result.get("confidence", 0.0)
-            group.canonical_title = g_result.get("canonical_title")
-            group.canonical_tags = g_result.get("canonical_tags")
-            group.canonical_body = g_result.get("canonical_body")
-            verified.append(group)
+def verify_with_claude(
+    groups: list[CandidateGroup],
+    tags: list[str],
+    *,
+    backend: str = "auto",
+    timeout_seconds: int = 300,
+    parallel: int = 1,
+    backend_pool: BackendPool | None = None,
+    batch_tokens: int = VERIFY_BATCH_TOKENS,
+) -> list[CandidateGroup]:
+    """Send candidate groups to the active semantic verification backend.
+
+    Packs groups into batches of about batch_tokens each (plan_verify_batches)
+    and runs up to `parallel` batches at a time. Groups of a batch that fails
+    (backend error or unparseable reply) or that the reply leaves out are
+    retried one by one; groups that still fail are skipped with a warning.
+    Results are returned in input order whatever the completion order. With
+    backend_pool, every batch and retry takes a pre-started backend session
+    from the pool instead of waiting for CLI startup.
+    """
+    batches = plan_verify_batches(groups, tags, batch_tokens)
+    print(
+        f"  Packed {len(groups)} groups into {len(batches)} batches "
+        f"(~{batch_tokens} tokens each)",
+        file=sys.stderr,
+    )
+    labels = [f"{number}/{len(batches)}" for number in range(1, len(batches) + 1)]
+
+    def run(batch: list[CandidateGroup], label: str) -> list[CandidateGroup]:
+        return _verify_batch_with_retry(
+            batch, tags, label,
+            backend=backend, timeout_seconds=timeout_seconds, pool=backend_pool,
+        )
 
-    return verified
+    if parallel <= 1 or len(batches) <= 1:
+        results = [run(batch, label) for batch, label in zip(batches, labels)]
+    else:
+        with ThreadPoolExecutor(max_workers=parallel) as pool:
+            results = list(pool.map(run, batches, labels))
+    position = {group.group_id: k for k, group in enumerate(groups)}
+    verified = [group for batch_result in results for group in batch_result]
+    return sorted(verified, key=lambda group: position[group.group_id])
 
 
 # ── Phase 4: Interactive Merge ────────────────────────────────────────────────
@@ -588,37 +903,53 @@ def interactive_merge(
 # ── Phase 5: Wikilink Update ─────────────────────────────────────────────────
 
 
+def replace_wikilink_targets(text: str, title_map: dict[str, str]) -> str:
+    """Point every wikilink whose target is in title_map at the new title.
+
+    Matches [[...]] generically and looks the normalized target up in the dict,
+    so cost is linear in the text regardless of how many titles are mapped.
+    Aliases and heading anchors are preserved: [[Old#Part|text]] becomes
+    [[New#Part|text]].
+    """
+    def _replace(match: re.Match) -> str:
+        inner = match.group(1)
+        raw_target = inner.split("|", 1)[0].split("#", 1)[0]
+        new_title = title_map.get(raw_target.strip())
+        if new_title is None:
+            return match.group(0)
+        return f"[[{new_title}{inner[len(raw_target):]}]]"
+
+    return WIKILINK_RE.sub(_replace, text)
+
+
 def update_wikilinks(
     vault_path: Path,
     title_map: dict[str, str],
+    *,
+    index_path: Path | None = None,
 ) -> int:
     """Replace [[old title]] -> [[canonical title]] across entire vault.
 
-    Excludes .archive/ and other SKIP_DIRS.
+    Alias and heading forms ([[old|text]], [[old#heading]]) are rewritten too.
+    Only files listed in the vault index's reverse-link table for the old titles
+    are opened. Excludes .archive/ and other SKIP_DIRS.
     Returns count of files modified.
     """
     if not title_map:
         return 0
 
-    # Build regex: match any old title inside [[ ]]
-    escaped = [re.escape(old) for old in title_map]
-    pattern = re.compile(r"\[\[(" + "|".join(escaped) + r")\]\]")
+    with VaultIndex(vault_path, index_path) as index:
+        index.refresh()
+        referencing = index.backlinks(title_map)
 
     modified = 0
-    for md_file in vault_path.rglob("*.md"):
-        rel = md_file.relative_to(vault_path)
-        if any(part in SKIP_DIRS for part in rel.parts):
-            continue
-
+    for md_file in referencing:
         try:
             content = md_file.read_text(encoding="utf-8")
         except OSError:
             continue
 
-        new_content = pattern.sub(
-            lambda m: f"[[{title_map[m.group(1)]}]]",
-            content,
-        )
+        new_content = replace_wikilink_targets(content, title_map)
 
         if new_content != content:
             md_file.write_text(new_content, encoding="utf-8")
@@ -650,6 +981,14 @@ def main() -> None:
         default=0.55,
         help="Composite similarity threshold for candidate detection (default: 0.55)",
     )
+    parser.add_argument(
+        "--body-threshold",
+        type=float,
+        default=None,
+        metavar="T",
+        help="Also pair notes whose estimated body Jaccard is at least T via MinHash/LSH, "
+        "e.g. 0.8; signatures cost ~13 ms per new note (default: off)",
+    )
     parser.add_argument(
         "--confidence",
         type=float,
@@ -688,11 +1027,44 @@ def main() -> None:
         default=300,
         help="Timeout for each semantic verification backend call (default: 300)",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Parallel note loaders for the vault scan (default: [performance] workers or 1)",
+    )
+    parser.add_argument(
+        "--parallel",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Semantic verification batches to run concurrently (default: 1)",
+    )
+    parser.add_argument(
+        "--persistent-backend",
+        action="store_true",
+        help="Keep up to --parallel Claude processes pre-started so verification batches "
+        "skip CLI startup; each process still answers one prompt (claude backend only)",
+    )
+    parser.add_argument(
+        "--batch-tokens",
+        type=int,
+        default=VERIFY_BATCH_TOKENS,
+        metavar="N",
+        help="Token budget per verification call, prompt plus expected reply; groups "
+        f"are packed to fit (default: {VERIFY_BATCH_TOKENS})",
+    )
+    parser.add_argument(
+        "--telemetry-summary",
+        action="store_true",
+        help="Print a per-call-site table of backend calls (latency, sizes, retries) "
+        "to stderr; calls are always logged to <staging_dir>/telemetry.jsonl",
+    )
     args = parser.parse_args()
 
     # Load config
     config = _load_config(strict=True)
     vault_path = Path(config["vault"]["vault_path"])
+    telemetry.enable(telemetry_path(config))
 
     if not vault_path.exists():
         print(f"ERROR: Vault path does not exist: {vault_path}", file=sys.stderr)
@@ -700,7 +1072,12 @@ def main() -> None:
 
     # ── Phase 1: Deep Vault Scan ──
     print(">> Phase 1: Deep vault scan...", file=sys.stderr)
-    notes = deep_scan_vault(vault_path, folder=args.folder)
+    notes = deep_scan_vault(
+        vault_path,
+        folder=args.folder,
+        workers=resolve_workers(config, args.workers),
+        use_processes=use_parse_processes(config),
+    )
     print(f"  Scanned {len(notes)} notes (MOC filtered out)", file=sys.stderr)
 
     if len(notes) < 2:
@@ -710,7 +1087,17 @@ def main() -> None:
     # ── Phase 2: Local Candidate Detection ──
     print(f">> Phase 2: Finding candidates (threshold={args.threshold})...", file=sys.stderr)
     reviewed = load_reviewed()
-    groups = find_candidate_groups(notes, args.threshold, reviewed)
+    body_signatures = None
+    if args.body_threshold:
+        print(f"  Body near-duplicates: MinHash (threshold={args.body_threshold})", file=sys.stderr)
+        body_signatures = load_body_signatures(vault_path, notes)
+    groups = find_candidate_groups(
+        notes,
+        args.threshold,
+        reviewed,
+        body_threshold=args.body_threshold,
+        body_signatures=body_signatures,
+    )
     print(f"  Found {len(groups)} candidate groups", file=sys.stderr)
 
     if not groups:
@@ -730,12 +1117,22 @@ def main() -> None:
     # ── Phase 3: Semantic Verification ──
     print(">> Phase 3: Semantic verification...", file=sys.stderr)
     tags = load_tags()
-    verified = verify_with_claude(
-        groups,
-        tags,
-        backend=args.backend,
-        timeout_seconds=args.timeout_seconds,
-    )
+    backend_pool = get_backend_pool(args.parallel) if args.persistent_backend else None
+    try:
+        verified = verify_with_claude(
+            groups,
+            tags,
+            backend=args.backend,
+            timeout_seconds=args.timeout_seconds,
+            parallel=args.parallel,
+            backend_pool=backend_pool,
+            batch_tokens=args.batch_tokens,
+        )
+    finally:
+        if backend_pool is not None:
+            backend_pool.close()
+        if args.telemetry_summary:
+            print(telemetry.summary(), file=sys.stderr)
 
     confirmed = [g for g in verified if g.is_duplicate]
     print(
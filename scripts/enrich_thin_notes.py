@@ -3,16 +3,21 @@
 from __future__ import annotations
 
 import argparse
+import heapq
 import json
 import re
 from pathlib import Path
 
 try:
     from scripts.audit_vault import NoteRecord, iter_notes
-    from scripts.config import load_config
+    from scripts.body_index import build_body_vectors
+    from scripts.config import load_config, resolve_workers, use_parse_processes
+    from scripts.report_stream import JsonlWriter
 except ModuleNotFoundError:
     from audit_vault import NoteRecord, iter_notes
-    from config import load_config
+    from body_index import build_body_vectors
+    from config import load_config, resolve_workers, use_parse_processes
+    from report_stream import JsonlWriter
 
 
 ENRICH_HEADER = "## Practical Notes"
@@ -32,18 +37,30 @@ def extract_title_tokens(title: str) -> set[str]:
     }
 
 
-def related_titles(note: NoteRecord, notes: list[NoteRecord], *, limit: int = 3) -> list[str]:
-    """Find nearby notes that share a source document or title vocabulary."""
+def related_titles(
+    note: NoteRecord,
+    notes: list[NoteRecord],
+    *,
+    limit: int = 3,
+    body_neighbors: dict[Path, float] | None = None,
+) -> list[str]:
+    """Find nearby notes that share a source document or title vocabulary.
+
+    body_neighbors optionally maps paths to body cosine similarity (see
+    body_index); each neighbour earns up to 3 points, like a shared source.
+    """
     note_tokens = extract_title_tokens(note.title)
-    ranked: list[tuple[int, str]] = []
+    body_neighbors = body_neighbors or {}
+    ranked: list[tuple[float, str]] = []
     for candidate in notes:
         if candidate.path == note.path:
             continue
-        score = 0
+        score: float = 0
         if note.source_doc and candidate.source_doc == note.source_doc:
             score += 3
         shared = note_tokens & extract_title_tokens(candidate.title)
         score += len(shared)
+        score += 3 * body_neighbors.get(candidate.path, 0.0)
         if score <= 0:
             continue
         ranked.append((score, candidate.title))
@@ -153,28 +170,53 @@ def main() -> None:
         action="store_true",
         help="Write enrichments into the note files",
     )
+    parser.add_argument(
+        "--body-neighbors",
+        type=int,
+        default=0,
+        metavar="K",
+        help="Also rank the K nearest notes by body TF-IDF cosine (default: 0, off)",
+    )
+    parser.add_argument(
+        "--format",
+        choices=("json", "jsonl"),
+        default="json",
+        help="Output format: one JSON document (default) or one JSONL line per note "
+        "as it is processed, followed by a summary line",
+    )
     args = parser.parse_args()
 
     config = load_config(strict=True)
     vault_path = Path(config["vault"]["vault_path"])
-    notes = iter_notes(vault_path)
-    targets = [note for note in notes if is_thin_atomic(note, min_words=args.min_words)]
-    targets.sort(key=lambda note: (note.words, note.title))
-    targets = targets[:args.limit]
+    notes = iter_notes(
+        vault_path,
+        workers=resolve_workers(config),
+        use_processes=use_parse_processes(config),
+    )
+    targets = heapq.nsmallest(
+        args.limit,
+        (note for note in notes if is_thin_atomic(note, min_words=args.min_words)),
+        key=lambda note: (note.words, note.title),
+    )
 
+    vectors = build_body_vectors(vault_path) if args.body_neighbors > 0 else None
     results: list[dict] = []
     modified = 0
-    for note in targets:
-        suggestions = related_titles(note, notes)
-        paragraphs = build_enrichment_paragraphs(note, suggestions)
-        updated_text = append_enrichment(note.path.read_text(encoding="utf-8"), paragraphs)
-        changed = updated_text != note.path.read_text(encoding="utf-8")
-        if args.apply and not args.dry_run and changed:
-            note.path.write_text(updated_text, encoding="utf-8")
-            modified += 1
-
-        results.append(
-            {
+    with JsonlWriter() as writer:
+        for note in targets:
+            body_neighbors = (
+                {path: score for score, path in vectors.neighbors(note.path, args.body_neighbors)}
+                if vectors is not None else None
+            )
+            suggestions = related_titles(note, notes, body_neighbors=body_neighbors)
+            paragraphs = build_enrichment_paragraphs(note, suggestions)
+            updated_text = append_enrichment(note.path.read_text(encoding="utf-8"), paragraphs)
+            changed = updated_text != note.path.read_text(encoding="utf-8")
+            if args.apply and not args.dry_run and changed:
+                note.path.write_text(updated_text, encoding="utf-8")
+                modified += 1
+
+            record = {
                 "title": note.title,
                 "path": str(note.path),
                 "words": note.words,
@@ -182,18 +224,22 @@ def main() -> None:
                 "paragraphs": paragraphs,
                 "changed": changed,
             }
-        )
-
+            if args.format == "jsonl":
+                writer.write(record)
+            else:
+                results.append(record)
+
+        summary = {
+            "target_notes": len(targets),
+            "modified_notes": modified,
+            "dry_run": args.dry_run or not args.apply,
+        }
+        if args.format == "jsonl":
+            writer.write({"summary": summary})
+            return
     print(
         json.dumps(
-            {
-                "summary": {
-                    "target_notes": len(targets),
-                    "modified_notes": modified,
-                    "dry_run": args.dry_run or not args.apply,
-                },
-                "notes": results,
-            },
+            {"summary": summary, "notes": results},
             ensure_ascii=False,
             indent=2,
         )
@@ -3,18 +3,27 @@
 from __future__ import annotations
 
 import argparse
+import heapq
 import json
-import re
 from pathlib import Path
 
 try:
-    from scripts.audit_vault import NoteRecord, iter_notes, score_similarity
-    from scripts.config import load_config
+    from scripts.audit_vault import NoteRecord, iter_notes
+    from scripts.body_index import build_body_vectors
+    from scripts.config import load_config, resolve_workers, use_parse_processes
+    from scripts.report_stream import JsonlWriter
     from scripts.fix_similar_notes import append_related_link
+    from scripts.similarity import AUDIT_WEIGHTS, SimilarityCorpus
 except ModuleNotFoundError:
-    from audit_vault import NoteRecord, iter_notes, score_similarity
-    from config import load_config
+    from audit_vault import NoteRecord, iter_notes
+    from body_index import build_body_vectors
+    from config import load_config, resolve_workers, use_parse_processes
+    from report_stream import JsonlWriter
     from fix_similar_notes import append_related_link
+    from similarity import AUDIT_WEIGHTS, SimilarityCorpus
+
+# Bonus per unit of body cosine similarity when body neighbours are supplied.
+BODY_NEIGHBOR_WEIGHT = 0.15
 
 STOP_TOKENS = {
     "через",
@@ -45,15 +54,33 @@ def rank_related_candidates(
     *,
     threshold: float,
     max_links: int,
+    corpus: SimilarityCorpus | None = None,
+    body_neighbors: dict[Path, float] | None = None,
 ) -> list[tuple[float, NoteRecord]]:
-    """Find the strongest related-note candidates for one atomic note."""
+    """Find the strongest related-note candidates for one atomic note.
+
+    corpus, if given, must be SimilarityCorpus.from_notes(notes, AUDIT_WEIGHTS)
+    so that ranking many notes against the same vault derives features once.
+    body_neighbors optionally maps candidate paths to body cosine similarity
+    (see body_index); such candidates are considered even without shared title
+    tokens or source, and earn BODY_NEIGHBOR_WEIGHT * cosine.
+    """
+    body_neighbors = body_neighbors or {}
     ranked: list[tuple[float, NoteRecord]] = []
-    note_tokens = {
-        token for token in re.findall(r"\w+", note.title.lower())
-        if len(token) >= 4 and token not in STOP_TOKENS
-    }
+    position = next((idx for idx, other in enumerate(notes) if other is note), None)
+    if corpus is None or position is None:
+        corpus = SimilarityCorpus.from_notes([*notes, note], AUDIT_WEIGHTS)
+        position = len(notes)
+
+    def strong_tokens(idx: int) -> set[str]:
+        return {
+            token for token in corpus.features[idx].tokens
+            if len(token) >= 4 and token not in STOP_TOKENS
+        }
+
+    note_tokens = strong_tokens(position)
 
-    for candidate in notes:
+    for idx, candidate in enumerate(notes):
         if candidate.path == note.path:
             continue
         if candidate.title in note.links:
@@ -61,22 +88,21 @@ def rank_related_candidates(
         if candidate.note_type == "moc":
             continue
 
-        candidate_tokens = {
-            token for token in re.findall(r"\w+", candidate.title.lower())
-            if len(token) >= 4 and token not in STOP_TOKENS
-        }
-        shared_tokens = note_tokens & candidate_tokens
+        shared_tokens = note_tokens & strong_tokens(idx)
         same_source = bool(note.source_doc) and note.source_doc == candidate.source_doc
-        if not shared_tokens and not same_source:
+        body_sim = body_neighbors.get(candidate.path, 0.0)
+        if not shared_tokens and not same_source and not body_sim:
             continue
 
-        score = score_similarity(note, candidate)
+        score = corpus.score(position, idx)
         if same_source:
             score += 0.08
         if shared_tokens:
             score += min(0.12, 0.04 * len(shared_tokens))
         if candidate.title in note.body:
             score += 0.05
+        if body_sim:
+            score += BODY_NEIGHBOR_WEIGHT * body_sim
         if score < threshold:
             continue
         ranked.append((score, candidate))
@@ -140,33 +166,61 @@ def main() -> None:
         action="store_true",
         help="Apply related-link fixes to the vault",
     )
+    parser.add_argument(
+        "--body-neighbors",
+        type=int,
+        default=0,
+        metavar="K",
+        help="Also consider the K nearest notes by body TF-IDF cosine (default: 0, off)",
+    )
+    parser.add_argument(
+        "--format",
+        choices=("json", "jsonl"),
+        default="json",
+        help="Output format: one JSON document (default) or one JSONL line per note "
+        "as it is processed, followed by a summary line",
+    )
     args = parser.parse_args()
 
     config = load_config(strict=True)
     vault_path = Path(config["vault"]["vault_path"])
-    notes = iter_notes(vault_path)
+    notes = iter_notes(
+        vault_path,
+        workers=resolve_workers(config),
+        use_processes=use_parse_processes(config),
+    )
 
-    targets = [note for note in notes if is_target_note(note, min_words=args.min_words)]
-    targets.sort(key=lambda note: (note.words, note.title))
-    targets = targets[:args.limit]
+    targets = heapq.nsmallest(
+        args.limit,
+        (note for note in notes if is_target_note(note, min_words=args.min_words)),
+        key=lambda note: (note.words, note.title),
+    )
 
+    corpus = SimilarityCorpus.from_notes(notes, AUDIT_WEIGHTS)
+    vectors = build_body_vectors(vault_path) if args.body_neighbors > 0 else None
     results: list[dict] = []
     modified = 0
-    for note in targets:
-        ranked = rank_related_candidates(
-            note,
-            notes,
-            threshold=args.threshold,
-            max_links=args.max_links,
-        )
-        related = [candidate for _, candidate in ranked]
-        if args.apply and not args.dry_run:
-            changed = apply_related_links(note, related)
-            if changed:
-                modified += 1
-
-        results.append(
-            {
+    with JsonlWriter() as writer:
+        for note in targets:
+            body_neighbors = (
+                {path: score for score, path in vectors.neighbors(note.path, args.body_neighbors)}
+                if vectors is not None else None
+            )
+            ranked = rank_related_candidates(
+                note,
+                notes,
+                threshold=args.threshold,
+                max_links=args.max_links,
+                corpus=corpus,
+                body_neighbors=body_neighbors,
+            )
+            related = [candidate for _, candidate in ranked]
+            if args.apply and not args.dry_run:
+                changed = apply_related_links(note, related)
+                if changed:
+                    modified += 1
+
+            record = {
                 "title": note.title,
                 "path": str(note.path),
                 "words": note.words,
@@ -176,13 +230,19 @@ def main() -> None:
                     for score, candidate in ranked
                 ],
             }
-        )
-
-    summary = {
-        "target_notes": len(targets),
-        "modified_notes": modified,
-        "dry_run": args.dry_run or not args.apply,
-    }
+            if args.format == "jsonl":
+                writer.write(record)
+            else:
+                results.append(record)
+
+        summary = {
+            "target_notes": len(targets),
+            "modified_notes": modified,
+            "dry_run": args.dry_run or not args.apply,
+        }
+        if args.format == "jsonl":
+            writer.write({"summary": summary})
+            return
     print(json.dumps({"summary": summary, "notes": results}, ensure_ascii=False, indent=2))
 
 
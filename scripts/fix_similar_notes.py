@@ -8,15 +8,18 @@ import os
 import re
 import sys
 import tempfile
+from collections import Counter
 from dataclasses import dataclass
 from datetime import date
 from difflib import SequenceMatcher
 from pathlib import Path
 
 try:
-    from scripts.config import PROJECT_ROOT, load_config
+    from scripts.config import (
+        PROJECT_ROOT, load_config, resolve_workers, telemetry_path, use_parse_processes,
+    )
     from scripts.atomize import extract_json, load_tags
-    from scripts.audit_vault import extract_wikilink_targets, score_similarity
+    from scripts.audit_vault import extract_wikilink_targets
     from scripts.dedup_vault import (
         CandidateGroup,
         VaultNote,
@@ -25,11 +28,16 @@ try:
         update_registry_after_merge,
         update_wikilinks,
     )
-    from scripts.rewrite_backend import call_rewriter
+    from scripts.rewrite_backend import call_rewriter, estimate_tokens, pack_batches
+    from scripts.telemetry import telemetry
+    from scripts.similarity import AUDIT_WEIGHTS, SimilarityCorpus, cached_pairs_above
+    from scripts.vault_index import VaultIndex
 except ModuleNotFoundError:
-    from config import PROJECT_ROOT, load_config
+    from config import (
+        PROJECT_ROOT, load_config, resolve_workers, telemetry_path, use_parse_processes,
+    )
     from atomize import extract_json, load_tags
-    from audit_vault import extract_wikilink_targets, score_similarity
+    from audit_vault import extract_wikilink_targets
     from dedup_vault import (
         CandidateGroup,
         VaultNote,
@@ -38,12 +46,19 @@ except ModuleNotFoundError:
         update_registry_after_merge,
         update_wikilinks,
     )
-    from rewrite_backend import call_rewriter
+    from rewrite_backend import call_rewriter, estimate_tokens, pack_batches
+    from telemetry import telemetry
+    from similarity import AUDIT_WEIGHTS, SimilarityCorpus, cached_pairs_above
+    from vault_index import VaultIndex
 
 
 REVIEWED_FIXES_PATH = PROJECT_ROOT / "similar_fix_reviewed.json"
 RELATED_HEADER = "## Related"
 SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?])\s+")
+# Token budget per backend call (prompt plus expected reply).
+FIX_BATCH_TOKENS = 16000
+# Reply allowance per pair: a merge comes back with a 150-600 word body.
+FIX_REPLY_TOKENS = 1000
 
 
 @dataclass
@@ -101,37 +116,42 @@ def find_unlinked_pairs(
     threshold: float,
     reviewed: list[dict],
     limit: int,
+    pair_cache: VaultIndex | None = None,
 ) -> list[PairCandidate]:
-    """Find high-similarity note pairs without direct wikilinks."""
+    """Find high-similarity note pairs without direct wikilinks.
+
+    With pair_cache, scores from earlier runs are reused (see
+    similarity.cached_pairs_above).
+    """
     reviewed_pairs = reviewed_set(reviewed)
     candidates: list[PairCandidate] = []
     pair_id = 0
 
-    for i in range(len(notes)):
-        for j in range(i + 1, len(notes)):
-            a, b = notes[i], notes[j]
-            score = score_similarity(
-                type("AuditNote", (), {"title": a.title, "tags": set(a.tags)})(),
-                type("AuditNote", (), {"title": b.title, "tags": set(b.tags)})(),
-            )
-            if score < threshold:
-                continue
-            if frozenset([a.title, b.title]) in reviewed_pairs:
-                continue
-            links_a = extract_links(a.body)
-            links_b = extract_links(b.body)
-            if b.title in links_a or a.title in links_b:
-                continue
-            candidates.append(PairCandidate(pair_id=pair_id, a=a, b=b, score=score))
-            pair_id += 1
+    corpus = SimilarityCorpus.from_notes(notes, AUDIT_WEIGHTS)
+    if pair_cache is not None:
+        scored, cache_stats = cached_pairs_above(corpus, threshold, pair_cache)
+        print(cache_stats.summary(), file=sys.stderr)
+    else:
+        scored = corpus.pairs_above(threshold)
+
+    links: dict[int, set[str]] = {}
+    for i, j, score in scored:
+        a, b = notes[i], notes[j]
+        if frozenset([a.title, b.title]) in reviewed_pairs:
+            continue
+        links_a = links.setdefault(i, extract_links(a.body))
+        links_b = links.setdefault(j, extract_links(b.body))
+        if b.title in links_a or a.title in links_b:
+            continue
+        candidates.append(PairCandidate(pair_id=pair_id, a=a, b=b, score=score))
+        pair_id += 1
 
     candidates.sort(key=lambda item: (-item.score, item.a.title, item.b.title))
     return candidates[:limit]
 
 
-def assemble_fix_prompt(pairs: list[PairCandidate], tags: list[str]) -> str:
-    """Build a prompt to decide merge vs link vs ignore for similar pairs."""
-    lines = [
+def _fix_prompt_header(tags: list[str]) -> list[str]:
+    return [
         "You are fixing an Obsidian vault with semantically similar notes.",
         "For each pair, decide one action:",
         '- "merge" if the two notes are practical duplicates and should become one rewritten canonical note',
@@ -150,26 +170,54 @@ def assemble_fix_prompt(pairs: list[PairCandidate], tags: list[str]) -> str:
         "",
     ]
 
-    for pair in pairs:
-        lines.append(f"## Pair {pair.pair_id}")
-        lines.append(f"Similarity score: {pair.score:.3f}")
-        for note in [pair.a, pair.b]:
-            words = note.body.split()
-            truncated = " ".join(words[:220])
-            if len(words) > 220:
-                truncated += " [...]"
-            lines.append(f"### {note.title}")
-            lines.append(f"Tags: {note.tags}")
-            lines.append(f"Source: {note.source_doc}")
-            lines.append("")
-            lines.append(truncated)
-            lines.append("")
-        lines.append("---")
+
+def _fix_pair_section(pair: PairCandidate) -> list[str]:
+    lines = [f"## Pair {pair.pair_id}", f"Similarity score: {pair.score:.3f}"]
+    for note in [pair.a, pair.b]:
+        words = note.body.split()
+        truncated = " ".join(words[:220])
+        if len(words) > 220:
+            truncated += " [...]"
+        lines.append(f"### {note.title}")
+        lines.append(f"Tags: {note.tags}")
+        lines.append(f"Source: {note.source_doc}")
         lines.append("")
+        lines.append(truncated)
+        lines.append("")
+    lines.append("---")
+    lines.append("")
+    return lines
+
 
+def assemble_fix_prompt(pairs: list[PairCandidate], tags: list[str]) -> str:
+    """Build a prompt to decide merge vs link vs ignore for similar pairs."""
+    lines = _fix_prompt_header(tags)
+    for pair in pairs:
+        lines.extend(_fix_pair_section(pair))
     return "\n".join(lines)
 
 
+def plan_fix_batches(
+    pairs: list[PairCandidate],
+    tags: list[str],
+    batch_tokens: int = FIX_BATCH_TOKENS,
+) -> list[list[PairCandidate]]:
+    """Pack pairs into as few fix prompts as fit batch_tokens each.
+
+    A pair costs its prompt section plus FIX_REPLY_TOKENS; the shared prompt
+    header is charged once per batch.
+    """
+    overhead = estimate_tokens("\n".join(_fix_prompt_header(tags)))
+    costs = [
+        estimate_tokens("\n".join(_fix_pair_section(pair))) + FIX_REPLY_TOKENS
+        for pair in pairs
+    ]
+    return [
+        [pairs[idx] for idx in batch]
+        for batch in pack_batches(costs, batch_tokens - overhead)
+    ]
+
+
 def append_related_link(content: str, target_title: str) -> str:
     """Append a wikilink to a related note if it is not already present."""
     wikilink = f"[[{target_title}]]"
@@ -209,16 +257,98 @@ def paragraph_similarity(a: str, b: str) -> float:
     return SequenceMatcher(None, a.strip().lower(), b.strip().lower()).ratio()
 
 
+def _paragraph_shingles(lower: str) -> set[tuple[str, int]]:
+    """Character trigrams of a paragraph as a set of (trigram, occurrence) tokens.
+
+    Numbering repeated trigrams turns the trigram multiset into a plain set, so
+    multiset intersection is set intersection.
+    """
+    seen: dict[str, int] = {}
+    tokens: set[tuple[str, int]] = set()
+    for i in range(len(lower) - 2):
+        gram = lower[i:i + 3]
+        seen[gram] = seen.get(gram, 0) + 1
+        tokens.add((gram, seen[gram]))
+    return tokens
+
+
+def _min_shared_shingles(total_length: int) -> int:
+    """Lower bound on shared trigrams for a pair with ratio >= 0.9.
+
+    With M matched characters in K matching blocks, the blocks contain at least
+    M - 2K shared trigrams, and K <= T - 2M + 1 for total length T. Since
+    ratio = 2M/T >= 0.9 means M >= 0.45T, at least 0.25T - 2 trigrams are
+    shared; the integer form below is slightly looser to absorb rounding.
+    """
+    return total_length // 4 - 3
+
+
 def merge_unique_paragraphs(a_body: str, b_body: str) -> list[str]:
-    """Keep unique paragraphs from both notes, preserving order."""
+    """Keep unique paragraphs from both notes, preserving order.
+
+    A paragraph is dropped when paragraph_similarity with any kept paragraph is
+    >= 0.9. Instead of comparing against every kept paragraph, exact lowercase
+    repeats are dropped by set lookup and candidates come from a trigram
+    prefix-filter index (rarest trigrams first). Each candidate must pass a
+    length bound, a shared-trigram count bound and the character-multiset
+    bound before ratio is computed, so the result is identical to the
+    all-pairs comparison.
+    """
+    texts = [
+        text for text in (p.strip() for p in [*a_body.split("\n\n"), *b_body.split("\n\n")])
+        if text
+    ]
+    lowers = [text.lower() for text in texts]
+    chars = [Counter(lower) for lower in lowers]
+    shingles = [_paragraph_shingles(lower) for lower in lowers]
+    frequency: dict[tuple[str, int], int] = {}
+    for tokens in shingles:
+        for token in tokens:
+            frequency[token] = frequency.get(token, 0) + 1
+
     merged: list[str] = []
-    for paragraph in [*a_body.split("\n\n"), *b_body.split("\n\n")]:
-        text = paragraph.strip()
-        if not text:
+    exact: set[str] = set()
+    kept: list[int] = []                                    # indexes into texts
+    postings: dict[tuple[str, int], list[int]] = {}
+
+    for idx, lower in enumerate(lowers):
+        if lower in exact:
             continue
-        if any(paragraph_similarity(text, existing) >= 0.9 for existing in merged):
+
+        # Any partner passes the 9/11 length bound, so T >= 20/11 * len
+        overlap = _min_shared_shingles(len(lower) * 20 // 11)
+        prefix = sorted(shingles[idx], key=lambda token: (frequency[token], token))
+        if overlap > 0:
+            prefix = prefix[:len(prefix) - overlap + 1]
+            found: set[int] = set()
+            for token in prefix:
+                found.update(postings.get(token, ()))
+            candidates = sorted(found)
+        else:
+            candidates = kept
+
+        duplicate = False
+        for other in candidates:
+            other_lower = lowers[other]
+            total = len(lower) + len(other_lower)
+            if 2.0 * min(len(lower), len(other_lower)) / total < 0.9:
+                continue
+            if len(shingles[idx] & shingles[other]) < _min_shared_shingles(total):
+                continue
+            # Same value as SequenceMatcher.quick_ratio(), without building the matcher
+            if 2.0 * sum((chars[idx] & chars[other]).values()) / total < 0.9:
+                continue
+            if SequenceMatcher(None, lower, other_lower).ratio() >= 0.9:
+                duplicate = True
+                break
+        if duplicate:
             continue
-        merged.append(text)
+
+        merged.append(texts[idx])
+        exact.add(lower)
+        kept.append(idx)
+        for token in prefix:
+            postings.setdefault(token, []).append(idx)
     return merged
 
 
@@ -332,19 +462,53 @@ def main() -> None:
         action="store_true",
         help="Apply merge/link actions to the vault",
     )
+    parser.add_argument(
+        "--no-pair-cache",
+        action="store_true",
+        help="Score every pair instead of reusing scores from the vault index",
+    )
+    parser.add_argument(
+        "--batch-tokens",
+        type=int,
+        default=FIX_BATCH_TOKENS,
+        metavar="N",
+        help="Token budget per backend call, prompt plus expected reply; pairs are "
+        f"packed to fit (default: {FIX_BATCH_TOKENS})",
+    )
+    parser.add_argument(
+        "--telemetry-summary",
+        action="store_true",
+        help="Print a per-call-site table of backend calls (latency, sizes, retries) "
+        "to stderr; calls are always logged to <staging_dir>/telemetry.jsonl",
+    )
     args = parser.parse_args()
 
     config = load_config(strict=True)
     vault_path = Path(config["vault"]["vault_path"])
+    telemetry.enable(telemetry_path(config))
     reviewed = load_reviewed()
     tags = load_tags()
-    notes = deep_scan_vault(vault_path)
-    pairs = find_unlinked_pairs(
-        notes,
-        threshold=args.threshold,
-        reviewed=reviewed,
-        limit=args.limit,
+    notes = deep_scan_vault(
+        vault_path,
+        workers=resolve_workers(config),
+        use_processes=use_parse_processes(config),
     )
+    if args.no_pair_cache:
+        pairs = find_unlinked_pairs(
+            notes,
+            threshold=args.threshold,
+            reviewed=reviewed,
+            limit=args.limit,
+        )
+    else:
+        with VaultIndex(vault_path) as index:
+            pairs = find_unlinked_pairs(
+                notes,
+                threshold=args.threshold,
+                reviewed=reviewed,
+                limit=args.limit,
+                pair_cache=index,
+            )
 
     if not pairs:
         print(json.dumps({"summary": {"candidate_pairs": 0}}, ensure_ascii=False, indent=2))
@@ -354,17 +518,37 @@ def main() -> None:
         resolved_backend = "deterministic"
         result = deterministic_fix_pairs(pairs)
     else:
-        prompt = assemble_fix_prompt(pairs, tags)
-        resolved_backend, raw = call_rewriter(
-            prompt,
-            backend=args.backend,
-            timeout_seconds=args.timeout_seconds,
-            project_root=PROJECT_ROOT,
-        )
-        try:
-            result = extract_json(raw)
-        except ValueError as e:
-            print(f"ERROR: Failed to parse backend response: {e}", file=sys.stderr)
+        batches = plan_fix_batches(pairs, tags, args.batch_tokens)
+        print(f"Packed {len(pairs)} pairs into {len(batches)} backend calls", file=sys.stderr)
+        result = {"pairs": []}
+        failed = 0
+        for number, batch in enumerate(batches, 1):
+            try:
+                resolved_backend, raw = call_rewriter(
+                    assemble_fix_prompt(batch, tags),
+                    backend=args.backend,
+                    timeout_seconds=args.timeout_seconds,
+                    project_root=PROJECT_ROOT,
+                    call_site="fix_similar_notes",
+                )
+            except RuntimeError as e:
+                failed += 1
+                print(
+                    f"ERROR: Backend call failed for batch {number}/{len(batches)}: {e}",
+                    file=sys.stderr,
+                )
+                continue
+            try:
+                result["pairs"].extend(extract_json(raw).get("pairs", []))
+            except ValueError as e:
+                failed += 1
+                print(
+                    f"ERROR: Failed to parse backend response for batch {number}/{len(batches)}: {e}",
+                    file=sys.stderr,
+                )
+        if args.telemetry_summary:
+            print(telemetry.summary(), file=sys.stderr)
+        if failed == len(batches):
             return
 
     summary = {
@@ -0,0 +1,255 @@
+"""json_stream.py — Incremental JSON scanner for streamed backend responses.
+
+JsonStream is fed response text as it arrives. It tracks the open
+structure (containers, object keys, array positions) without re-reading
+what it has already seen, hands back each complete element of a watched
+array (the atom plan's notes[] by default) as soon as its closing brace
+arrives, and can say exactly where a cut-off response stopped.
+
+Text before the first '{' or '[' (prose, a ```json fence) and anything after
+the top-level value closes is ignored.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from dataclasses import dataclass
+from typing import Any
+
+_STRUCTURAL_RE = re.compile(r'[{}\[\]",:]')
+_STRING_END_RE = re.compile(r'["\\]')
+_START_RE = re.compile(r"[{\[]")
+# A backslash escape cut off at the end of the text: "\" or "\u" plus up to 3 hex digits.
+_PARTIAL_ESCAPE_RE = re.compile(r"(?<!\\)(?:\\\\)*(\\(?:u[0-9a-fA-F]{0,3})?)$")
+
+PathPart = str | int
+
+
+def format_path(path: list[PathPart]) -> str:
+    """Render a path as in JavaScript, e.g. ["notes", 7, "body"] -> notes[7].body."""
+    out = ""
+    for part in path:
+        out += f"[{part}]" if isinstance(part, int) else (f".{part}" if out else part)
+    return out or "(root)"
+
+
+@dataclass
+class _Frame:
+    """One open container."""
+
+    kind: str  # "{" or "["
+    start: int  # offset of the opening bracket
+    path: tuple[PathPart, ...]  # path of this container from the root
+    boundary: int  # offset just after the last complete member
+    index: int = 0  # arrays: position of the current element
+    key: str | None = None  # objects: key of the current member, once read
+    expect_key: bool = True  # objects: next string is a key
+
+    def child_key(self) -> PathPart | None:
+        return self.index if self.kind == "[" else self.key
+
+
+class JsonStream:
+    """Scan a JSON document incrementally as text chunks arrive.
+
+    feed() returns the complete elements of the array at `watch` (a path of
+    keys/indices from the root) that finished in that chunk, parsed. After
+    the last chunk, `done` says whether the top-level value closed; `path()`
+    and repaired() describe and salvage a truncated document.
+    """
+
+    def __init__(self, watch: tuple[PathPart, ...] = ("notes",)) -> None:
+        self.watch = tuple(watch)
+        self.started = False
+        self.done = False
+        self.elements = 0
+        self._buf = ""
+        self._pos = 0
+        self._offset = 0  # where the JSON value starts in _buf
+        self._stack: list[_Frame] = []
+        self._string_start: int | None = None
+        self._string_is_key = False
+
+    @property
+    def text(self) -> str:
+        """The JSON text received so far, from the top-level opening bracket."""
+        if not self.started:
+            return ""
+        end = self._pos if self.done else len(self._buf)
+        return self._buf[self._offset:end]
+
+    @property
+    def truncated(self) -> bool:
+        """True if a JSON value started but has not closed."""
+        return self.started and not self.done
+
+    @property
+    def in_string(self) -> bool:
+        return self._string_start is not None
+
+    def path(self) -> list[PathPart]:
+        """Keys/indices of the innermost open value, e.g. ["notes", 7, "body"].
+
+        The last part is omitted while an object is between members (no key
+        read yet for the next one).
+        """
+        if not self._stack:
+            return []
+        top = self._stack[-1]
+        tail = top.child_key()
+        if top.kind == "{" and (top.expect_key or tail is None):
+            return list(top.path)
+        return [*top.path, tail]
+
+    def feed(self, chunk: str) -> list[Any]:
+        """Consume the next piece of text; return watched elements completed by it."""
+        return [element for _, element in self.feed_indexed(chunk)]
+
+    def feed_indexed(self, chunk: str) -> list[tuple[int, Any]]:
+        """feed(), with each element's position in the watched array."""
+        if self.done or not chunk:
+            return []
+        self._buf += chunk
+        completed: list[tuple[int, Any]] = []
+        if not self.started:
+            match = _START_RE.search(self._buf, self._pos)
+            if match is None:
+                self._pos = len(self._buf)
+                return completed
+            self.started = True
+            self._offset = match.start()
+            self._pos = match.start()
+
+        buf = self._buf
+        while not self.done:
+            if self._string_start is not None:
+                match = _STRING_END_RE.search(buf, self._pos)
+                if match is None:
+                    self._pos = len(buf)
+                    break
+                if match.group() == "\\":
+                    if match.end() >= len(buf):
+                        self._pos = match.start()  # escape split across chunks
+                        break
+                    self._pos = match.end() + 1
+                    continue
+                self._pos = match.end()
+                self._close_string()
+                continue
+
+            match = _STRUCTURAL_RE.search(buf, self._pos)
+            if match is None:
+                self._pos = len(buf)
+                break
+            char, at = match.group(), match.start()
+            self._pos = match.end()
+            top = self._stack[-1] if self._stack else None
+
+            if char == '"':
+                self._string_start = at
+                self._string_is_key = top is not None and top.kind == "{" and top.expect_key
+            elif char in "{[":
+                path = () if top is None else (*top.path, top.child_key())
+                self._stack.append(_Frame(char, at, path, at + 1))
+            elif char in "}]":
+                frame = self._stack.pop()
+                parent = self._stack[-1] if self._stack else None
+                if parent is None:
+                    self.done = True
+                    continue
+                parent.boundary = self._pos
+                if parent.kind == "[" and parent.path == self.watch and frame.kind == "{":
+                    try:
+                        completed.append((parent.index, json.loads(buf[frame.start:self._pos])))
+                    except json.JSONDecodeError:
+                        continue  # malformed element; left to the final parse
+                    self.elements += 1
+            elif char == ",":
+                if top is None:
+                    continue
+                top.boundary = at
+                if top.kind == "[":
+                    top.index += 1
+                else:
+                    top.key, top.expect_key = None, True
+            elif char == ":" and top is not None and top.kind == "{":
+                top.expect_key = False
+        return completed
+
+    def _close_string(self) -> None:
+        start, self._string_start = self._string_start, None
+        top = self._stack[-1] if self._stack else None
+        if top is None:
+            return
+        if self._string_is_key:
+            raw = self._buf[start:self._pos]
+            try:
+                top.key = json.loads(raw)
+            except json.JSONDecodeError:
+                top.key = raw[1:-1]  # invalid escape or control character: keep the raw text
+        else:
+            top.boundary = self._pos
+
+    def resume_offset(self) -> int:
+        """Length of the text a continuation can be appended to safely.
+
+        Inside a string value that is all of it, minus a cut-off escape
+        sequence; anywhere else it ends after the innermost container's last
+        complete member, dropping a half-written key or literal.
+        """
+        text = self.text
+        if self.in_string and not self._string_is_key:
+            match = _PARTIAL_ESCAPE_RE.search(text)
+            return match.start(1) if match else len(text)
+        if not self._stack:
+            return len(text)
+        return self._stack[-1].boundary - self._offset
+
+    def describe_position(self) -> str:
+        """Where the text stops, in words, for a continuation prompt."""
+        path = format_path(self.path())
+        if self.in_string and not self._string_is_key:
+            return f"inside the string value at {path}"
+        top = self._stack[-1] if self._stack else None
+        if top is None:
+            return "before the JSON value"
+        kind = "object" if top.kind == "{" else "array"
+        return f"inside the {kind} at {format_path(list(top.path))}, after its last complete member"
+
+    def closing_suffix(self) -> str:
+        """Characters that close every open string and container."""
+        suffix = '"' if self.in_string else ""
+        return suffix + "".join("}" if f.kind == "{" else "]" for f in reversed(self._stack))
+
+    def repaired(self) -> Any | None:
+        """Best-effort parse of a truncated document, or None.
+
+        First closes everything where the text stops (keeping a cut-off string
+        value such as a half-written body); if that is not valid JSON (dangling
+        key, half a literal), drops the unfinished member of the innermost
+        container and closes from its last complete member.
+        """
+        if not self.started:
+            return None
+        if self.done:
+            try:
+                return json.loads(self.text)
+            except json.JSONDecodeError:
+                return None
+        candidates = []
+        if not (self.in_string and self._string_is_key):
+            text = self.text
+            if not self.in_string:
+                text = text.rstrip(", :\n\r\t")
+            candidates.append(text + self.closing_suffix())
+        if self._stack:
+            top = self._stack[-1]
+            closers = "".join("}" if f.kind == "{" else "]" for f in reversed(self._stack))
+            candidates.append(self._buf[self._offset:top.boundary] + closers)
+        for candidate in candidates:
+            try:
+                return json.loads(candidate)
+            except json.JSONDecodeError:
+                continue
+        return None
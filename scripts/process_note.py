@@ -6,6 +6,7 @@ Usage:
     python3 scripts/process_note.py "Note.md" --mode atomize
     python3 scripts/process_note.py "Note.md" --dry-run
     python3 scripts/process_note.py "Note.md" --mode atomize --non-interactive --on-conflict skip
+    python3 scripts/process_note.py "Note.md" --refresh   # ignore the cached response
 
 Flow:
     1. Find note in vault (by title, filename, or absolute path)
@@ -29,26 +30,36 @@ from datetime import date
 from pathlib import Path
 
 try:
-    from scripts.config import PROJECT_ROOT, load_config as load_config_strict
+    from scripts.config import (
+        PROJECT_ROOT, load_config as load_config_strict, response_cache_dir, telemetry_path,
+    )
     from scripts.atomize import (
         extract_json, load_tags,
         validate_atom_plan, validate_tags, write_proposed_tags,
     )
-    from scripts.rewrite_backend import call_rewriter
+    from scripts.dedup_vault import update_wikilinks
+    from scripts.rewrite_backend import ResponseCache, call_rewriter
+    from scripts.telemetry import telemetry
     from scripts.generate_notes import render_note_md, sanitize_filename
-    from scripts.scan_vault import scan_vault
+    from scripts.scan_vault import iter_vault_files, scan_vault
+    from scripts.vault_index import VaultIndex
     from scripts.vault_writer import (
         get_vault_dest, load_registry, parse_frontmatter, save_registry,
     )
 except ModuleNotFoundError:
-    from config import PROJECT_ROOT, load_config as load_config_strict
+    from config import (
+        PROJECT_ROOT, load_config as load_config_strict, response_cache_dir, telemetry_path,
+    )
     from atomize import (
         extract_json, load_tags,
         validate_atom_plan, validate_tags, write_proposed_tags,
     )
-    from rewrite_backend import call_rewriter
+    from dedup_vault import update_wikilinks
+    from rewrite_backend import ResponseCache, call_rewriter
+    from telemetry import telemetry
     from generate_notes import render_note_md, sanitize_filename
-    from scan_vault import scan_vault
+    from scan_vault import iter_vault_files, scan_vault
+    from vault_index import VaultIndex
     from vault_writer import (
         get_vault_dest, load_registry, parse_frontmatter, save_registry,
     )
@@ -81,7 +92,8 @@ def find_note(query: str, config: dict) -> Path | None:
     2. Vault root
     3. notes_folder
     4. moc_folder
-    5. Recursive search by stem match
+    5. Stem lookup in the persistent vault index
+    6. Recursive search by stem match
     """
     # Absolute path
     query_path = Path(query)
@@ -101,15 +113,20 @@ def find_note(query: str, config: dict) -> Path | None:
         if candidate.exists():
             return candidate
 
-    # Recursive search by stem
+    # Index lookup by stem (no refresh; stale hits are re-checked on disk)
     stem = query.removesuffix(".md")
-    for md_file in vault_path.rglob("*.md"):
-        # Skip hidden/system dirs
-        rel_parts = md_file.relative_to(vault_path).parts
-        if any(part.startswith(".") for part in rel_parts):
-            continue
-        if md_file.stem == stem:
-            return md_file
+    with VaultIndex(vault_path) as index:
+        for md_file in index.paths_by_stem(stem):
+            rel_parts = md_file.relative_to(vault_path).parts
+            if any(part.startswith(".") for part in rel_parts):
+                continue
+            if md_file.exists():
+                return md_file
+
+    # Recursive search by stem (hidden/system dirs are pruned)
+    for entry in iter_vault_files(vault_path, skip_hidden=True):
+        if entry.name[:-len(".md")] == stem:
+            return Path(entry.path)
 
     return None
 
@@ -342,7 +359,13 @@ def write_enrich_result(
     original_path: Path,
     config: dict,
 ) -> None:
-    """Write enriched note back to vault."""
+    """Write enriched note back to vault.
+
+    When the title changes, the note is written to notes_folder as
+    sanitize_filename(title).md and the original is archived. Side effect:
+    every [[Old Title]] link anywhere in the vault is rewritten in place to
+    point at the new file's stem.
+    """
     note = result["note"]
     title = note["title"]
     original_title = note.get("original_title", title)
@@ -358,12 +381,16 @@ def write_enrich_result(
         print(f"  Updated in place: {original_path.name}", file=sys.stderr)
     else:
         # Title changed: new file in notes_folder, archive original
-        new_filename = sanitize_filename(title) + ".md"
+        new_stem = sanitize_filename(title)
         notes_folder.mkdir(parents=True, exist_ok=True)
-        dest = notes_folder / new_filename
+        dest = notes_folder / f"{new_stem}.md"
         dest.write_text(content, encoding="utf-8")
         print(f"  Created: {dest.name}", file=sys.stderr)
         archive_original(original_path, vault_path)
+        # Re-point backlinks; only notes that reference the old title are opened
+        updated = update_wikilinks(vault_path, {original_path.stem: new_stem})
+        if updated:
+            print(f"  Updated wikilinks in {updated} files", file=sys.stderr)
 
     # Update registry
     registry = load_registry()
@@ -494,11 +521,28 @@ def main() -> None:
         default=300,
         help="Timeout for each rewrite backend call (default: 300)",
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always call the rewrite backend; do not read or write the response cache",
+    )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Call the rewrite backend even on a cache hit and store the new response",
+    )
+    parser.add_argument(
+        "--telemetry-summary",
+        action="store_true",
+        help="Print a per-call-site table of backend calls (latency, sizes, retries) "
+        "to stderr; calls are always logged to <staging_dir>/telemetry.jsonl",
+    )
     args = parser.parse_args()
 
     # Load config
     config = load_config_strict()
     vault_path = Path(config["vault"]["vault_path"])
+    telemetry.enable(telemetry_path(config))
 
     # Step 1: Find the note
     print(f">> Finding note: {args.input}", file=sys.stderr)
@@ -571,16 +615,27 @@ def main() -> None:
 
     # Step 6: Call rewrite backend
     print(">> Calling rewrite backend...", file=sys.stderr)
+    cache = (
+        None if args.no_cache
+        else ResponseCache(response_cache_dir(config), refresh=args.refresh)
+    )
     try:
         resolved_backend, raw_response = call_rewriter(
             prompt,
             backend=args.backend,
             timeout_seconds=args.timeout_seconds,
             project_root=PROJECT_ROOT,
+            cache=cache,
+            call_site=f"process_note.{mode}",
         )
     except RuntimeError as e:
         print(f"ERROR: {e}", file=sys.stderr)
         sys.exit(1)
+    finally:
+        if cache is not None:
+            print(cache.summary(), file=sys.stderr)
+        if args.telemetry_summary:
+            print(telemetry.summary(), file=sys.stderr)
     print(f"  Rewrite backend: {resolved_backend}", file=sys.stderr)
 
     # Step 7: Extract and validate
@@ -10,25 +10,24 @@ from pathlib import Path
 
 try:
     from scripts.config import REGISTRY_PATH, load_config
-    from scripts.vault_writer import parse_frontmatter
+    from scripts.vault_index import load_indexed_notes
 except ModuleNotFoundError:
     from config import REGISTRY_PATH, load_config
-    from vault_writer import parse_frontmatter
+    from vault_index import load_indexed_notes
 
 
-def rebuild_registry(vault_path: Path) -> dict[str, dict]:
-    """Scan the vault and rebuild the processed registry from frontmatter."""
+def rebuild_registry(vault_path: Path, *, index_path: Path | None = None) -> dict[str, dict]:
+    """Scan the vault and rebuild the processed registry from frontmatter.
+
+    Reads from the persistent vault index, so system directories such as
+    .archive/ and .trash/ are not counted.
+    """
     grouped: dict[str, dict[str, object]] = defaultdict(
         lambda: {"source_doc": "", "date": "", "note_titles": []}
     )
 
-    for md_file in vault_path.rglob("*.md"):
-        try:
-            content = md_file.read_text(encoding="utf-8")
-        except OSError:
-            continue
-
-        frontmatter = parse_frontmatter(content)
+    for note in load_indexed_notes(vault_path, with_body=False, index_path=index_path):
+        frontmatter = note.frontmatter
         if not frontmatter:
             continue
 
@@ -36,18 +35,12 @@ def rebuild_registry(vault_path: Path) -> dict[str, dict]:
         if not isinstance(source_doc, str) or not source_doc.strip():
             continue
 
-        title = md_file.stem
-        for line in content.splitlines():
-            if line.startswith("# "):
-                title = line[2:].strip()
-                break
-
         entry = grouped[source_doc]
         entry["source_doc"] = source_doc
         date_val = frontmatter.get("date", "")
         if date_val and not entry["date"]:
             entry["date"] = str(date_val)
-        entry["note_titles"].append(title)
+        entry["note_titles"].append(note.title)
 
     registry: dict[str, dict] = {}
     for source_doc, entry in sorted(grouped.items()):
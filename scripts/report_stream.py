@@ -0,0 +1,88 @@
+"""report_stream.py — Streaming JSONL report output with bounded summaries.
+
+Used by the audit and fix scripts for ``--format jsonl``: records are written
+one per line as they are produced instead of being collected into one JSON
+document, and the sorted stdout summary is kept in fixed-size structures.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+from collections.abc import Callable
+from typing import Any, TextIO
+
+
+class TopN:
+    """Keep the n smallest items by key (e.g. best-scored first) in O(n) memory.
+
+    Items are buffered and the buffer is sorted and cut back to n whenever it
+    reaches 2n, so ties keep the earlier item exactly like a stable sort of
+    everything pushed.
+    """
+
+    def __init__(self, n: int, key: Callable[[Any], Any]) -> None:
+        self.n = max(0, n)
+        self.key = key
+        self.seen = 0
+        self._items: list[Any] = []
+
+    def push(self, item: Any) -> None:
+        self.seen += 1
+        if not self.n:
+            return
+        self._items.append(item)
+        if len(self._items) >= 2 * self.n:
+            self._trim()
+
+    def _trim(self) -> None:
+        self._items.sort(key=self.key)
+        del self._items[self.n:]
+
+    def items(self) -> list[Any]:
+        """Kept items in ascending key order."""
+        self._trim()
+        return list(self._items)
+
+
+class JsonlWriter:
+    """Write one JSON object per line to a file (atomically) or to stdout.
+
+    With a path, lines go to a temporary file next to it that replaces the
+    target only when the writer closes without an error.
+    """
+
+    def __init__(self, path: str | Path | None = None) -> None:
+        self.path = Path(path) if path else None
+        self.records = 0
+        self._tmp_path: str | None = None
+        self._stream: TextIO = sys.stdout
+
+    @property
+    def to_stdout(self) -> bool:
+        return self.path is None
+
+    def __enter__(self) -> JsonlWriter:
+        if self.path is not None:
+            fd, self._tmp_path = tempfile.mkstemp(
+                dir=self.path.parent, suffix=".tmp", prefix=self.path.stem
+            )
+            self._stream = os.fdopen(fd, "w", encoding="utf-8")
+        return self
+
+    def write(self, record: dict) -> None:
+        self._stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.records += 1
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if self._tmp_path is None:
+            self._stream.flush()
+            return
+        self._stream.close()
+        if exc_type is None:
+            os.replace(self._tmp_path, self.path)
+        else:
+            Path(self._tmp_path).unlink(missing_ok=True)
@@ -2,14 +2,154 @@
 
 from __future__ import annotations
 
+import atexit
+import codecs
+import hashlib
+import json
 import os
+import queue
 import re
 import subprocess
 import sys
 import tempfile
+import threading
 import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
 from pathlib import Path
 
+try:
+    from scripts.config import response_cache_dir
+    from scripts.json_stream import JsonStream
+    from scripts.telemetry import telemetry
+except ModuleNotFoundError:
+    from config import response_cache_dir
+    from json_stream import JsonStream
+    from telemetry import telemetry
+
+# Characters of the cut-off response quoted back in a continuation prompt.
+CONTINUATION_TAIL_CHARS = 1200
+# What the earlier tail-replay continuation quoted; kept for the savings metric.
+REPLAY_TAIL_CHARS = 8000
+# Shortest repeated prefix treated as overlap when splicing a continuation.
+MIN_OVERLAP_CHARS = 16
+# Shorter repeats of the kept tail, from this length up, are also tried as trims.
+SEAM_REPEAT_MIN_CHARS = 2
+# Characters a re-asked continuation must echo so that its seam is unambiguous.
+ANCHOR_CHARS = 40
+
+
+# ── Response cache ────────────────────────────────────────────────────────────
+
+# Bump when the stored entry format or the meaning of a key changes.
+CACHE_VERSION = 1
+
+
+class ResponseCache:
+    """Content-addressed on-disk cache of backend responses.
+
+    Entries are keyed by sha256 of prompt + backend + model tag, stored as one
+    JSON file each, and evicted by age (max_age_seconds) and by total size
+    (max_bytes, least recently used first). With refresh=True lookups always
+    miss, but fresh responses are still stored. Without root, the cache lives
+    at config.response_cache_dir() for the default staging dir; scripts pass
+    response_cache_dir(config) instead.
+    """
+
+    def __init__(
+        self,
+        root: Path | None = None,
+        *,
+        max_age_seconds: float = 14 * 24 * 3600,
+        max_bytes: int = 256 * 1024 * 1024,
+        refresh: bool = False,
+    ) -> None:
+        if root is None:
+            root = response_cache_dir({})
+        self.root = Path(root)
+        self.max_age_seconds = max_age_seconds
+        self.max_bytes = max_bytes
+        self.refresh = refresh
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(prompt: str, backend: str, model_tag: str = "") -> str:
+        digest = hashlib.sha256()
+        for part in (f"v{CACHE_VERSION}", backend, model_tag, prompt):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> str | None:
+        """Return the cached response, or None on a miss (or with refresh)."""
+        path = self._path(key)
+        response = None
+        if not self.refresh:
+            try:
+                if time.time() - path.stat().st_mtime <= self.max_age_seconds:
+                    response = json.loads(path.read_text(encoding="utf-8"))["response"]
+                    os.utime(path)  # recency for size-based eviction
+                else:
+                    path.unlink(missing_ok=True)
+            except (OSError, ValueError, KeyError, TypeError):
+                response = None
+        if response is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return response
+
+    def put(self, key: str, response: str, *, backend: str, model_tag: str = "") -> None:
+        """Store a response atomically, then evict expired and excess entries."""
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = json.dumps(
+            {"backend": backend, "model_tag": model_tag, "created": time.time(), "response": response},
+            ensure_ascii=False,
+        )
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp", prefix=key[:12])
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+        self.prune()
+
+    def prune(self) -> int:
+        """Drop entries older than max_age_seconds, then LRU entries over max_bytes."""
+        now = time.time()
+        entries: list[tuple[float, int, Path]] = []
+        removed = 0
+        for path in self.root.glob("*/*.json"):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            if now - st.st_mtime > self.max_age_seconds:
+                path.unlink(missing_ok=True)
+                removed += 1
+            else:
+                entries.append((st.st_mtime, st.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+        return removed
+
+    def summary(self) -> str:
+        return f"Response cache: {self.hits} hit(s), {self.misses} miss(es) in {self.root}"
+
 
 def detect_backend(explicit: str | None = None) -> str:
     """Resolve the active rewrite backend.
@@ -63,26 +203,586 @@ def looks_truncated(text: str) -> bool:
     return False
 
 
+# ── Token budgeting ───────────────────────────────────────────────────────────
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for budgeting prompts.
+
+    About 4 characters per token for ASCII text; Cyrillic and other
+    non-ASCII text splits into tokens roughly twice as fast.
+    """
+    ascii_chars = len(text.encode("ascii", "ignore"))
+    return ascii_chars // 4 + (len(text) - ascii_chars) // 2 + 1
+
+
+def pack_batches(costs: list[int], budget: int) -> list[list[int]]:
+    """Bin-pack item costs into as few batches of total cost <= budget as possible.
+
+    First-fit decreasing; returns item indices per batch, each batch in
+    input order and batches ordered by their first item. An item costing more
+    than the budget gets a batch of its own.
+    """
+    batches: list[list[int]] = []
+    loads: list[int] = []
+    for idx in sorted(range(len(costs)), key=lambda i: -costs[i]):
+        for b, load in enumerate(loads):
+            if load + costs[idx] <= budget:
+                batches[b].append(idx)
+                loads[b] += costs[idx]
+                break
+        else:
+            batches.append([idx])
+            loads.append(costs[idx])
+    for batch in batches:
+        batch.sort()
+    batches.sort()
+    return batches
+
+
+# ── Pre-started backend sessions ──────────────────────────────────────────────
+
+# Claude CLI in streaming mode: one JSON user message per stdin line, JSON
+# events on stdout, one "result" event per answered message.
+CLAUDE_SESSION_COMMAND = [
+    "claude", "--print",
+    "--input-format", "stream-json",
+    "--output-format", "stream-json",
+    "--include-partial-messages",
+    "--verbose",
+]
+
+
+class BackendSessionError(RuntimeError):
+    """A backend session died, misbehaved or returned an error result."""
+
+
+class BackendSession:
+    """One backend CLI process, started ahead of time, answering one prompt.
+
+    The process would keep its conversation, so it is never asked a second
+    prompt: unrelated prompts must not see each other's history. A session
+    that is still waiting is considered stale after idle_timeout seconds.
+    """
+
+    def __init__(
+        self,
+        command: list[str] | None = None,
+        *,
+        env: dict[str, str] | None = None,
+        idle_timeout: float = 300.0,
+    ) -> None:
+        self.command = list(command or CLAUDE_SESSION_COMMAND)
+        self.env = env
+        self.idle_timeout = idle_timeout
+        self.turns = 0
+        self.last_used = time.monotonic()
+        self._process: subprocess.Popen | None = None
+        self._lines: queue.Queue[str | None] = queue.Queue()
+        self._stderr = tempfile.TemporaryFile(mode="w+", encoding="utf-8")
+
+    def start(self) -> BackendSession:
+        self._process = subprocess.Popen(
+            self.command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=self._stderr,
+            text=True,
+            encoding="utf-8",
+            bufsize=1,
+            env=self.env,
+        )
+        threading.Thread(target=self._read_stdout, daemon=True).start()
+        self.last_used = time.monotonic()
+        return self
+
+    def _read_stdout(self) -> None:
+        for line in self._process.stdout:
+            self._lines.put(line)
+        self._lines.put(None)  # EOF
+
+    @property
+    def pid(self) -> int | None:
+        return self._process.pid if self._process else None
+
+    def healthy(self) -> bool:
+        """Process running, not idle past idle_timeout, and not yet asked."""
+        return (
+            self._process is not None
+            and self._process.poll() is None
+            and time.monotonic() - self.last_used <= self.idle_timeout
+            and self.turns == 0
+        )
+
+    def ask(
+        self,
+        prompt: str,
+        timeout_seconds: float,
+        on_text: Callable[[str], None] | None = None,
+    ) -> str:
+        """Send one prompt and return the text of its result event.
+
+        on_text, if given, receives the response text deltas as they stream in.
+
+        Raises subprocess.TimeoutExpired on timeout (the session is closed)
+        and BackendSessionError if the process exits or reports an error.
+        """
+        if self._process is None or self._process.poll() is not None:
+            raise BackendSessionError("backend session is not running")
+        if self.turns:
+            raise BackendSessionError("backend session already answered a prompt")
+        message = {"type": "user", "message": {"role": "user", "content": prompt}}
+        try:
+            self._process.stdin.write(json.dumps(message, ensure_ascii=False) + "\n")
+            self._process.stdin.flush()
+        except OSError as e:
+            raise BackendSessionError(f"backend session stdin closed: {e}") from None
+        self.turns += 1
+
+        deadline = time.monotonic() + timeout_seconds
+        while True:
+            try:
+                line = self._lines.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                self.close(timeout=0)
+                raise subprocess.TimeoutExpired(self.command, timeout_seconds) from None
+            if line is None:
+                self._process.wait()
+                self._stderr.seek(0)
+                raise BackendSessionError(
+                    f"backend session exited with code {self._process.returncode}: "
+                    f"{self._stderr.read()[-2000:]}"
+                )
+            try:
+                event = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if event.get("type") == "stream_event" and on_text is not None:
+                delta = event.get("event", {}).get("delta", {})
+                if delta.get("type") == "text_delta":
+                    on_text(delta.get("text", ""))
+            if event.get("type") != "result":
+                continue
+            self.last_used = time.monotonic()
+            if event.get("is_error"):
+                raise BackendSessionError(f"backend returned an error: {event.get('result', '')}")
+            return str(event.get("result", ""))
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Close stdin and wait for exit; kill the process if it lingers."""
+        process, self._process = self._process, None
+        if process is not None and process.poll() is None:
+            try:
+                process.stdin.close()
+                process.wait(timeout=timeout)
+            except (OSError, subprocess.TimeoutExpired):
+                process.kill()
+                process.wait()
+        self._stderr.close()
+
+
+class BackendPool:
+    """Pre-started Claude processes for up to `size` concurrent calls in one run.
+
+    Every session answers a single prompt and is then closed, so no
+    conversation is shared between prompts. What the pool saves is CLI
+    startup: it keeps up to `size` standby sessions already spawned, and
+    acquire() hands one out and immediately spawns its replacement, so the
+    next call's startup overlaps the current call. Stale or dead standbys
+    are closed on the way. close() shuts everything down; pools from
+    get_backend_pool() are also closed at interpreter exit.
+    """
+
+    def __init__(
+        self,
+        size: int = 1,
+        *,
+        command: list[str] | None = None,
+        env: dict[str, str] | None = None,
+        idle_timeout: float = 300.0,
+    ) -> None:
+        self.size = max(1, size)
+        self.command = command
+        self.env = env
+        self.idle_timeout = idle_timeout
+        self.started = 0
+        self._idle: list[BackendSession] = []
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _spawn(self) -> BackendSession:
+        session = BackendSession(self.command, env=self.env, idle_timeout=self.idle_timeout).start()
+        with self._lock:
+            self.started += 1
+        return session
+
+    def _refill(self) -> None:
+        """Spawn one standby session unless the pool already holds `size`."""
+        with self._lock:
+            if self._closed or len(self._idle) >= self.size:
+                return
+        standby = self._spawn()
+        with self._lock:
+            if not self._closed:
+                self._idle.append(standby)
+                return
+        standby.close()
+
+    @contextmanager
+    def acquire(self) -> Iterator[BackendSession]:
+        """Borrow a fresh session for one prompt; it is closed afterwards."""
+        self._slots.acquire()
+        session = None
+        try:
+            with self._lock:
+                if self._closed:
+                    raise BackendSessionError("backend pool is closed")
+                while self._idle and session is None:
+                    candidate = self._idle.pop(0)
+                    if candidate.healthy():
+                        session = candidate
+                    else:
+                        candidate.close()
+            if session is None:
+                session = self._spawn()
+            self._refill()
+            yield session
+        finally:
+            if session is not None:
+                session.close()
+            self._slots.release()
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for session in idle:
+            session.close()
+
+
+_POOLS: list[BackendPool] = []
+
+
+def get_backend_pool(size: int = 1, **kwargs) -> BackendPool:
+    """Create a pool of pre-started Claude sessions, shut down at interpreter exit."""
+    kwargs.setdefault("env", {k: v for k, v in os.environ.items() if k != "CLAUDECODE"})
+    pool = BackendPool(size, **kwargs)
+    _POOLS.append(pool)
+    return pool
+
+
+@atexit.register
+def shutdown_backend_pools() -> None:
+    """Close every pool created by get_backend_pool."""
+    while _POOLS:
+        _POOLS.pop().close()
+
+
+def run_streaming(
+    command: list[str],
+    prompt: str,
+    *,
+    env: dict[str, str] | None = None,
+    timeout_seconds: float,
+    on_text: Callable[[str], None] | None = None,
+) -> subprocess.CompletedProcess:
+    """subprocess.run(input=prompt, capture_output=True) that streams stdout.
+
+    Decoded stdout is passed to on_text as it arrives. Raises
+    subprocess.TimeoutExpired like subprocess.run; on that or any exception
+    from on_text the process is killed and reaped first.
+    """
+    process = subprocess.Popen(
+        command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=env
+    )
+    chunks: queue.Queue[bytes] = queue.Queue()
+    stderr: list[bytes] = []
+
+    def write_stdin() -> None:
+        try:
+            process.stdin.write(prompt.encode("utf-8"))
+            process.stdin.close()
+        except OSError:
+            pass  # process exited early; its exit code tells the story
+
+    def read_stdout() -> None:
+        while chunk := os.read(process.stdout.fileno(), 65536):
+            chunks.put(chunk)
+        chunks.put(b"")
+
+    def read_stderr() -> None:
+        stderr.append(process.stderr.read())
+
+    threads = [threading.Thread(target=fn, daemon=True) for fn in (write_stdin, read_stdout, read_stderr)]
+    for thread in threads:
+        thread.start()
+
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    parts: list[str] = []
+    deadline = time.monotonic() + timeout_seconds
+    try:
+        while True:
+            try:
+                chunk = chunks.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                raise subprocess.TimeoutExpired(command, timeout_seconds) from None
+            text = decoder.decode(chunk, final=not chunk)
+            if text:
+                parts.append(text)
+                if on_text is not None:
+                    on_text(text)
+            if not chunk:
+                break
+        returncode = process.wait()
+        threads[2].join()
+    finally:
+        # Timeout or a raising on_text: never leave the CLI running or unreaped
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        process.stdout.close()
+        process.stderr.close()
+    return subprocess.CompletedProcess(
+        command, returncode, "".join(parts), b"".join(stderr).decode("utf-8", "replace")
+    )
+
+
+def _run_claude(
+    prompt: str,
+    *,
+    env: dict[str, str],
+    timeout_seconds: int,
+    pool: BackendPool | None,
+    on_text: Callable[[str], None] | None = None,
+) -> subprocess.CompletedProcess:
+    """One Claude CLI round-trip, one-shot or through a pre-started session."""
+    if pool is None:
+        return run_streaming(
+            ["claude", "--print"],
+            prompt,
+            env=env,
+            timeout_seconds=timeout_seconds,
+            on_text=on_text,
+        )
+    try:
+        with pool.acquire() as session:
+            return subprocess.CompletedProcess(
+                session.command, 0, session.ask(prompt, timeout_seconds, on_text), ""
+            )
+    except BackendSessionError as e:
+        return subprocess.CompletedProcess(pool.command or CLAUDE_SESSION_COMMAND, 1, "", str(e))
+
+
+# ── Structural continuation ───────────────────────────────────────────────────
+
+
+@dataclass
+class ContinuationStats:
+    """Running totals for continuations of truncated JSON responses."""
+
+    requested: int = 0
+    spliced: int = 0         # continuation verified and joined on
+    rejected: int = 0        # continuation did not fit the open structure
+    ambiguous: int = 0       # seam fit more than one way; re-asked with an anchor
+    overlap_chars: int = 0   # repeated output trimmed at the seam
+    prompt_tokens_saved: int = 0  # vs quoting REPLAY_TAIL_CHARS back
+
+    def summary(self) -> str:
+        return (
+            f"Continuations: {self.spliced}/{self.requested} spliced, "
+            f"{self.rejected} rejected, {self.ambiguous} re-asked as ambiguous, "
+            f"{self.overlap_chars} overlapping chars trimmed, "
+            f"~{self.prompt_tokens_saved} prompt tokens saved"
+        )
+
+
+continuation_stats = ContinuationStats()
+
+
+@dataclass
+class CallStats:
+    """Attempts and continuations used by one call_claude invocation."""
+
+    attempts: int = 0
+    continuations: int = 0
+
+
+def _strip_fences(text: str) -> str:
+    text = re.sub(r"^\s*```(?:json)?[ \t]*\n?", "", text)
+    return re.sub(r"\n?```\s*$", "", text)
+
+
+def continuation_prompt(stream: JsonStream, *, anchor: int = 0) -> str:
+    """Ask for exactly the rest of a cut-off JSON document.
+
+    The prompt names the open position (e.g. inside notes[7].body), quotes the
+    last CONTINUATION_TAIL_CHARS up to the resume point and lists what is left
+    to close, so the reply is only the remainder. With anchor, the reply must
+    instead start by echoing the last `anchor` characters of the excerpt, which
+    splice_continuation(..., anchor=anchor) then trims exactly.
+    """
+    kept = stream.text[:stream.resume_offset()]
+    resume = JsonStream()
+    resume.feed(kept)
+    if anchor:
+        start = (
+            f"Begin by repeating the last {anchor} characters of this excerpt exactly, "
+            f"shown again between the markers: <<<{kept[-anchor:]}>>> (without the markers), "
+            "then output the text that comes next. Do not wrap it in code fences. "
+        )
+    else:
+        start = (
+            "Output ONLY the text that comes next, starting with the very next character "
+            "after this excerpt. Do not repeat any of it and do not wrap it in code fences. "
+        )
+    return (
+        "Your previous JSON response was cut off. It stops "
+        f"{resume.describe_position()}. The last characters were:\n\n"
+        f"```\n{kept[-CONTINUATION_TAIL_CHARS:]}\n```\n\n"
+        f"{start}Then finish the document; still open: {resume.closing_suffix()!r}."
+    )
+
+
+def _overlap(kept: str, continuation: str) -> int:
+    """Length of the longest end of kept that the continuation starts by repeating."""
+    window = kept[-CONTINUATION_TAIL_CHARS:]
+    probe = continuation[:MIN_OVERLAP_CHARS]
+    if len(probe) < MIN_OVERLAP_CHARS:
+        return 0
+    start = window.find(probe)
+    while start != -1:
+        if continuation.startswith(window[start:]):
+            return len(window) - start
+        start = window.find(probe, start + 1)
+    return 0
+
+
+def _seam_repeat(kept: str, continuation: str) -> int:
+    """Length of a short end of kept (under MIN_OVERLAP_CHARS) the continuation starts with."""
+    longest = min(MIN_OVERLAP_CHARS - 1, len(kept), len(continuation))
+    for size in range(longest, SEAM_REPEAT_MIN_CHARS - 1, -1):
+        if continuation.startswith(kept[-size:]):
+            return size
+    return 0
+
+
+class AmbiguousSplice(ValueError):
+    """A continuation fits the kept prefix both with and without trimming a repeat."""
+
+
+def _splice(kept: str, continuation: str, trimmed: int) -> str | None:
+    """kept + continuation[trimmed:] if that is a JSON document or a well-formed prefix of one."""
+    spliced = kept + continuation[trimmed:]
+    stream = JsonStream()
+    try:
+        stream.feed(spliced)
+    except ValueError:
+        return None
+    if stream.done:
+        try:
+            json.loads(stream.text)
+        except json.JSONDecodeError:
+            return None
+        return stream.text
+    if stream.truncated and stream.repaired() is not None:
+        return spliced
+    return None
+
+
+def splice_continuation(
+    kept: str,
+    continuation: str,
+    *,
+    anchor: int = 0,
+) -> tuple[str, int] | None:
+    """Join a continuation onto the kept prefix at a verified boundary.
+
+    Strips code fences, then tries the continuation as is and with any repeat
+    of the end of kept it starts with trimmed off. Returns (spliced text,
+    chars trimmed) if exactly one of those is a complete JSON document or
+    still a well-formed prefix of one, and None if none is. If several are,
+    an echo cannot be told from content that genuinely repeats (a list item,
+    a phrase in a body) and AmbiguousSplice is raised; the caller re-asks
+    with an anchor. With anchor, the continuation must start with the last
+    `anchor` characters of kept, echoed on request, and exactly those are
+    trimmed.
+    """
+    continuation = _strip_fences(continuation)
+    if anchor:
+        if not continuation.startswith(kept[-anchor:]):
+            return None
+        spliced = _splice(kept, continuation, anchor)
+        return None if spliced is None else (spliced, anchor)
+    if not continuation.strip() or continuation.lstrip().startswith(kept[:MIN_OVERLAP_CHARS]):
+        return None  # empty, or the model started the document over
+    trims = dict.fromkeys((0, _overlap(kept, continuation), _seam_repeat(kept, continuation)))
+    fits = []
+    for trimmed in trims:
+        spliced = _splice(kept, continuation, trimmed)
+        if spliced is not None:
+            fits.append((spliced, trimmed))
+    if len(fits) > 1:
+        raise AmbiguousSplice(f"continuation fits with {sorted(t for _, t in fits)} chars trimmed")
+    return fits[0] if fits else None
+
+
 def call_claude(
     prompt: str,
     *,
     max_retries: int = 3,
     max_continuations: int = 2,
     timeout_seconds: int = 300,
+    pool: BackendPool | None = None,
+    on_note: Callable[[dict, int], None] | None = None,
+    stats: CallStats | None = None,
 ) -> str:
-    """Call Claude CLI with the assembled prompt, return stdout."""
+    """Call Claude CLI with the assembled prompt, return stdout.
+
+    With a BackendPool, attempts and continuations each go to a pre-started
+    session instead of a `claude --print` process started for the call.
+    Output is scanned by a JsonStream as it arrives: on_note gets each complete notes[] entry and
+    its index straight away (again on a retry, so it must be idempotent), and a
+    response whose JSON is still open when the stream ends is continued:
+    the continuation prompt names the open path and asks only for the
+    remainder, which is spliced on at the last safe boundary once it is
+    verified to fit; a seam that fits more than one way is asked for again
+    with an anchor to echo (see splice_continuation and continuation_stats).
+    stats, if given, is updated with the attempts and continuations used.
+    """
     clean_env = {k: v for k, v in os.environ.items() if k != "CLAUDECODE"}
+    stats = stats if stats is not None else CallStats()
+
+    def ask_continuation(cont_prompt: str) -> subprocess.CompletedProcess | None:
+        """One continuation request; None if it failed or came back empty."""
+        continuation_stats.requested += 1
+        stats.continuations += 1
+        try:
+            cont_result = _run_claude(
+                cont_prompt, env=clean_env, timeout_seconds=timeout_seconds, pool=pool
+            )
+        except subprocess.TimeoutExpired:
+            debug_path = write_debug_prompt(cont_prompt, "claude-continuation-timeout")
+            raise RuntimeError(
+                "Claude CLI continuation timed out after "
+                f"{timeout_seconds}s. Prompt saved to {debug_path}"
+            ) from None
+        if cont_result.returncode != 0 or not cont_result.stdout.strip():
+            return None
+        return cont_result
 
     for attempt in range(1, max_retries + 1):
+        stats.attempts = attempt
+        stream = JsonStream()
+
+        def scan(text: str) -> None:
+            for index, note in stream.feed_indexed(text):
+                if on_note is not None:
+                    on_note(note, index)
+
         try:
-            result = subprocess.run(
-                ["claude", "--print"],
-                input=prompt,
-                capture_output=True,
-                text=True,
-                encoding="utf-8",
-                env=clean_env,
-                timeout=timeout_seconds,
+            result = _run_claude(
+                prompt, env=clean_env, timeout_seconds=timeout_seconds, pool=pool, on_text=scan
             )
         except subprocess.TimeoutExpired:
             debug_path = write_debug_prompt(prompt, "claude-timeout")
@@ -92,44 +792,73 @@ def call_claude(
 
         if result.returncode == 0:
             response = result.stdout.strip()
+            if not stream.started:
+                scan(response)  # no text deltas (e.g. a session without partials)
 
             for cont in range(max_continuations):
-                if not looks_truncated(response):
+                truncated = stream.truncated if stream.started else looks_truncated(response)
+                if not truncated:
                     break
                 print(
                     f"  Truncated response detected (continuation {cont + 1}/{max_continuations})...",
                     file=sys.stderr,
                 )
-                tail = response[-8000:]
-                cont_prompt = (
-                    "Your previous response was truncated. Here is the end of what you produced:\n\n"
-                    f"```\n{tail}\n```\n\n"
-                    "Continue outputting the JSON from EXACTLY where you stopped. "
-                    "Output ONLY the remaining JSON, no commentary."
-                )
-                try:
-                    cont_result = subprocess.run(
-                        ["claude", "--print"],
-                        input=cont_prompt,
-                        capture_output=True,
-                        text=True,
-                        encoding="utf-8",
-                        env=clean_env,
-                        timeout=timeout_seconds,
+                if stream.started:
+                    cont_prompt = continuation_prompt(stream)
+                else:
+                    cont_prompt = (
+                        "Your previous response was truncated. Here is the end of what you produced:\n\n"
+                        f"```\n{response[-REPLAY_TAIL_CHARS:]}\n```\n\n"
+                        "Continue from EXACTLY where you stopped. Output ONLY the remainder, no commentary."
                     )
-                except subprocess.TimeoutExpired:
-                    debug_path = write_debug_prompt(cont_prompt, "claude-continuation-timeout")
-                    raise RuntimeError(
-                        "Claude CLI continuation timed out after "
-                        f"{timeout_seconds}s. Prompt saved to {debug_path}"
-                    ) from None
-                if cont_result.returncode == 0 and cont_result.stdout.strip():
-                    continuation = cont_result.stdout.strip()
-                    continuation = re.sub(r"^```(?:json)?\s*", "", continuation)
-                    continuation = re.sub(r"\s*```$", "", continuation)
+                cont_result = ask_continuation(cont_prompt)
+                if cont_result is None:
+                    break
+                if not stream.started:
+                    continuation = _strip_fences(cont_result.stdout.strip())
                     response += continuation
-                else:
+                    scan(continuation)
+                    continue
+
+                kept = stream.text[:stream.resume_offset()]
+                try:
+                    spliced = splice_continuation(kept, cont_result.stdout)
+                except AmbiguousSplice as e:
+                    continuation_stats.ambiguous += 1
+                    print(
+                        f"  Ambiguous continuation seam ({e}); asking again with an anchor",
+                        file=sys.stderr,
+                    )
+                    anchor = min(ANCHOR_CHARS, len(kept))
+                    cont_result = ask_continuation(continuation_prompt(stream, anchor=anchor))
+                    spliced = None if cont_result is None else splice_continuation(
+                        kept, cont_result.stdout, anchor=anchor
+                    )
+                if spliced is None:
+                    continuation_stats.rejected += 1
+                    print(
+                        "  WARNING: Continuation did not fit the open JSON structure; keeping "
+                        "the truncated response",
+                        file=sys.stderr,
+                    )
                     break
+                response, trimmed = spliced
+                saved = estimate_tokens(stream.text[-REPLAY_TAIL_CHARS:]) - estimate_tokens(
+                    kept[-CONTINUATION_TAIL_CHARS:]
+                )
+                continuation_stats.spliced += 1
+                continuation_stats.overlap_chars += trimmed
+                continuation_stats.prompt_tokens_saved += saved
+                print(
+                    f"  Spliced continuation: +{len(response) - len(kept)} chars, "
+                    f"{trimmed} overlapping chars trimmed, ~{saved} prompt tokens saved",
+                    file=sys.stderr,
+                )
+                emitted = stream.elements
+                stream = JsonStream()
+                for count, (index, note) in enumerate(stream.feed_indexed(response)):
+                    if count >= emitted and on_note is not None:
+                        on_note(note, index)
 
             return response
 
@@ -215,17 +944,132 @@ def call_codex(
     return response
 
 
+def _is_complete_json(response: str) -> bool:
+    """True if the response holds a JSON value that closes and parses."""
+    stream = JsonStream()
+    try:
+        stream.feed(response)
+    except ValueError:
+        return False
+    return stream.done and stream.repaired() is not None
+
+
+def _replay_notes(response: str, on_note: Callable[[dict, int], None] | None) -> None:
+    """Hand the notes[] entries of a finished response, with their indexes, to on_note."""
+    if on_note is not None:
+        for index, note in JsonStream().feed_indexed(response):
+            on_note(note, index)
+
+
 def call_rewriter(
     prompt: str,
     *,
     backend: str = "auto",
     timeout_seconds: int = 300,
     project_root: Path | None = None,
+    cache: ResponseCache | None = None,
+    model_tag: str | None = None,
+    pool: BackendPool | None = None,
+    on_note: Callable[[dict, int], None] | None = None,
+    call_site: str = "",
 ) -> tuple[str, str]:
-    """Call the selected rewrite backend and return (backend, response)."""
+    """Call the selected rewrite backend and return (backend, response).
+
+    With a ResponseCache, a stored response for the same prompt, backend and
+    model tag is returned without calling the backend; only replies holding a
+    complete, parseable JSON value are stored. model_tag defaults to
+    $OBSIDIAN_DATAWEAVE_MODEL_TAG; change it when switching models so old
+    responses are not replayed. A BackendPool pre-starts Claude processes so
+    calls skip CLI startup; Codex has no streaming session mode and always
+    runs `codex exec`.
+    on_note receives each complete notes[] entry of the response and its
+    index: while it streams for Claude, after the call for Codex and cache hits.
+
+    Every call is recorded in telemetry.telemetry under call_site, with its
+    duration, prompt/response bytes, cache outcome, attempts and
+    continuations, including calls that fail.
+    """
     resolved = detect_backend(backend)
+    if resolved not in {"claude", "codex"}:
+        raise ValueError(f"Unsupported rewrite backend: {resolved}")
+
+    if model_tag is None:
+        model_tag = os.environ.get("OBSIDIAN_DATAWEAVE_MODEL_TAG", "")
+    entry = {
+        "ts": time.time(),
+        "call_site": call_site or "unknown",
+        "backend": resolved,
+        "model_tag": model_tag,
+        "cache": "off" if cache is None else ("refresh" if cache.refresh else "miss"),
+        "prompt_bytes": len(prompt.encode("utf-8")),
+        "response_bytes": 0,
+        "attempts": 0,
+        "continuations": 0,
+        "ok": False,
+    }
+    stats = CallStats()
+    started = time.monotonic()
+    try:
+        response = _call_backend(
+            prompt, resolved,
+            timeout_seconds=timeout_seconds, project_root=project_root, cache=cache,
+            model_tag=model_tag, pool=pool, on_note=on_note, stats=stats, entry=entry,
+        )
+        entry.update(ok=True, response_bytes=len(response.encode("utf-8")))
+        return resolved, response
+    except Exception as e:
+        entry["error"] = f"{type(e).__name__}: {str(e)[:200]}"
+        raise
+    finally:
+        entry.update(
+            duration_s=round(time.monotonic() - started, 3),
+            attempts=stats.attempts,
+            continuations=stats.continuations,
+        )
+        telemetry.record(entry)
+
+
+def _call_backend(
+    prompt: str,
+    resolved: str,
+    *,
+    timeout_seconds: int,
+    project_root: Path | None,
+    cache: ResponseCache | None,
+    model_tag: str,
+    pool: BackendPool | None,
+    on_note: Callable[[dict, int], None] | None,
+    stats: CallStats,
+    entry: dict,
+) -> str:
+    """Cache lookup, backend call and cache store for call_rewriter."""
+    key = ""
+    if cache is not None:
+        key = cache.key(prompt, resolved, model_tag)
+        cached = cache.get(key)
+        if cached is not None:
+            print(f"  Response cache hit ({key[:12]})", file=sys.stderr)
+            entry["cache"] = "hit"
+            _replay_notes(cached, on_note)
+            return cached
+        reason = "refresh" if cache.refresh else "miss"
+        print(f"  Response cache {reason} ({key[:12]}), calling {resolved}...", file=sys.stderr)
+
     if resolved == "claude":
-        return resolved, call_claude(prompt, timeout_seconds=timeout_seconds)
-    if resolved == "codex":
-        return resolved, call_codex(prompt, timeout_seconds=timeout_seconds, project_root=project_root)
-    raise ValueError(f"Unsupported rewrite backend: {resolved}")
+        response = call_claude(
+            prompt, timeout_seconds=timeout_seconds, pool=pool, on_note=on_note, stats=stats
+        )
+    else:
+        stats.attempts = 1
+        response = call_codex(prompt, timeout_seconds=timeout_seconds, project_root=project_root)
+        _replay_notes(response, on_note)
+
+    if cache is not None:
+        if not _is_complete_json(response):
+            print(f"  Response not cached ({key[:12]}): no complete JSON value", file=sys.stderr)
+            return response
+        try:
+            cache.put(key, response, backend=resolved, model_tag=model_tag)
+        except OSError as e:
+            print(f"WARNING: Could not write response cache: {e}", file=sys.stderr)
+    return response
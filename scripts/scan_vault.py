@@ -9,7 +9,9 @@ Diagnostics go to stderr.
 
 import argparse
 import json
+import os
 import sys
+from collections.abc import Iterator
 from pathlib import Path
 
 try:
@@ -26,6 +28,51 @@ def load_config() -> dict:
     return _load_config(strict=True)
 
 
+def iter_vault_files(
+    root: Path,
+    *,
+    suffix: str = ".md",
+    skip_dirs: set[str] | frozenset[str] = SKIP_DIRS,
+    skip_hidden: bool = False,
+) -> Iterator[os.DirEntry]:
+    """Walk root with os.scandir and yield DirEntry objects for matching files.
+
+    Directories named in skip_dirs (or starting with "." when skip_hidden is set)
+    are pruned before they are entered, so large .git or .smart-env trees are
+    never listed. Symlinked directories are not followed, matching Path.rglob.
+    Callers can use entry.stat() without an extra path lookup.
+    """
+    stack = [os.fspath(root)]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                entries = list(it)
+        except OSError:
+            continue
+        for entry in entries:
+            name = entry.name
+            if skip_hidden and name.startswith("."):
+                continue
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if name not in skip_dirs:
+                        stack.append(entry.path)
+                    continue
+                if name.endswith(suffix) and entry.is_file():
+                    yield entry
+            except OSError:
+                continue
+
+
+def relative_posix(entry: os.DirEntry, root: Path) -> str:
+    """Return entry's path relative to root with forward slashes."""
+    prefix = os.path.join(os.fspath(root), "")
+    path = entry.path
+    rel = path[len(prefix):] if path.startswith(prefix) else os.path.relpath(path, root)
+    return rel if os.sep == "/" else rel.replace(os.sep, "/")
+
+
 def scan_vault(vault_path: Path, exclude: set[str] | None = None) -> dict:
     """Recursively scan vault for .md files.
 
@@ -48,21 +95,16 @@ def scan_vault(vault_path: Path, exclude: set[str] | None = None) -> dict:
     titles: list[str] = []
     notes_by_folder: dict[str, list[str]] = {}
 
-    for md_file in vault_path.rglob("*.md"):
-        # Skip files in excluded directories
-        if any(part in SKIP_DIRS for part in md_file.relative_to(vault_path).parts):
-            continue
-
+    for entry in iter_vault_files(vault_path):
         # Skip explicitly excluded files
-        if md_file.name in exclude:
+        if entry.name in exclude:
             continue
 
-        title = md_file.stem
+        title = entry.name[:-len(".md")]
         titles.append(title)
 
         # Group by relative parent folder
-        rel_parent = md_file.parent.relative_to(vault_path)
-        folder_key = str(rel_parent) if str(rel_parent) != "." else "."
+        folder_key = os.path.dirname(relative_posix(entry, vault_path)) or "."
         if folder_key not in notes_by_folder:
             notes_by_folder[folder_key] = []
         notes_by_folder[folder_key].append(title)
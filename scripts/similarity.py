@@ -0,0 +1,524 @@
+"""similarity.py — Shared scoring primitives for the vault similarity scorers.
+
+Tags come from the small, fixed taxonomy in tags.yaml (plus the odd proposed
+tag), so every distinct tag gets one bit and a note's tag set becomes a Python
+int. Tag Jaccard is then an AND, an OR and two popcounts, and one note can be
+scored against many notes in a single pass over a list of masks.
+
+Title features (lowercase string, word tokens, character counts) are cached per
+title, and bounded_title_score skips SequenceMatcher.ratio() when the length or
+character-multiset upper bound already keeps a weighted score below threshold.
+
+SimilarityCorpus ties these together: it precomputes features once per note and
+answers pairs_above / top_k / score for the dedup, audit and fix scorers.
+cached_pairs_above adds a persistent pair-score cache (see VaultIndex) so that
+repeated runs only score pairs that involve new or changed notes.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import heapq
+import re
+from collections import Counter
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from difflib import SequenceMatcher
+from functools import lru_cache
+
+
+class TagEncoder:
+    """Assign one bit per distinct tag and encode tag collections as int masks.
+
+    Bits are handed out on first sight, so masks are only comparable when they
+    come from the same encoder.
+    """
+
+    def __init__(self, tags: Iterable[str] = ()) -> None:
+        self._bits: dict[str, int] = {}
+        for tag in tags:
+            self.bit(tag)
+
+    def __len__(self) -> int:
+        return len(self._bits)
+
+    def bit(self, tag: str) -> int:
+        bit = self._bits.get(tag)
+        if bit is None:
+            bit = self._bits[tag] = 1 << len(self._bits)
+        return bit
+
+    def encode(self, tags: Iterable[str]) -> int:
+        mask = 0
+        for tag in tags:
+            mask |= self.bit(tag)
+        return mask
+
+
+_ENCODER = TagEncoder()
+
+
+def tag_mask(tags: Iterable[str]) -> int:
+    """Encode tags with the process-wide encoder shared by all scorers."""
+    return _ENCODER.encode(tags)
+
+
+def tag_jaccard(a: int, b: int) -> float:
+    """Jaccard similarity of two tag masks (0.0 when both are empty)."""
+    union = (a | b).bit_count()
+    return (a & b).bit_count() / union if union else 0.0
+
+
+def tag_jaccard_many(mask: int, masks: Iterable[int]) -> list[float]:
+    """Jaccard similarity of one tag mask against each mask in masks."""
+    scores: list[float] = []
+    for other in masks:
+        union = (mask | other).bit_count()
+        scores.append((mask & other).bit_count() / union if union else 0.0)
+    return scores
+
+
+# ── Title features and threshold-aware ratio ──────────────────────────────────
+
+
+@dataclass(frozen=True)
+class TitleFeatures:
+    lower: str
+    tokens: frozenset[str]      # \w+ tokens of the lowercase title
+    chars: Counter              # character multiset, for the quick_ratio bound
+
+
+@lru_cache(maxsize=65536)
+def title_features(title: str) -> TitleFeatures:
+    """Lowercase string, token set and character counts of a title (cached)."""
+    lower = title.lower()
+    return TitleFeatures(lower, frozenset(re.findall(r"\w+", lower)), Counter(lower))
+
+
+def token_jaccard(a: frozenset[str], b: frozenset[str]) -> float:
+    """Jaccard similarity of two token sets (0.0 when both are empty)."""
+    union = len(a | b)
+    return len(a & b) / union if union else 0.0
+
+
+@dataclass
+class PruneStats:
+    """How many bounded_title_score calls stopped at each stage."""
+
+    length: int = 0     # pruned by the length bound (real_quick_ratio)
+    quick: int = 0      # pruned by the character multiset bound (quick_ratio)
+    scored: int = 0     # needed the full SequenceMatcher.ratio()
+
+    @property
+    def pruned(self) -> int:
+        return self.length + self.quick
+
+    @property
+    def total(self) -> int:
+        return self.pruned + self.scored
+
+
+def bounded_title_score(
+    a: TitleFeatures,
+    b: TitleFeatures,
+    threshold: float,
+    score: Callable[[float], float],
+    stats: PruneStats | None = None,
+) -> float | None:
+    """Return score(SequenceMatcher(None, a, b).ratio()), or None below threshold.
+
+    score maps the title ratio to the caller's weighted total and must be
+    non-decreasing. It is first evaluated on the length bound and the character
+    multiset bound (the values of real_quick_ratio and quick_ratio, both >= the
+    ratio); if either keeps the score under threshold the expensive ratio is
+    skipped. Returned scores are bit-identical to the unbounded computation.
+    """
+    total = len(a.lower) + len(b.lower)
+    if not total:
+        result = score(1.0)  # SequenceMatcher treats two empty strings as equal
+        return result if result >= threshold else None
+    if score(2.0 * min(len(a.lower), len(b.lower)) / total) < threshold:
+        if stats is not None:
+            stats.length += 1
+        return None
+    if score(2.0 * sum((a.chars & b.chars).values()) / total) < threshold:
+        if stats is not None:
+            stats.quick += 1
+        return None
+    if stats is not None:
+        stats.scored += 1
+    result = score(SequenceMatcher(None, a.lower, b.lower).ratio())
+    return result if result >= threshold else None
+
+
+# ── Precomputed corpus ────────────────────────────────────────────────────────
+
+
+@dataclass(frozen=True)
+class SimilarityWeights:
+    """Weights of the title ratio, tag Jaccard and title-token Jaccard signals."""
+
+    title: float
+    tags: float
+    tokens: float = 0.0
+
+
+# dedup_vault.compute_similarity
+DEDUP_WEIGHTS = SimilarityWeights(title=0.5, tags=0.3, tokens=0.2)
+# audit_vault.score_similarity (also used by fix_similar_notes and fix_atomic_notes)
+AUDIT_WEIGHTS = SimilarityWeights(title=0.7, tags=0.3)
+
+
+class SimilarityCorpus:
+    """Title/tag features of a list of notes, computed once and scored by index.
+
+    Scores are asymmetric in the same way as SequenceMatcher: score(i, j)
+    compares title i against title j. Every query returns floats identical to
+    the straightforward per-pair formula.
+    """
+
+    def __init__(
+        self,
+        titles: list[str],
+        masks: list[int],
+        weights: SimilarityWeights = DEDUP_WEIGHTS,
+        hashes: list[str] | None = None,
+    ) -> None:
+        self.titles = titles
+        self.masks = masks
+        self.weights = weights
+        self.hashes = hashes    # feature_hash per note; needed by cached_pairs_above
+        self.features = [title_features(title) for title in titles]
+        self._postings: dict[bool, dict[tuple[str, str], list[int]]] = {}
+
+    @classmethod
+    def from_notes(cls, notes, weights: SimilarityWeights = DEDUP_WEIGHTS) -> SimilarityCorpus:
+        """Build a corpus from objects with .title and .tags attributes."""
+        return cls(
+            [note.title for note in notes],
+            [tag_mask(note.tags) for note in notes],
+            weights,
+            [feature_hash(note.title, note.tags) for note in notes],
+        )
+
+    def __len__(self) -> int:
+        return len(self.titles)
+
+    # ── Scoring ────────────────────────────────────────────────────────────────
+
+    def _score_fn(self, a: int, b: int, tag_sim: float) -> Callable[[float], float]:
+        weights = self.weights
+        token_sim = (
+            token_jaccard(self.features[a].tokens, self.features[b].tokens)
+            if weights.tokens else 0.0
+        )
+        return lambda title_sim: (
+            weights.title * title_sim + weights.tags * tag_sim + weights.tokens * token_sim
+        )
+
+    def score(self, a: int, b: int) -> float:
+        """Weighted similarity of notes a and b."""
+        score_fn = self._score_fn(a, b, tag_jaccard(self.masks[a], self.masks[b]))
+        return score_fn(
+            SequenceMatcher(None, self.features[a].lower, self.features[b].lower).ratio()
+        )
+
+    def score_at_least(
+        self,
+        a: int,
+        b: int,
+        threshold: float,
+        *,
+        tag_sim: float | None = None,
+        stats: PruneStats | None = None,
+    ) -> float | None:
+        """score(a, b) if it is >= threshold, otherwise None (ratio skipped when possible)."""
+        if tag_sim is None:
+            tag_sim = tag_jaccard(self.masks[a], self.masks[b])
+        return bounded_title_score(
+            self.features[a],
+            self.features[b],
+            threshold,
+            self._score_fn(a, b, tag_sim),
+            stats,
+        )
+
+    # ── Candidate generation ───────────────────────────────────────────────────
+
+    def _keys(self, idx: int, with_chars: bool) -> set[tuple[str, str]]:
+        features = self.features[idx]
+        keys: set[tuple[str, str]] = set()
+        if self.weights.tags:
+            mask = self.masks[idx]
+            while mask:
+                low = mask & -mask
+                keys.add(("tag", str(low.bit_length())))
+                mask ^= low
+        if self.weights.tokens:
+            keys.update(("token", token) for token in features.tokens)
+        if with_chars:
+            keys.update(("char", ch) for ch in features.lower)
+            if not features.lower:
+                keys.add(("char", ""))  # two empty titles have ratio 1.0
+        return keys
+
+    def candidates(self, idx: int, threshold: float) -> set[int]:
+        """Indexes j != idx whose pair with idx can possibly score >= threshold.
+
+        A pair sharing no tag and no title token scores at most weights.title
+        (both Jaccard terms are 0), so above that only pairs sharing a tag or
+        token need scoring. At or below it the ratio alone may qualify, and a
+        positive ratio needs a shared character, so title characters are keys too.
+        """
+        if threshold <= 0:
+            return set(range(len(self.titles))) - {idx}
+        with_chars = threshold <= self.weights.title
+        postings = self._postings.get(with_chars)
+        if postings is None:
+            postings = self._postings[with_chars] = {}
+            for other in range(len(self.titles)):
+                for key in self._keys(other, with_chars):
+                    postings.setdefault(key, []).append(other)
+        found: set[int] = set()
+        for key in self._keys(idx, with_chars):
+            found.update(postings[key])
+        found.discard(idx)
+        return found
+
+    # ── Queries ────────────────────────────────────────────────────────────────
+
+    def pairs_above(
+        self,
+        threshold: float,
+        *,
+        rows: Iterable[int] | None = None,
+        stats: PruneStats | None = None,
+    ) -> list[tuple[int, int, float]]:
+        """Return (i, j, score) for every i < j with score(i, j) >= threshold.
+
+        Results are in (i, j) order, exactly as a double loop over all pairs
+        would produce them. rows restricts i (e.g. to one shard of the scan).
+        """
+        return list(self.iter_pairs_above(threshold, rows=rows, stats=stats))
+
+    def iter_pairs_above(
+        self,
+        threshold: float,
+        *,
+        rows: Iterable[int] | None = None,
+        stats: PruneStats | None = None,
+    ) -> Iterator[tuple[int, int, float]]:
+        """Generator form of pairs_above, for consumers that stream results."""
+        for i in rows if rows is not None else range(len(self.titles)):
+            partners = sorted(j for j in self.candidates(i, threshold) if j > i)
+            tag_sims = tag_jaccard_many(self.masks[i], (self.masks[j] for j in partners))
+            for j, tag_sim in zip(partners, tag_sims):
+                score = self.score_at_least(i, j, threshold, tag_sim=tag_sim, stats=stats)
+                if score is not None:
+                    yield i, j, score
+
+    def top_k(self, idx: int, k: int, *, threshold: float = 0.0) -> list[tuple[float, int]]:
+        """Best k (score, j) for note idx against all other notes, highest first.
+
+        Ties are broken by index. Once k results are held, the k-th best score
+        becomes the pruning threshold, so most ratios are never computed.
+        """
+        if k <= 0:
+            return []
+        heap: list[tuple[float, int]] = []   # min-heap of (score, -j)
+        floor = threshold
+        for j in range(len(self.titles)):
+            if j == idx:
+                continue
+            score = self.score_at_least(idx, j, floor)
+            if score is None:
+                continue
+            item = (score, -j)
+            if len(heap) < k:
+                heapq.heappush(heap, item)
+            elif item > heap[0]:
+                heapq.heapreplace(heap, item)
+            if len(heap) == k:
+                floor = max(threshold, heap[0][0])
+        return [(score, -neg_j) for score, neg_j in sorted(heap, reverse=True)]
+
+
+# ── Persistent pair-score cache ───────────────────────────────────────────────
+
+# Bump when scoring changes in a way the weights do not capture.
+SCORER_VERSION = 1
+
+
+def feature_hash(title: str, tags: Iterable[str]) -> str:
+    """Hash of exactly what the corpus scorers read: the title and the tag set."""
+    payload = "\x00".join([title, *sorted(set(map(str, tags)))])
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def scorer_key(weights: SimilarityWeights) -> str:
+    return f"v{SCORER_VERSION}:{weights.title}/{weights.tags}/{weights.tokens}"
+
+
+@dataclass
+class PairCacheStats:
+    cached_pairs: int = 0   # pairs of already-scored notes, answered from the cache
+    scored_pairs: int = 0   # pairs involving a new or changed note
+    stored: int = 0         # new rows written (pairs at or above the floor)
+    evicted: int = 0        # rows dropped because a note disappeared or changed
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.cached_pairs + self.scored_pairs
+        return self.cached_pairs / total if total else 1.0
+
+    def summary(self) -> str:
+        return (
+            f"Pair cache: {self.hit_rate:.1%} hit rate "
+            f"({self.cached_pairs} cached, {self.scored_pairs} scored, "
+            f"{self.stored} stored, {self.evicted} evicted)"
+        )
+
+
+# Below this many new or changed notes a process pool costs more than it saves.
+PARALLEL_MIN_FRESH = 200
+
+_fresh_state: tuple[SimilarityCorpus, set[int], float] | None = None
+
+
+def _score_fresh(
+    corpus: SimilarityCorpus,
+    rows: Iterable[int],
+    fresh: set[int],
+    floor: float,
+) -> dict[tuple[str, str], tuple[float, float] | None]:
+    """Both orientations of every candidate pair of rows (fresh notes), by hash pair.
+
+    None marks a pair scoring below floor both ways. Pairs of two fresh notes
+    are visited from the higher index only; identical-features pairs are left
+    to the caller.
+    """
+    hashes = corpus.hashes
+    new_rows: dict[tuple[str, str], tuple[float, float] | None] = {}
+    for idx in rows:
+        for other in corpus.candidates(idx, floor):
+            if (other in fresh and other < idx) or hashes[other] == hashes[idx]:
+                continue    # visited from the other side, or an identical-features pair
+            lo_pos, hi_pos = (idx, other) if hashes[idx] <= hashes[other] else (other, idx)
+            key = (hashes[lo_pos], hashes[hi_pos])
+            if key in new_rows:
+                continue
+            forward = corpus.score_at_least(lo_pos, hi_pos, floor)
+            backward = corpus.score_at_least(hi_pos, lo_pos, floor)
+            if forward is None and backward is None:
+                new_rows[key] = None
+            else:
+                new_rows[key] = (
+                    forward if forward is not None else corpus.score(lo_pos, hi_pos),
+                    backward if backward is not None else corpus.score(hi_pos, lo_pos),
+                )
+    return new_rows
+
+
+def _init_fresh_worker(
+    titles: list[str],
+    masks: list[int],
+    weights: SimilarityWeights,
+    hashes: list[str],
+    fresh: list[int],
+    floor: float,
+) -> None:
+    global _fresh_state
+    _fresh_state = (SimilarityCorpus(titles, masks, weights, hashes), set(fresh), floor)
+
+
+def _score_fresh_shard(rows: list[int]) -> dict[tuple[str, str], tuple[float, float] | None]:
+    corpus, fresh, floor = _fresh_state
+    return _score_fresh(corpus, rows, fresh, floor)
+
+
+def cached_pairs_above(
+    corpus: SimilarityCorpus,
+    threshold: float,
+    cache,
+    *,
+    workers: int = 1,
+) -> tuple[list[tuple[int, int, float]], PairCacheStats]:
+    """corpus.pairs_above(threshold), reusing scores persisted in cache.
+
+    cache is an open VaultIndex. Scores are stored per unordered pair of
+    feature hashes, in both orientations (SequenceMatcher is not symmetric),
+    for every pair reaching the cache floor. The floor is the lowest threshold
+    seen so far; asking for a lower one rebuilds the cache. Only pairs that
+    involve a note whose hash is not yet scored are computed; hashes of notes
+    that no longer exist are evicted first. With workers > 1 (and enough new
+    notes) those pairs are scored in a process pool. Results match pairs_above
+    exactly.
+    """
+    hashes = corpus.hashes
+    if hashes is None:
+        raise ValueError("cached_pairs_above needs a corpus built with feature hashes")
+
+    scorer = scorer_key(corpus.weights)
+    stats = PairCacheStats()
+    floor, scored = cache.pair_cache_state(scorer)
+    if floor is None or threshold < floor:
+        floor = threshold
+        cache.pair_cache_reset(scorer, floor)
+        scored = set()
+    else:
+        stats.evicted = cache.pair_cache_evict(scorer, set(hashes))
+        scored &= set(hashes)
+
+    positions: dict[str, list[int]] = {}
+    for idx, hash_ in enumerate(hashes):
+        positions.setdefault(hash_, []).append(idx)
+    fresh = [idx for idx, hash_ in enumerate(hashes) if hash_ not in scored]
+    known = len(hashes) - len(fresh)
+    stats.cached_pairs = known * (known - 1) // 2
+    stats.scored_pairs = len(hashes) * (len(hashes) - 1) // 2 - stats.cached_pairs
+
+    def expand(lo: str, hi: str, lo_hi: float, hi_lo: float) -> Iterator[tuple[int, int, float]]:
+        # score(i, j) is the lo->hi orientation when note i carries the lo hash
+        for a in positions.get(lo, ()):
+            for b in positions.get(hi, ()):
+                i, j = min(a, b), max(a, b)
+                score = lo_hi if hashes[i] == lo else hi_lo
+                if score >= threshold:
+                    yield i, j, score
+
+    result: list[tuple[int, int, float]] = []
+    # Notes with identical features (e.g. same stem in two folders) are scored
+    # directly: it is one cheap ratio per group and never cached.
+    for group in positions.values():
+        if len(group) > 1:
+            score = corpus.score(group[0], group[1])
+            if score >= threshold:
+                result.extend(
+                    (i, j, score) for pos, i in enumerate(group) for j in group[pos + 1:]
+                )
+
+    for lo, hi, lo_hi, hi_lo in cache.pair_cache_rows(scorer):
+        result.extend(expand(lo, hi, lo_hi, hi_lo))
+
+    if workers <= 1 or len(fresh) < PARALLEL_MIN_FRESH:
+        new_rows = _score_fresh(corpus, fresh, set(fresh), floor)
+    else:
+        # Strided shards: low indexes skip fewer fresh partners, so this balances load
+        shards = [fresh[k::workers * 4] for k in range(workers * 4)]
+        new_rows = {}
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_fresh_worker,
+            initargs=(corpus.titles, corpus.masks, corpus.weights, hashes, fresh, floor),
+        ) as pool:
+            for shard_rows in pool.map(_score_fresh_shard, shards):
+                new_rows.update(shard_rows)
+
+    stored = [(lo, hi, *row) for (lo, hi), row in new_rows.items() if row is not None]
+    for row in stored:
+        result.extend(expand(*row))
+    stats.stored = len(stored)
+    cache.pair_cache_store(scorer, stored, {hashes[idx] for idx in fresh})
+    result.sort()
+    return result, stats
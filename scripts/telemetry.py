@@ -0,0 +1,116 @@
+"""telemetry.py — Backend call telemetry: JSONL sink and per-call-site summaries.
+
+call_rewriter records one entry per backend call into the module-level
+`telemetry` sink: call site, backend, cache outcome, duration, prompt and
+response bytes, attempts and continuations. Scripts point the sink at
+<staging_dir>/telemetry.jsonl with telemetry.enable(); telemetry_report.py
+aggregates such files.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import sys
+import threading
+from pathlib import Path
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Nearest-rank percentile (q in 0-100) of a non-empty list."""
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize_calls(records: list[dict]) -> list[dict]:
+    """One row per call site: counts, p50/p95 latency, bytes, retries, continuations."""
+    by_site: dict[str, list[dict]] = {}
+    for record in records:
+        by_site.setdefault(record.get("call_site") or "unknown", []).append(record)
+
+    rows = []
+    for site, calls in sorted(by_site.items()):
+        durations = [float(call.get("duration_s", 0.0)) for call in calls]
+        rows.append({
+            "call_site": site,
+            "calls": len(calls),
+            "errors": sum(1 for call in calls if not call.get("ok", True)),
+            "cache_hits": sum(1 for call in calls if call.get("cache") == "hit"),
+            "p50_s": round(percentile(durations, 50), 3),
+            "p95_s": round(percentile(durations, 95), 3),
+            "total_s": round(sum(durations), 3),
+            "prompt_kb": round(sum(call.get("prompt_bytes", 0) for call in calls) / 1024, 1),
+            "response_kb": round(sum(call.get("response_bytes", 0) for call in calls) / 1024, 1),
+            "retries": sum(max(0, call.get("attempts", 1) - 1) for call in calls),
+            "continuations": sum(call.get("continuations", 0) for call in calls),
+        })
+    return rows
+
+
+SUMMARY_COLUMNS = (
+    "call_site", "calls", "errors", "cache_hits", "p50_s", "p95_s", "total_s",
+    "prompt_kb", "response_kb", "retries", "continuations",
+)
+
+
+def format_summary(rows: list[dict]) -> str:
+    """Plain-text table of summarize_calls() rows."""
+    table = [list(SUMMARY_COLUMNS)] + [[str(row[col]) for col in SUMMARY_COLUMNS] for row in rows]
+    widths = [max(len(line[k]) for line in table) for k in range(len(SUMMARY_COLUMNS))]
+    lines = [
+        "  ".join(cell.ljust(width) if k == 0 else cell.rjust(width)
+                  for k, (cell, width) in enumerate(zip(line, widths)))
+        for line in table
+    ]
+    lines.insert(1, "  ".join("-" * width for width in widths))
+    return "\n".join(lines)
+
+
+def load_records(path: Path) -> list[dict]:
+    """Read a telemetry JSONL file, skipping blank or corrupt lines."""
+    records = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return records
+
+
+class TelemetrySink:
+    """Collect call records in memory and, once enabled, append them to JSONL.
+
+    Each record is one line written with a single append, so concurrent calls
+    (parallel batches and chunks) and separate runs can share a file.
+    """
+
+    def __init__(self) -> None:
+        self.path: Path | None = None
+        self.records: list[dict] = []
+        self._lock = threading.Lock()
+
+    def enable(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def record(self, entry: dict) -> None:
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        with self._lock:
+            self.records.append(entry)
+            if self.path is None:
+                return
+            try:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(line)
+            except OSError as e:
+                print(f"WARNING: Telemetry disabled, cannot write {self.path}: {e}", file=sys.stderr)
+                self.path = None  # telemetry must never fail a run
+
+    def summary(self) -> str:
+        """Summary table of the calls recorded in this process."""
+        return format_summary(summarize_calls(self.records))
+
+
+telemetry = TelemetrySink()
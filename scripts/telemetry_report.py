@@ -0,0 +1,75 @@
+"""telemetry_report.py — Summarize backend call telemetry per call site.
+
+Usage:
+    python3 scripts/telemetry_report.py [telemetry.jsonl ...] [--since HOURS]
+                                        [--format table|json]
+
+Reads <staging_dir>/telemetry.jsonl by default and prints one row per call
+site: calls, errors, cache hits, p50/p95/total latency, prompt and response
+size, retries and continuations.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+try:
+    from scripts.config import load_config, telemetry_path
+    from scripts.telemetry import format_summary, load_records, summarize_calls
+except ModuleNotFoundError:
+    from config import load_config, telemetry_path
+    from telemetry import format_summary, load_records, summarize_calls
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Aggregate backend call telemetry (p50/p95 latency per call site)."
+    )
+    parser.add_argument(
+        "paths",
+        nargs="*",
+        type=Path,
+        help="Telemetry JSONL files (default: <staging_dir>/telemetry.jsonl)",
+    )
+    parser.add_argument(
+        "--since",
+        type=float,
+        metavar="HOURS",
+        help="Only include calls from the last HOURS hours",
+    )
+    parser.add_argument(
+        "--format",
+        choices=("table", "json"),
+        default="table",
+        help="Output a text table (default) or JSON rows",
+    )
+    args = parser.parse_args()
+
+    paths = args.paths or [telemetry_path(load_config())]
+    records: list[dict] = []
+    for path in paths:
+        if not path.exists():
+            print(f"WARNING: Telemetry file not found: {path}", file=sys.stderr)
+            continue
+        records.extend(load_records(path))
+    if args.since is not None:
+        cutoff = time.time() - args.since * 3600
+        records = [record for record in records if record.get("ts", 0) >= cutoff]
+
+    if not records:
+        print("No backend calls recorded.", file=sys.stderr)
+        sys.exit(0)
+
+    rows = summarize_calls(records)
+    if args.format == "json":
+        print(json.dumps(rows, ensure_ascii=False, indent=2))
+    else:
+        print(format_summary(rows))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,546 @@
+"""vault_index.py — Persistent incremental index of vault notes.
+
+The index is a SQLite file stored beside processed.json. Each row is keyed by the
+note's path relative to the vault root and remembers the (mtime, size) pair it was
+parsed from, so a refresh only re-reads and re-parses files that changed since the
+previous run. Scanners read title, frontmatter, tags, word count, outgoing
+wikilinks, content hash and body from the index instead of walking and parsing
+the whole vault on every command.
+
+A reverse-link table (target title -> source notes) is maintained alongside, so
+wikilink rewrites only open the files that actually reference a title. A small
+key/value cache table lets callers persist derived data (e.g. MinHash
+signatures) keyed by note content hash, and a pair-score table remembers
+similarity scores between note feature hashes across runs.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import sqlite3
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+try:
+    from scripts.config import INDEX_PATH
+    from scripts.scan_vault import iter_vault_files, relative_posix
+    from scripts.vault_writer import parse_frontmatter
+except ModuleNotFoundError:
+    from config import INDEX_PATH
+    from scan_vault import iter_vault_files, relative_posix
+    from vault_writer import parse_frontmatter
+
+# Bump when the parsed columns change so stale rows are re-parsed.
+SCHEMA_VERSION = "2"
+
+WIKILINK_RE = re.compile(r"\[\[([^\]]+)\]\]")
+
+# Tables derived from note rows, here or by other modules (body_index.py);
+# emptied together with the notes when the index is reset.
+DERIVED_TABLES = ("cache", "pair_scores", "pair_scored", "body_docs", "body_terms")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS notes (
+    rel_path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    stem TEXT NOT NULL,
+    title TEXT NOT NULL,
+    frontmatter TEXT NOT NULL,
+    tags TEXT NOT NULL,
+    word_count INTEGER NOT NULL,
+    links TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    body TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS notes_stem ON notes (stem);
+CREATE TABLE IF NOT EXISTS links (
+    source TEXT NOT NULL,
+    target TEXT NOT NULL,
+    PRIMARY KEY (source, target)
+);
+CREATE INDEX IF NOT EXISTS links_target ON links (target);
+CREATE TABLE IF NOT EXISTS cache (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value BLOB NOT NULL,
+    PRIMARY KEY (namespace, key)
+);
+CREATE TABLE IF NOT EXISTS pair_scores (
+    scorer TEXT NOT NULL,
+    hash_lo TEXT NOT NULL,
+    hash_hi TEXT NOT NULL,
+    score_lo_hi REAL NOT NULL,
+    score_hi_lo REAL NOT NULL,
+    PRIMARY KEY (scorer, hash_lo, hash_hi)
+);
+CREATE INDEX IF NOT EXISTS pair_scores_hi ON pair_scores (scorer, hash_hi);
+CREATE TABLE IF NOT EXISTS pair_scored (
+    scorer TEXT NOT NULL,
+    hash TEXT NOT NULL,
+    PRIMARY KEY (scorer, hash)
+);
+"""
+
+
+def extract_wikilink_targets(text: str) -> set[str]:
+    """Extract normalized wikilink targets, ignoring aliases and headings."""
+    targets: set[str] = set()
+    for raw in WIKILINK_RE.findall(text):
+        target = raw.split("|", 1)[0].split("#", 1)[0].strip()
+        if target:
+            targets.add(target)
+    return targets
+
+
+@dataclass
+class IndexedNote:
+    path: Path
+    rel_path: str
+    stem: str
+    title: str          # first H1 heading, falling back to the file stem
+    frontmatter: dict
+    tags: list
+    word_count: int
+    links: list[str]
+    content_hash: str
+    body: str
+    mtime_ns: int
+    size: int
+
+
+@dataclass
+class RefreshStats:
+    added: int = 0
+    updated: int = 0
+    removed: int = 0
+    unchanged: int = 0
+
+    @property
+    def parsed(self) -> int:
+        return self.added + self.updated
+
+
+def _string_keys(value):
+    """Copy of parsed YAML with every mapping key as a string (JSON objects need them)."""
+    if isinstance(value, dict):
+        return {str(key): _string_keys(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_string_keys(item) for item in value]
+    return value
+
+
+def parse_note_text(text: str, stem: str) -> dict:
+    """Parse raw note text into the columns stored in the index.
+
+    Frontmatter is only recognised when the note starts with a ``---`` block;
+    otherwise the whole text is the body.
+    """
+    frontmatter: dict = {}
+    body = text.strip()
+    if text.startswith("---"):
+        parts = text.split("---", 2)
+        if len(parts) >= 3:
+            frontmatter = parse_frontmatter(text)
+            body = parts[2].strip()
+
+    title = stem
+    for line in text.splitlines():
+        if line.startswith("# "):
+            title = line[2:].strip()
+            break
+
+    tags = frontmatter.get("tags", [])
+    if not isinstance(tags, list):
+        tags = []
+
+    return {
+        "title": title,
+        # YAML dates and other scalars, as values or keys, are stored as strings
+        "frontmatter": json.dumps(_string_keys(frontmatter), ensure_ascii=False, default=str),
+        "tags": json.dumps(tags, ensure_ascii=False, default=str),
+        "word_count": len(body.split()),
+        "links": json.dumps(sorted(extract_wikilink_targets(body)), ensure_ascii=False),
+        # Reverse-link rows cover the whole file, frontmatter included
+        "link_targets": sorted(extract_wikilink_targets(text)),
+        "content_hash": hashlib.sha1(text.encode("utf-8")).hexdigest(),
+        "body": body,
+    }
+
+
+def _read_text(path: Path) -> str | None:
+    try:
+        return path.read_text(encoding="utf-8")
+    except (OSError, UnicodeDecodeError):
+        return None
+
+
+def _read_and_parse(path: Path) -> dict | None:
+    text = _read_text(path)
+    return None if text is None else parse_note_text(text, path.stem)
+
+
+def _parse_loaded(item: tuple[str | None, str]) -> dict | None:
+    text, stem = item
+    return None if text is None else parse_note_text(text, stem)
+
+
+def load_parsed_notes(
+    paths: list[Path],
+    *,
+    workers: int = 1,
+    use_processes: bool = False,
+) -> list[dict | None]:
+    """Read and parse notes, optionally in parallel.
+
+    With workers > 1, files are read (and parsed) on a thread pool; with
+    use_processes, reading stays on threads and YAML parsing moves to a process
+    pool. Results always follow the order of paths; unreadable files yield None.
+    """
+    if workers <= 1 or len(paths) < 2:
+        return [_read_and_parse(path) for path in paths]
+
+    if not use_processes:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(_read_and_parse, paths))
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        texts = list(pool.map(_read_text, paths))
+    chunksize = max(1, len(paths) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(
+            _parse_loaded, zip(texts, (path.stem for path in paths)), chunksize=chunksize,
+        ))
+
+
+class VaultIndex:
+    """SQLite-backed note index for a single vault.
+
+    Usage:
+        with VaultIndex(vault_path) as index:
+            index.refresh()
+            notes = index.notes()
+    """
+
+    def __init__(self, vault_path: Path, index_path: Path | None = None) -> None:
+        self.vault_path = Path(vault_path)
+        self.index_path = Path(index_path) if index_path is not None else INDEX_PATH
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.index_path), timeout=30)
+        self.conn.executescript(_SCHEMA)
+        self._check_meta()
+
+    def __enter__(self) -> VaultIndex:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def _check_meta(self) -> None:
+        """Drop all rows if the index was built for another vault or schema.
+
+        Derived tables (caches, pair scores, body terms) go too, so nothing
+        computed from the old notes outlives them.
+        """
+        meta = dict(self.conn.execute("SELECT key, value FROM meta"))
+        expected = {
+            "vault_path": str(self.vault_path.resolve()),
+            "schema_version": SCHEMA_VERSION,
+        }
+        if all(meta.get(key) == value for key, value in expected.items()):
+            return
+        existing = {
+            name for (name,) in self.conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table'"
+            )
+        }
+        with self.conn:
+            self.conn.execute("DELETE FROM notes")
+            self.conn.execute("DELETE FROM links")
+            for table in DERIVED_TABLES:
+                if table in existing:
+                    self.conn.execute(f"DELETE FROM {table}")
+            self.conn.execute("DELETE FROM meta WHERE key LIKE 'pair_floor:%'")
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                expected.items(),
+            )
+
+    # ── Refresh ────────────────────────────────────────────────────────────────
+
+    def _walk(self) -> dict[str, tuple[Path, int, int]]:
+        """Return {rel_path: (path, mtime_ns, size)} for every note on disk."""
+        found: dict[str, tuple[Path, int, int]] = {}
+        for entry in iter_vault_files(self.vault_path):
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+            found[relative_posix(entry, self.vault_path)] = (
+                Path(entry.path), st.st_mtime_ns, st.st_size,
+            )
+        return found
+
+    def refresh(self, *, workers: int = 1, use_processes: bool = False) -> RefreshStats:
+        """Sync the index with the vault, re-parsing only changed files.
+
+        Args:
+            workers: Parallel loaders for changed files (see load_parsed_notes).
+            use_processes: Parse YAML in a process pool instead of threads.
+        """
+        stats = RefreshStats()
+        known = {
+            rel: (mtime_ns, size)
+            for rel, mtime_ns, size in self.conn.execute(
+                "SELECT rel_path, mtime_ns, size FROM notes"
+            )
+        }
+        on_disk = self._walk()
+
+        changed: list[tuple[str, Path, int, int]] = []
+        for rel, (path, mtime_ns, size) in sorted(on_disk.items()):
+            if known.get(rel) == (mtime_ns, size):
+                stats.unchanged += 1
+                continue
+            changed.append((rel, path, mtime_ns, size))
+
+        parsed_notes = load_parsed_notes(
+            [path for _, path, _, _ in changed],
+            workers=workers,
+            use_processes=use_processes,
+        )
+
+        rows: list[tuple] = []
+        link_rows: list[tuple[str, str]] = []
+        unreadable: list[tuple[str]] = []
+        for (rel, path, mtime_ns, size), parsed in zip(changed, parsed_notes):
+            if parsed is None:
+                if rel in known:
+                    unreadable.append((rel,))  # stale rows must not outlive the file's content
+                continue
+            link_rows.extend((rel, target) for target in parsed["link_targets"])
+            rows.append((
+                rel, mtime_ns, size, path.stem, parsed["title"], parsed["frontmatter"],
+                parsed["tags"], parsed["word_count"], parsed["links"],
+                parsed["content_hash"], parsed["body"],
+            ))
+            if rel in known:
+                stats.updated += 1
+            else:
+                stats.added += 1
+
+        removed = [(rel,) for rel in known if rel not in on_disk] + unreadable
+        stats.removed = len(removed)
+
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO notes (rel_path, mtime_ns, size, stem, title, "
+                "frontmatter, tags, word_count, links, content_hash, body) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self.conn.executemany("DELETE FROM notes WHERE rel_path = ?", removed)
+            self.conn.executemany(
+                "DELETE FROM links WHERE source = ?",
+                removed + [(row[0],) for row in rows],
+            )
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO links (source, target) VALUES (?, ?)",
+                link_rows,
+            )
+        return stats
+
+    # ── Queries ────────────────────────────────────────────────────────────────
+
+    def _row_to_note(self, row: tuple) -> IndexedNote:
+        (rel, mtime_ns, size, stem, title, frontmatter, tags, word_count,
+         links, content_hash, body) = row
+        return IndexedNote(
+            path=self.vault_path / rel,
+            rel_path=rel,
+            stem=stem,
+            title=title,
+            frontmatter=json.loads(frontmatter),
+            tags=json.loads(tags),
+            word_count=word_count,
+            links=json.loads(links),
+            content_hash=content_hash,
+            body=body,
+            mtime_ns=mtime_ns,
+            size=size,
+        )
+
+    def notes(self, folder: str | None = None, *, with_body: bool = True) -> list[IndexedNote]:
+        """Return indexed notes sorted by relative path.
+
+        Args:
+            folder: Restrict results to this vault subfolder.
+            with_body: If False, bodies are returned as "" to keep memory low.
+        """
+        body_col = "body" if with_body else "''"
+        sql = (
+            "SELECT rel_path, mtime_ns, size, stem, title, frontmatter, tags, "
+            f"word_count, links, content_hash, {body_col} FROM notes"
+        )
+        params: tuple = ()
+        if folder:
+            prefix = Path(folder).as_posix().strip("/") + "/"
+            sql += " WHERE substr(rel_path, 1, ?) = ?"
+            params = (len(prefix), prefix)
+        sql += " ORDER BY rel_path"
+        return [self._row_to_note(row) for row in self.conn.execute(sql, params)]
+
+    def backlinks(self, targets: Iterable[str]) -> list[Path]:
+        """Return notes whose wikilinks point at any of targets, sorted by path.
+
+        Targets are matched against normalized link targets (alias and heading
+        stripped), as produced by extract_wikilink_targets.
+        """
+        sources: set[str] = set()
+        for target in set(targets):
+            sources.update(
+                source for (source,) in self.conn.execute(
+                    "SELECT source FROM links WHERE target = ?", (target,)
+                )
+            )
+        return [self.vault_path / rel for rel in sorted(sources)]
+
+    def paths_by_stem(self, stem: str) -> list[Path]:
+        """Look up note paths by file stem without refreshing the index."""
+        return [
+            self.vault_path / rel
+            for (rel,) in self.conn.execute(
+                "SELECT rel_path FROM notes WHERE stem = ? ORDER BY rel_path", (stem,)
+            )
+        ]
+
+    # ── Derived-data cache ─────────────────────────────────────────────────────
+
+    def cache_get(self, namespace: str, keys: Iterable[str]) -> dict[str, bytes]:
+        """Return cached values for the keys that are present in namespace."""
+        found: dict[str, bytes] = {}
+        keys = list(dict.fromkeys(keys))
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            placeholders = ", ".join("?" * len(chunk))
+            found.update(self.conn.execute(
+                f"SELECT key, value FROM cache WHERE namespace = ? AND key IN ({placeholders})",
+                (namespace, *chunk),
+            ))
+        return found
+
+    def cache_put(self, namespace: str, items: Iterable[tuple[str, bytes]]) -> None:
+        """Store (key, value) pairs in namespace, replacing existing entries."""
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO cache (namespace, key, value) VALUES (?, ?, ?)",
+                ((namespace, key, value) for key, value in items),
+            )
+
+    def cache_prune(self, namespace: str) -> int:
+        """Drop entries whose key is no longer the content hash of any indexed note."""
+        with self.conn:
+            cursor = self.conn.execute(
+                "DELETE FROM cache WHERE namespace = ? "
+                "AND key NOT IN (SELECT content_hash FROM notes)",
+                (namespace,),
+            )
+        return cursor.rowcount
+
+    # ── Pair-score cache ───────────────────────────────────────────────────────
+    #
+    # For each scorer, pair_scored lists the feature hashes that have been
+    # scored against every other scored hash, and pair_scores holds every such
+    # pair whose score (in either orientation) reached the scorer's floor.
+
+    def pair_cache_state(self, scorer: str) -> tuple[float | None, set[str]]:
+        """Return (floor, scored hashes) for scorer; floor is None if never filled."""
+        row = self.conn.execute(
+            "SELECT value FROM meta WHERE key = ?", (f"pair_floor:{scorer}",)
+        ).fetchone()
+        scored = {
+            hash_ for (hash_,) in self.conn.execute(
+                "SELECT hash FROM pair_scored WHERE scorer = ?", (scorer,)
+            )
+        }
+        return (float(row[0]) if row else None), scored
+
+    def pair_cache_reset(self, scorer: str, floor: float) -> None:
+        """Forget all pairs of scorer and start over with a new floor."""
+        with self.conn:
+            self.conn.execute("DELETE FROM pair_scores WHERE scorer = ?", (scorer,))
+            self.conn.execute("DELETE FROM pair_scored WHERE scorer = ?", (scorer,))
+            self.conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                (f"pair_floor:{scorer}", repr(floor)),
+            )
+
+    def pair_cache_evict(self, scorer: str, live: set[str]) -> int:
+        """Drop pairs and scored marks for hashes that no longer belong to any note."""
+        _, scored = self.pair_cache_state(scorer)
+        dead = [(scorer, hash_) for hash_ in scored - live]
+        with self.conn:
+            before = self.conn.total_changes
+            self.conn.executemany(
+                "DELETE FROM pair_scores WHERE scorer = ? AND hash_lo = ?", dead
+            )
+            self.conn.executemany(
+                "DELETE FROM pair_scores WHERE scorer = ? AND hash_hi = ?", dead
+            )
+            evicted = self.conn.total_changes - before
+            self.conn.executemany(
+                "DELETE FROM pair_scored WHERE scorer = ? AND hash = ?", dead
+            )
+        return evicted
+
+    def pair_cache_rows(self, scorer: str) -> list[tuple[str, str, float, float]]:
+        """All cached (hash_lo, hash_hi, score_lo_hi, score_hi_lo) rows of scorer."""
+        return self.conn.execute(
+            "SELECT hash_lo, hash_hi, score_lo_hi, score_hi_lo FROM pair_scores "
+            "WHERE scorer = ?",
+            (scorer,),
+        ).fetchall()
+
+    def pair_cache_store(
+        self,
+        scorer: str,
+        rows: Iterable[tuple[str, str, float, float]],
+        scored: Iterable[str],
+    ) -> None:
+        """Add pair rows and mark hashes as fully scored, in one transaction."""
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO pair_scores "
+                "(scorer, hash_lo, hash_hi, score_lo_hi, score_hi_lo) VALUES (?, ?, ?, ?, ?)",
+                ((scorer, *row) for row in rows),
+            )
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO pair_scored (scorer, hash) VALUES (?, ?)",
+                ((scorer, hash_) for hash_ in scored),
+            )
+
+
+def load_indexed_notes(
+    vault_path: Path,
+    *,
+    folder: str | None = None,
+    with_body: bool = True,
+    index_path: Path | None = None,
+    workers: int = 1,
+    use_processes: bool = False,
+) -> list[IndexedNote]:
+    """Refresh the vault index and return its notes."""
+    with VaultIndex(vault_path, index_path) as index:
+        index.refresh(workers=workers, use_processes=use_processes)
+        return index.notes(folder, with_body=with_body)
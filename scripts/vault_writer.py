@@ -22,9 +22,11 @@ All diagnostics go to stderr. Summary printed to both stdout and stderr.
 import argparse
 import json
 import os
+import re
 import shutil
 import sys
 import tempfile
+from datetime import date
 from pathlib import Path
 
 import yaml
@@ -92,19 +94,71 @@ def save_registry(registry: dict) -> None:
 # ── Frontmatter parsing ─────────────────────────────────────────────────────────
 
 
-def parse_frontmatter(content: str) -> dict:
-    """Extract key/value pairs from YAML frontmatter block (between --- delimiters).
+# libyaml-backed loader when available; same semantics as yaml.SafeLoader
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# Line patterns for the locked v1 schema emitted by generate_notes.render_note_md.
+# Tags must contain a "/" so they can never resolve to YAML bools, nulls or numbers.
+_V1_TAG_RE = re.compile(r"  - ([\w.-]+(?:/[\w.-]+)+)")
+_V1_DATE_RE = re.compile(r"date: ([0-9]{4})-([0-9]{2})-([0-9]{2})")
+_V1_SOURCE_DOC_RE = re.compile(r'source_doc: "((?:[^"\\]|\\")*)"')
+_V1_NOTE_TYPE_RE = re.compile(r"note_type: ([a-z]+)")
+_YAML_RESERVED_WORDS = {"yes", "no", "true", "false", "on", "off", "null"}
 
-    Uses PyYAML for robust parsing. Returns an empty dict if no frontmatter found.
+
+def _parse_v1_frontmatter(fm_block: str) -> dict | None:
+    """Parse a frontmatter block written in the exact v1 layout.
+
+    Returns None for anything that deviates from the layout, so the caller can
+    fall back to PyYAML. For blocks it accepts, the result is identical to
+    yaml.safe_load (including datetime.date for the date field).
     """
-    parts = content.split("---", 2)
-    if len(parts) < 3:
-        return {}
+    lines = fm_block.split("\n")
+    # Leading "" comes from the newline after the opening ---, trailing "" from
+    # the newline before the closing ---.
+    if len(lines) < 7 or lines[0] or lines[-1] or lines[1] != "tags:":
+        return None
+
+    tags: list[str] = []
+    idx = 2
+    while idx < len(lines) and lines[idx].startswith("  - "):
+        match = _V1_TAG_RE.fullmatch(lines[idx])
+        if match is None:
+            return None
+        tags.append(match.group(1))
+        idx += 1
+    if not tags or len(lines) - idx != 4:
+        return None
+
+    date_match = _V1_DATE_RE.fullmatch(lines[idx])
+    source_match = _V1_SOURCE_DOC_RE.fullmatch(lines[idx + 1])
+    type_match = _V1_NOTE_TYPE_RE.fullmatch(lines[idx + 2])
+    if date_match is None or source_match is None or type_match is None:
+        return None
+    note_type = type_match.group(1)
+    source_doc = source_match.group(1)
+    # Control and other non-printable characters get special YAML treatment
+    if note_type in _YAML_RESERVED_WORDS or not source_doc.isprintable():
+        return None
+    try:
+        date_val = date(*(int(part) for part in date_match.groups()))
+    except ValueError:
+        return None
+
+    return {
+        "tags": tags,
+        "date": date_val,
+        "source_doc": source_doc.replace('\\"', '"'),
+        "note_type": note_type,
+    }
 
-    fm_block = parts[1]
+
+def _parse_frontmatter_yaml(fm_block: str) -> dict:
+    """Full PyYAML parse of a frontmatter block; {} on errors or non-mappings."""
     try:
-        parsed = yaml.safe_load(fm_block)
-    except yaml.YAMLError:
+        parsed = yaml.load(fm_block, Loader=_YAML_LOADER)
+    except (yaml.YAMLError, ValueError):
+        # ValueError: timestamps that match the YAML regex but are not real dates
         return {}
 
     if not isinstance(parsed, dict):
@@ -113,6 +167,24 @@ def parse_frontmatter(content: str) -> dict:
     return parsed
 
 
+def parse_frontmatter(content: str) -> dict:
+    """Extract key/value pairs from YAML frontmatter block (between --- delimiters).
+
+    Notes in the locked v1 layout are parsed by a line matcher; anything else
+    goes through PyYAML (libyaml's CSafeLoader when installed). Returns an empty
+    dict if no frontmatter found.
+    """
+    parts = content.split("---", 2)
+    if len(parts) < 3:
+        return {}
+
+    fm_block = parts[1]
+    fast = _parse_v1_frontmatter(fm_block)
+    if fast is not None:
+        return fast
+    return _parse_frontmatter_yaml(fm_block)
+
+
 # ── Conflict resolution ─────────────────────────────────────────────────────────
 
 
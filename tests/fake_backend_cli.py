@@ -0,0 +1,39 @@
+"""Local stand-in for `claude --print --input-format stream-json` used in tests.
+
+Reads one JSON user message per stdin line and answers each with a
+"result" event whose text is "<pid>:<turn>:<prompt>", streamed first as
+text deltas. Special prompts: CRASH exits the process, SLOW sleeps before
+answering, ERROR returns an error result.
+"""
+
+import json
+import os
+import sys
+import time
+
+
+def emit(event: dict) -> None:
+    sys.stdout.write(json.dumps(event) + "\n")
+    sys.stdout.flush()
+
+
+def main() -> None:
+    emit({"type": "system", "subtype": "init", "session_id": str(os.getpid())})
+    turn = 0
+    for line in sys.stdin:
+        prompt = json.loads(line)["message"]["content"]
+        turn += 1
+        if prompt == "CRASH":
+            sys.exit(3)
+        if prompt == "SLOW":
+            time.sleep(5)
+        text = f"{os.getpid()}:{turn}:{prompt}"
+        for start in range(0, len(text), 8):
+            delta = {"type": "text_delta", "text": text[start:start + 8]}
+            emit({"type": "stream_event", "event": {"type": "content_block_delta", "delta": delta}})
+        emit({"type": "assistant", "message": {"content": [{"type": "text", "text": text}]}})
+        emit({"type": "result", "is_error": prompt == "ERROR", "result": text})
+
+
+if __name__ == "__main__":
+    main()
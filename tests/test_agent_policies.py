@@ -1,10 +1,22 @@
 """Tests for non-interactive agent policy branches."""
 
+import json
+import re
+import threading
+import time
 from datetime import date
 from pathlib import Path
 
 from scripts import dedup_vault
-from scripts.dedup_vault import CandidateGroup, VaultNote, interactive_merge
+from scripts.dedup_vault import (
+    CandidateGroup,
+    VaultNote,
+    assemble_dedup_prompt,
+    interactive_merge,
+    plan_verify_batches,
+    replace_wikilink_targets,
+    verify_with_claude,
+)
 from scripts.fix_similar_notes import (
     append_related_link,
     build_canonical_body,
@@ -13,6 +25,7 @@ from scripts.fix_similar_notes import (
     PairCandidate,
 )
 from scripts.fix_atomic_notes import is_target_note, rank_related_candidates
+from scripts.rewrite_backend import estimate_tokens
 from scripts.vault_writer import resolve_conflict
 
 
@@ -38,6 +51,88 @@ def make_group() -> CandidateGroup:
     )
 
 
+class TestVerifyBatches:
+    def make_groups(self, count: int) -> list[CandidateGroup]:
+        groups = []
+        for gid in range(count):
+            group = make_group()
+            group.group_id = gid
+            group.is_duplicate = False
+            group.confidence = 0.0
+            groups.append(group)
+        return groups
+
+    def fake_backend(self, monkeypatch, *, fail=lambda ids: False, omit=(), delay=0.0):
+        calls: list[list[int]] = []
+        lock = threading.Lock()
+        active = [0, 0]  # current, peak
+
+        def call_rewriter(prompt, **kwargs):
+            ids = [int(gid) for gid in re.findall(r"^## Group (\d+)$", prompt, re.M)]
+            with lock:
+                calls.append(ids)
+                active[0] += 1
+                active[1] = max(active)
+            time.sleep(delay)
+            with lock:
+                active[0] -= 1
+            if fail(ids):
+                return "claude", "not json"
+            groups = [
+                {"group_id": gid, "is_duplicate": True, "confidence": gid / 100}
+                for gid in ids if gid not in omit or len(ids) == 1
+            ]
+            return "claude", json.dumps({"groups": groups})
+
+        monkeypatch.setattr(dedup_vault, "call_rewriter", call_rewriter)
+        return calls, active
+
+    def budget_for(self, groups: int) -> int:
+        """Token budget that fits `groups` of make_groups() per batch."""
+        header = estimate_tokens(assemble_dedup_prompt([], []))
+        return header + groups * (dedup_vault.VERIFY_REPLY_TOKENS + 120)
+
+    def test_parallel_batches_keep_input_order(self, monkeypatch):
+        calls, active = self.fake_backend(monkeypatch, delay=0.05)
+        verified = verify_with_claude(
+            self.make_groups(12), [], parallel=3, batch_tokens=self.budget_for(5)
+        )
+        assert [g.group_id for g in verified] == list(range(12))
+        assert [g.confidence for g in verified] == [gid / 100 for gid in range(12)]
+        assert sorted(len(ids) for ids in calls) == [2, 5, 5]
+        assert sorted(gid for ids in calls for gid in ids) == list(range(12))
+        assert active[1] > 1
+
+    def test_batches_are_packed_by_token_budget(self):
+        groups = self.make_groups(8)
+        for group in groups[:2]:
+            group.notes[0].body = "word " * 280
+        budget = self.budget_for(4)
+        batches = plan_verify_batches(groups, [], budget)
+        assert all(
+            estimate_tokens(assemble_dedup_prompt(batch, [])) + len(batch) * dedup_vault.VERIFY_REPLY_TOKENS
+            <= budget
+            for batch in batches
+        )
+        assert len(batches) == 3
+        assert sorted(g.group_id for batch in batches for g in batch) == list(range(8))
+        assert plan_verify_batches(groups, [], 10) == [[group] for group in groups]
+
+    def test_failed_batch_is_retried_per_group(self, monkeypatch):
+        calls, _ = self.fake_backend(
+            monkeypatch, fail=lambda ids: len(ids) > 1 and 6 in ids or ids == [8],
+        )
+        verified = verify_with_claude(self.make_groups(10), [], parallel=2)
+        assert [g.group_id for g in verified] == [0, 1, 2, 3, 4, 5, 6, 7, 9]
+        assert [5] in calls and [8] in calls
+
+    def test_groups_missing_from_reply_are_retried(self, monkeypatch):
+        calls, _ = self.fake_backend(monkeypatch, omit={2})
+        verified = verify_with_claude(self.make_groups(4), [])
+        assert [g.group_id for g in verified] == [0, 1, 2, 3]
+        assert calls == [[0, 1, 2, 3], [2]]
+
+
 class TestResolveConflictPolicy:
     def test_non_interactive_skip(self):
         assert resolve_conflict(
@@ -255,3 +350,23 @@ class TestExecuteMerge:
         assert "Merged body" in (vault / "Canonical.md").read_text(encoding="utf-8")
         assert (vault / ".archive" / "2026-03-03_dedup_Canonical.md").exists()
         assert (vault / ".archive" / "2026-03-03_dedup_Variant.md").exists()
+
+
+class TestReplaceWikilinkTargets:
+    def test_preserves_alias_and_heading(self):
+        text = "[[Old]] [[Old|shown]] [[Old#Part]] [[Old#Part|shown]] ![[Old]]"
+        assert replace_wikilink_targets(text, {"Old": "New"}) == (
+            "[[New]] [[New|shown]] [[New#Part]] [[New#Part|shown]] ![[New]]"
+        )
+
+    def test_leaves_other_links_and_prefixes_alone(self):
+        text = "[[Older]] [[Other|Old]] [[Old Note]] plain Old"
+        assert replace_wikilink_targets(text, {"Old": "New"}) == text
+
+    def test_many_mappings_and_regex_metacharacters(self):
+        title_map = {f"Title {i}": f"Merged {i}" for i in range(500)}
+        title_map["C++ (draft)"] = "C++"
+        text = "[[Title 7]] and [[Title 499|x]] and [[C++ (draft)]]"
+        assert replace_wikilink_targets(text, title_map) == (
+            "[[Merged 7]] and [[Merged 499|x]] and [[C++]]"
+        )
@@ -0,0 +1,146 @@
+"""Tests for chunked atomization: section splitting, stitching and the parallel run."""
+
+import json
+import re
+
+import pytest
+
+from scripts import atomize
+from scripts.atomize import (
+    atomize_chunked,
+    chunk_prompts,
+    estimate_tokens,
+    resolve_wikilinks,
+    split_sections,
+    stitch_atom_plans,
+    validate_atom_plan,
+)
+
+
+def section(heading, level, words=50):
+    return {"heading": heading, "level": level, "paragraphs": [" ".join(["word"] * words)]}
+
+
+def note(note_id, title, body="", note_type="atomic", tags=("ai/llm", "dev/python")):
+    return {
+        "id": note_id,
+        "title": title,
+        "note_type": note_type,
+        "tags": list(tags),
+        "source_doc": "Doc.docx",
+        "date": "2026-01-01",
+        "body": body,
+        "proposed_new_tags": [],
+    }
+
+
+class TestSplitSections:
+    def test_packs_top_level_blocks_within_budget(self):
+        sections = [
+            {"heading": None, "level": 0, "paragraphs": ["intro"]},
+            section("A", 1), section("A.1", 2),
+            section("B", 1),
+            section("C", 1), section("C.1", 2),
+        ]
+        budget = sum(estimate_tokens(json.dumps(s, ensure_ascii=False)) for s in sections[:4])
+        chunks = split_sections(sections, budget)
+        assert [[s["heading"] for s in chunk] for chunk in chunks] == [
+            [None, "A", "A.1", "B"], ["C", "C.1"],
+        ]
+
+    def test_oversized_block_splits_at_next_level(self):
+        sections = [section("A", 1, 10), section("A.1", 2, 400), section("A.2", 2, 400), section("B", 1, 10)]
+        budget = estimate_tokens(json.dumps(sections[1])) + 50
+        chunks = split_sections(sections, budget)
+        assert [[s["heading"] for s in chunk] for chunk in chunks] == [["A", "A.1"], ["A.2"], ["B"]]
+        assert [s for chunk in chunks for s in chunk] == sections
+
+    def test_block_without_subheadings_is_kept_whole(self):
+        sections = [section("A", 1, 1000), section("B", 1, 10)]
+        assert [len(chunk) for chunk in split_sections(sections, 20)] == [1, 1]
+
+
+class TestStitchAtomPlans:
+    def test_one_moc_unique_ids_and_resolved_links(self):
+        first = {"notes": [
+            note("c1-1", "Vector Embeddings", "See [[retrieval augmented generation]]."),
+            note("dup", "Chunking Strategy"),
+            note("c1-moc", "Doc part 1", "# Doc part 1\n## Part A\n- [[Vector Embeddings]]", "moc",
+                 ("productivity/moc", "ai/llm")),
+        ], "proposed_tags": [{"tag": "ai/rag", "reason": "new"}]}
+        second = {"notes": [
+            note("dup", "Retrieval-Augmented Generation", "Uses [[vector embedding|vectors]]."),
+            note("c2-moc", "Doc part 2", "## Part B\n- [[Retrieval-Augmented Generation]]", "moc",
+                 ("productivity/moc", "dev/python")),
+        ]}
+
+        plan = stitch_atom_plans([first, second], "Doc: Research Notes.docx")
+        assert validate_atom_plan(plan) == []
+        assert [n["id"] for n in plan["notes"]] == ["c1-1", "dup", "dup-2", "moc"]
+
+        moc = plan["notes"][-1]
+        assert moc["title"] == "Doc Research Notes"
+        assert moc["tags"][:2] == ["productivity/moc", "ai/llm"]
+        assert moc["body"] == (
+            "## Part A\n- [[Vector Embeddings]]\n\n## Part B\n- [[Retrieval-Augmented Generation]]"
+        )
+        assert plan["notes"][0]["body"] == "See [[Retrieval-Augmented Generation]]."
+        assert plan["notes"][2]["body"] == "Uses [[Vector Embeddings|vectors]]."
+        assert plan["proposed_tags"] == [{"tag": "ai/rag", "reason": "new"}]
+
+    def test_chunk_without_moc_gets_a_link_list(self):
+        plan = stitch_atom_plans([{"notes": [note("a", "Alpha"), note("b", "Beta")]}], "Doc.docx")
+        assert validate_atom_plan(plan) == []
+        assert plan["notes"][-1]["body"] == "- [[Alpha]]\n- [[Beta]]"
+
+    def test_titles_repeated_across_chunks_are_suffixed(self):
+        first = {"notes": [note("a", "Overview"), note("b", "Setup", "After [[Overview]].")]}
+        second = {"notes": [
+            note("c", "overview", "Not [[Setup]]."),
+            note("d", "Usage", "See [[overview#Goals|the overview]]."),
+            note("m", "Part 2", "## Part 2\n- [[overview]]\n- [[Usage]]", "moc"),
+        ]}
+
+        plan = stitch_atom_plans([first, second], "Doc.docx")
+        assert validate_atom_plan(plan) == []
+        assert [n["title"] for n in plan["notes"]] == [
+            "Overview", "Setup", "overview (2)", "Usage", "Doc",
+        ]
+        assert plan["notes"][1]["body"] == "After [[Overview]]."
+        assert plan["notes"][3]["body"] == "See [[overview (2)#Goals|the overview]]."
+        assert plan["notes"][-1]["body"].endswith("## Part 2\n- [[overview (2)]]\n- [[Usage]]")
+
+    def test_unmatched_links_are_left_alone(self):
+        notes = [note("a", "Alpha", "[[Gamma ray]] and [[alpha]]")]
+        assert resolve_wikilinks(notes) == 1
+        assert notes[0]["body"] == "[[Gamma ray]] and [[Alpha]]"
+
+
+def test_budget_below_prompt_overhead_is_rejected():
+    parsed = {"source_file": "Doc.docx", "sections": [section("A", 1, 300), section("B", 1, 300)]}
+    with pytest.raises(ValueError, match="--chunk-tokens 200 leaves"):
+        chunk_prompts(parsed, ["ai/llm"], "skill", "rules", "taxonomy", token_budget=200)
+
+
+def test_chunked_run_stitches_parallel_results(monkeypatch):
+    parsed = {
+        "source_file": "Doc.docx",
+        "sections": [section(f"Part {i}", 1, 300) for i in range(4)],
+    }
+    prompts = chunk_prompts(parsed, ["ai/llm"], "skill", "rules", "taxonomy", token_budget=600)
+    assert len(prompts) == 4
+    assert all("part %d of 4" % (i + 1) in p for i, p in enumerate(prompts))
+
+    def call_rewriter(prompt, **kwargs):
+        index = int(re.search(r"part (\d+) of", prompt).group(1))
+        return "claude", json.dumps({"notes": [
+            note(f"c{index}-1", f"Note {index}", f"Links [[note {index % 4 + 1}]]"),
+            note(f"c{index}-moc", "Part MOC", f"## Part {index}\n- [[Note {index}]]", "moc"),
+        ]})
+
+    monkeypatch.setattr(atomize, "call_rewriter", call_rewriter)
+    backend, plan = atomize_chunked(prompts, "Doc.docx", parallel=3)
+    assert backend == "claude"
+    assert validate_atom_plan(plan) == []
+    assert [n["title"] for n in plan["notes"]] == ["Note 1", "Note 2", "Note 3", "Note 4", "Doc"]
+    assert plan["notes"][3]["body"] == "Links [[Note 1]]"
@@ -0,0 +1,90 @@
+"""Tests for the TF-IDF body index used for related-note suggestions."""
+
+import os
+from pathlib import Path
+
+from scripts.audit_vault import NoteRecord
+from scripts.body_index import load_body_vectors, sync_body_terms, tokenize_body
+from scripts.enrich_thin_notes import related_titles
+from scripts.fix_atomic_notes import rank_related_candidates
+from scripts.vault_index import VaultIndex
+
+
+def write(path: Path, text: str) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+    return path
+
+
+def make_vault(root: Path) -> Path:
+    vault = root / "vault"
+    write(vault / "Caching.md", "Prompt caching keeps the system prompt prefix warm between calls.")
+    write(vault / "Reuse.md", "Reuse the cached prompt prefix; caching the system prompt saves tokens.")
+    write(vault / "Garden.md", "Tomatoes need sunlight, water and rich soil in the garden.")
+    write(vault / "Empty.md", "")
+    return vault
+
+
+class TestBodyIndex:
+    def test_tokenize_skips_short_and_numeric_terms(self):
+        assert tokenize_body("An API call: 200 ms, API again") == {"api": 2, "call": 1, "again": 1}
+
+    def test_neighbors_rank_topical_notes(self, tmp_path):
+        vault = make_vault(tmp_path)
+        with VaultIndex(vault, tmp_path / "index.sqlite") as index:
+            index.refresh()
+            vectors = load_body_vectors(index)
+
+        neighbors = vectors.neighbors(vault / "Caching.md", 5)
+        assert [path.name for _, path in neighbors] == ["Reuse.md", "Garden.md"]
+        assert 1 >= neighbors[0][0] > 2 * neighbors[1][0] > 0
+        assert len(vectors.neighbors(vault / "Caching.md", 1)) == 1
+        assert vectors.neighbors(vault / "Empty.md", 5) == []
+        assert vectors.neighbors(tmp_path / "elsewhere.md", 5) == []
+
+    def test_sync_is_incremental(self, tmp_path):
+        vault = make_vault(tmp_path)
+        with VaultIndex(vault, tmp_path / "index.sqlite") as index:
+            index.refresh()
+            assert sync_body_terms(index) == 4
+            assert sync_body_terms(index) == 0
+
+            garden = write(vault / "Garden.md", "Garden soil and prompt caching notes.")
+            st = garden.stat()
+            os.utime(garden, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+            (vault / "Reuse.md").unlink()
+            index.refresh()
+            assert sync_body_terms(index) == 1
+
+            vectors = load_body_vectors(index)
+        assert len(vectors) == 3
+        assert [path.name for _, path in vectors.neighbors(vault / "Caching.md", 5)] == ["Garden.md"]
+        assert vectors.neighbors(vault / "Reuse.md", 5) == []
+
+
+class TestBodyNeighborRanking:
+    def make_note(self, title: str, body: str = "", source_doc: str = "") -> NoteRecord:
+        return NoteRecord(
+            path=Path(f"/vault/{title}.md"),
+            title=title,
+            note_type="atomic",
+            source_doc=source_doc,
+            frontmatter={},
+            body=body,
+            tags={"tech/ai"},
+            links=set(),
+        )
+
+    def test_body_neighbors_surface_unrelated_titles(self):
+        note = self.make_note("Prompt caching")
+        other = self.make_note("Token economics")
+        notes = [note, other]
+
+        assert rank_related_candidates(note, notes, threshold=0.3, max_links=3) == []
+        ranked = rank_related_candidates(
+            note, notes, threshold=0.3, max_links=3, body_neighbors={other.path: 0.9},
+        )
+        assert [candidate.title for _, candidate in ranked] == ["Token economics"]
+
+        assert related_titles(note, notes) == []
+        assert related_titles(note, notes, body_neighbors={other.path: 0.9}) == ["Token economics"]
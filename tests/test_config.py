@@ -11,6 +11,9 @@ from scripts.config import (
     PROJECT_ROOT,
     REGISTRY_PATH,
     load_config,
+    resolve_workers,
+    response_cache_dir,
+    use_parse_processes,
 )
 
 
@@ -57,3 +60,23 @@ def test_load_config_strict_exits(tmp_path):
     with patch("scripts.config.PROJECT_ROOT", tmp_path):
         with pytest.raises(SystemExit):
             load_config(strict=True)
+
+
+def test_resolve_workers_precedence():
+    config = {"performance": {"workers": 6, "parse_processes": True}}
+    assert resolve_workers(config) == 6
+    assert resolve_workers(config, 2) == 2
+    assert resolve_workers({}) == 1
+    assert resolve_workers({"performance": {"workers": 0}}) == 1
+    assert use_parse_processes(config) is True
+    assert use_parse_processes({}) is False
+
+
+def test_response_cache_dir_follows_staging_dir(monkeypatch):
+    monkeypatch.delenv("OBSIDIAN_DATAWEAVE_CACHE_DIR", raising=False)
+    assert response_cache_dir({"rclone": {"staging_dir": "/data/stage"}}) == Path(
+        "/data/stage/response-cache"
+    )
+    assert response_cache_dir({}) == Path(DEFAULT_STAGING_DIR) / "response-cache"
+    monkeypatch.setenv("OBSIDIAN_DATAWEAVE_CACHE_DIR", "/elsewhere")
+    assert response_cache_dir({"rclone": {"staging_dir": "/data/stage"}}) == Path("/elsewhere")
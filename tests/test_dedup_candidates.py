@@ -0,0 +1,160 @@
+"""Tests for dedup_vault candidate generation (blocking and MinHash/LSH)."""
+
+import random
+from pathlib import Path
+
+import pytest
+
+from scripts import dedup_vault
+from scripts.dedup_vault import (
+    VaultNote,
+    compute_body_signatures,
+    compute_similarity,
+    deep_scan_vault,
+    find_candidate_groups,
+    find_similar_pairs,
+    group_candidate_pairs,
+    load_body_signatures,
+)
+from scripts.vault_index import VaultIndex
+
+
+WORDS = ["agent", "tool", "memory", "prompt", "vault", "note", "sdk", "graph", "агент", "память"]
+TAGS = ["tech/ai", "tech/tools", "meta/moc", "life/health", "work/process"]
+
+
+def make_corpus(seed: int, size: int = 60) -> list[VaultNote]:
+    rng = random.Random(seed)
+    notes = []
+    for idx in range(size):
+        title = " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 4)))
+        if rng.random() < 0.3:
+            title = title.replace("o", "0")  # titles with no whole shared token
+        notes.append(VaultNote(
+            path=Path(f"/tmp/{idx}.md"),
+            title=f"{title} {idx}" if rng.random() < 0.5 else title,
+            body="",
+            tags=rng.sample(TAGS, rng.randint(0, 2)),
+            note_type="atomic",
+            source_doc="",
+            word_count=0,
+        ))
+    return notes
+
+
+def brute_force_pairs(notes, threshold, reviewed_pairs):
+    pairs = []
+    for i in range(len(notes)):
+        for j in range(i + 1, len(notes)):
+            sim = compute_similarity(notes[i], notes[j])
+            if sim >= threshold:
+                pair_key = frozenset([notes[i].title, notes[j].title])
+                if pair_key not in reviewed_pairs:
+                    pairs.append((notes[i].title, notes[j].title, sim))
+    return pairs
+
+
+@pytest.mark.parametrize("threshold", [0.0, 0.2, 0.35, 0.5, 0.55, 0.7, 0.85])
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_blocked_pairs_match_brute_force(seed, threshold):
+    notes = make_corpus(seed)
+    reviewed = {frozenset([notes[0].title, notes[1].title])}
+    assert find_similar_pairs(notes, threshold, reviewed) == brute_force_pairs(
+        notes, threshold, reviewed
+    )
+
+
+def test_empty_titles_still_pair_below_half():
+    notes = [
+        VaultNote(Path(f"/tmp/{i}.md"), "", "", [], "atomic", "", 0)
+        for i in range(2)
+    ]
+    assert find_similar_pairs(notes, 0.5, set()) == [("", "", 0.5)]
+
+
+class TestGroupCandidatePairs:
+    def make_notes(self, count: int) -> list[VaultNote]:
+        return [VaultNote(Path(f"/tmp/{i}.md"), f"n{i}", "", [], "atomic", "", 0) for i in range(count)]
+
+    def test_components_keep_all_their_pairs(self):
+        notes = self.make_notes(6)
+        pairs = [("n0", "n1", 0.9), ("n3", "n4", 0.8), ("n1", "n2", 0.7), ("n0", "n2", 0.6)]
+        groups = group_candidate_pairs(notes, pairs)
+        assert [[n.title for n in g.notes] for g in groups] == [["n0", "n1", "n2"], ["n3", "n4"]]
+        assert [g.pairs for g in groups] == [
+            [("n0", "n1", 0.9), ("n1", "n2", 0.7), ("n0", "n2", 0.6)],
+            [("n3", "n4", 0.8)],
+        ]
+        assert [g.group_id for g in groups] == [0, 1]
+
+    def test_large_component_splits_into_maximum_spanning_pairs(self):
+        notes = self.make_notes(5)
+        titles = [n.title for n in notes]
+        pairs = [
+            (a, b, 0.5 + 0.01 * (i + j))
+            for i, a in enumerate(titles) for j, b in enumerate(titles) if i < j
+        ]
+        groups = group_candidate_pairs(notes, pairs)
+        assert [g.pairs[0][:2] for g in groups] == [("n0", "n4"), ("n1", "n4"), ("n2", "n4"), ("n3", "n4")]
+        assert all(len(g.notes) == 2 for g in groups)
+
+    def test_unknown_titles_are_dropped(self):
+        notes = self.make_notes(2)
+        groups = group_candidate_pairs(notes, [("n0", "n1", 0.9), ("gone", "n1", 0.8)])
+        assert [[n.title for n in g.notes] for g in groups] == [["n0", "n1"]]
+
+
+class TestBodyMinHash:
+    BODY = " ".join(f"word{i}" for i in range(200))
+
+    def make_note(self, title: str, body: str, content_hash: str = "") -> VaultNote:
+        return VaultNote(
+            Path(f"/tmp/{title}.md"), title, body, [], "atomic", "", len(body.split()),
+            content_hash=content_hash,
+        )
+
+    def test_near_identical_bodies_form_a_group(self):
+        notes = [
+            self.make_note("Alpha", self.BODY),
+            self.make_note("Completely different", self.BODY.replace("word100", "edited")),
+            self.make_note("Unrelated", " ".join(f"other{i}" for i in range(200))),
+            self.make_note("Empty", ""),
+        ]
+        assert find_candidate_groups(notes, 0.9, []) == []
+
+        groups = find_candidate_groups(notes, 0.9, [], body_threshold=0.8)
+        assert [sorted(n.title for n in g.notes) for g in groups] == [["Alpha", "Completely different"]]
+        [(_, _, score)] = groups[0].pairs
+        assert score >= 0.8
+
+    def test_signatures_are_cached_by_content_hash(self, tmp_path, monkeypatch):
+        vault = tmp_path / "vault"
+        vault.mkdir()
+        notes = [self.make_note("A", self.BODY, "hash-a"), self.make_note("B", "", "hash-b")]
+        index_path = tmp_path / "index.sqlite"
+
+        with VaultIndex(vault, index_path) as index:
+            first = compute_body_signatures(notes, index)
+        assert first[0] is not None and first[1] is None
+
+        def fail(*args, **kwargs):
+            raise AssertionError("signature should come from the cache")
+
+        monkeypatch.setattr(dedup_vault, "body_shingles", fail)
+        with VaultIndex(vault, index_path) as index:
+            assert compute_body_signatures(notes, index) == first
+
+    def test_stale_signatures_are_pruned(self, tmp_path):
+        vault = tmp_path / "vault"
+        (vault / "Note.md").parent.mkdir()
+        (vault / "Note.md").write_text(self.BODY, encoding="utf-8")
+        index_path = tmp_path / "index.sqlite"
+        notes = deep_scan_vault(vault, index_path=index_path)
+        orphan = self.make_note("Gone", self.BODY + " tail", "orphan-hash")
+
+        load_body_signatures(vault, notes + [orphan], index_path=index_path)
+        with VaultIndex(vault, index_path) as index:
+            assert index.cache_get(dedup_vault.MINHASH_CACHE_NAMESPACE, ["orphan-hash"]) == {}
+            assert list(index.cache_get(
+                dedup_vault.MINHASH_CACHE_NAMESPACE, [notes[0].content_hash]
+            )) == [notes[0].content_hash]
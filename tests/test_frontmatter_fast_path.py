@@ -0,0 +1,93 @@
+"""Correctness of the v1 frontmatter fast path against the PyYAML path."""
+
+import pytest
+
+from scripts.config import PROJECT_ROOT
+from scripts.generate_notes import render_note_md
+from scripts.vault_writer import (
+    _parse_frontmatter_yaml,
+    _parse_v1_frontmatter,
+    parse_frontmatter,
+)
+
+
+def note(**overrides) -> str:
+    fields = {
+        "title": "T",
+        "tags": ["tech/ai", "productivity/zettelkasten"],
+        "date": "2026-02-26",
+        "source_doc": "Research.docx",
+        "note_type": "atomic",
+        "body": "Body text --- with a rule.",
+    }
+    fields.update(overrides)
+    return render_note_md(fields)
+
+
+V1_CORPUS = [
+    note(),
+    note(tags=["ai/llm"]),
+    note(tags=["исследования/второй-мозг", "tech/ai.tools", "a_b/c-d"]),
+    note(source_doc="Research: AI, part 2.docx"),
+    note(source_doc='He said "hi".docx'),
+    note(source_doc="Личная заметка"),
+    note(source_doc=""),
+    note(note_type="moc"),
+    note(note_type="source"),
+    note(date="2024-02-29"),
+]
+
+DEVIATING_CORPUS = [
+    note(tags=[]),
+    note(tags=["yes"]),
+    note(tags=["123"]),
+    note(tags=["tech/ai # comment"]),
+    note(date=""),
+    note(date="2026-02-30"),
+    note(date="2026-2-3"),
+    note(date="2026-02-26T10:00:00"),
+    note(note_type="yes"),
+    note(note_type="null"),
+    note(note_type="Atomic"),
+    note(source_doc="C:\\docs\\file.docx"),
+    note(source_doc="tab\tinside"),
+    note().replace("\n", "\r\n"),
+    note().replace("note_type: atomic\n", "note_type: atomic\nextra: 1\n"),
+    "---\ntags: [a/b, c/d]\nnote_type: atomic\n---\nBody",
+    "---\n---\nBody",
+    "No frontmatter at all",
+]
+
+
+def yaml_reference(content: str) -> dict:
+    parts = content.split("---", 2)
+    if len(parts) < 3:
+        return {}
+    return _parse_frontmatter_yaml(parts[1])
+
+
+class TestFrontmatterFastPath:
+    @pytest.mark.parametrize("content", V1_CORPUS)
+    def test_v1_notes_use_fast_path(self, content):
+        assert _parse_v1_frontmatter(content.split("---", 2)[1]) is not None
+        assert parse_frontmatter(content) == yaml_reference(content)
+
+    @pytest.mark.parametrize("content", DEVIATING_CORPUS)
+    def test_deviating_notes_fall_back_to_yaml(self, content):
+        parts = content.split("---", 2)
+        if len(parts) == 3:
+            assert _parse_v1_frontmatter(parts[1]) is None
+        assert parse_frontmatter(content) == yaml_reference(content)
+
+    def test_real_template_notes_match_yaml(self):
+        paths = sorted((PROJECT_ROOT / "templates").rglob("*.md"))
+        assert paths
+        for path in paths:
+            content = path.read_text(encoding="utf-8")
+            assert parse_frontmatter(content) == yaml_reference(content), path
+
+    def test_example_note_hits_fast_path(self):
+        content = (PROJECT_ROOT / "templates" / "Notes" / "Atomic Note Example.md").read_text(
+            encoding="utf-8"
+        )
+        assert _parse_v1_frontmatter(content.split("---", 2)[1]) is not None
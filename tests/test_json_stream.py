@@ -0,0 +1,116 @@
+"""Tests for the incremental JSON scanner used on streamed backend output."""
+
+import json
+import random
+import subprocess
+import sys
+
+import pytest
+
+from scripts.atomize import extract_json
+from scripts.json_stream import JsonStream
+from scripts.rewrite_backend import run_streaming
+
+PLAN = {
+    "source_file": "doc.docx",
+    "notes": [
+        {"id": f"n{i}", "title": f"Note {i} \"quoted\" \\ {{x}}", "body": "Текст " * i, "tags": ["a", "b"]}
+        for i in range(6)
+    ],
+    "meta": {"ids": [1, 2, {"nested": None}]},
+}
+
+
+class TestJsonStream:
+    def test_chunked_feed_emits_notes_as_they_close(self):
+        text = "Here is the plan:\n```json\n" + json.dumps(PLAN, ensure_ascii=False, indent=2) + "\n```\n"
+        rng = random.Random(7)
+        for _ in range(50):
+            stream, notes, pos = JsonStream(), [], 0
+            while pos < len(text):
+                step = rng.randint(1, 17)
+                notes.extend(stream.feed(text[pos:pos + step]))
+                pos += step
+            assert notes == PLAN["notes"]
+            assert stream.done and not stream.truncated
+            assert json.loads(stream.text) == PLAN
+
+    def test_note_is_returned_by_the_chunk_that_closes_it(self):
+        text = json.dumps(PLAN)
+        first_end = text.index('"b"]}') + 5
+        stream = JsonStream()
+        assert stream.feed(text[:first_end - 1]) == []
+        assert stream.feed(text[first_end - 1:first_end]) == [PLAN["notes"][0]]
+
+    def test_truncation_path_and_repair(self):
+        text = json.dumps(PLAN, ensure_ascii=False)
+        cut = text.index("Текст Текст Текст") + 8
+        stream = JsonStream()
+        stream.feed(text[:cut])
+        assert stream.truncated
+        assert stream.path() == ["notes", 3, "body"]
+        repaired = stream.repaired()
+        assert repaired["notes"][:3] == PLAN["notes"][:3]
+        assert repaired["notes"][3]["body"] == "Текст Те"
+
+    def test_every_cut_point_repairs(self):
+        text = json.dumps(PLAN)
+        for cut in range(1, len(text)):
+            stream = JsonStream()
+            stream.feed(text[:cut])
+            assert stream.repaired() is not None, text[:cut]
+
+    def test_dangling_key_is_dropped(self):
+        stream = JsonStream()
+        stream.feed('{"notes": [{"id": "a", "title"')
+        assert stream.path() == ["notes", 0]
+        assert stream.repaired() == {"notes": [{"id": "a"}]}
+
+    def test_indexes_count_skipped_elements(self):
+        stream = JsonStream()
+        text = '{"notes": [{"id": "a"}, {"id": 1e}, {"id": "c"}]}'
+        assert stream.feed_indexed(text) == [(0, {"id": "a"}), (2, {"id": "c"})]
+
+    def test_undecodable_key_keeps_its_raw_text(self):
+        stream = JsonStream()
+        assert stream.feed('{"bad\\q": 1, "new\nline": {"x": [') == []
+        assert stream.path() == ["new\nline", "x", 0]
+        assert stream.feed('{"id": "a"}]}, "notes": [{"id": "b"}]}') == [{"id": "b"}]
+        assert stream.done
+
+    def test_extract_json_repairs_an_unclosed_fence(self):
+        assert extract_json('```json\n{"notes": [{"id": "a"}, {"id": "b", "ta') == {
+            "notes": [{"id": "a"}, {"id": "b"}]
+        }
+
+
+class TestRunStreaming:
+    def test_stdout_is_passed_on_as_it_arrives(self):
+        script = "import sys\nfor line in sys.stdin:\n    print(line.upper(), end='', flush=True)"
+        seen: list[str] = []
+        result = run_streaming(
+            [sys.executable, "-c", script], "abc\nпривет\n", timeout_seconds=10, on_text=seen.append
+        )
+        assert result.returncode == 0
+        assert result.stdout == "ABC\nПРИВЕТ\n" == "".join(seen)
+
+    def test_timeout_kills_the_process(self):
+        with pytest.raises(subprocess.TimeoutExpired):
+            run_streaming([sys.executable, "-c", "import time; time.sleep(5)"], "", timeout_seconds=0.2)
+
+    def test_failing_callback_kills_and_reaps_the_process(self, monkeypatch):
+        processes: list[subprocess.Popen] = []
+        popen = subprocess.Popen
+
+        def spawn(*args, **kwargs):
+            processes.append(popen(*args, **kwargs))
+            return processes[-1]
+
+        def on_text(text):
+            raise ValueError("bad chunk")
+
+        monkeypatch.setattr(subprocess, "Popen", spawn)
+        script = "import time\nprint('x', flush=True)\ntime.sleep(5)"
+        with pytest.raises(ValueError, match="bad chunk"):
+            run_streaming([sys.executable, "-c", script], "", timeout_seconds=10, on_text=on_text)
+        assert processes[0].returncode is not None
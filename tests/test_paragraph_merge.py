@@ -0,0 +1,67 @@
+"""Property tests for merge_unique_paragraphs against the all-pairs definition."""
+
+import random
+
+import pytest
+
+from scripts.fix_similar_notes import merge_unique_paragraphs, paragraph_similarity
+
+
+WORDS = ["agent", "prompt", "cache", "vault", "note", "graph", "tool", "агент", "память", "a", "I"]
+
+
+def reference_merge(a_body: str, b_body: str) -> list[str]:
+    merged: list[str] = []
+    for paragraph in [*a_body.split("\n\n"), *b_body.split("\n\n")]:
+        text = paragraph.strip()
+        if text and not any(paragraph_similarity(text, existing) >= 0.9 for existing in merged):
+            merged.append(text)
+    return merged
+
+
+def mutate(rng: random.Random, text: str) -> str:
+    chars = list(text)
+    for _ in range(rng.randint(0, 4)):
+        op = rng.random()
+        pos = rng.randrange(len(chars) + 1)
+        if op < 0.4:
+            chars.insert(pos, rng.choice("xyz ёq"))
+        elif chars and op < 0.8:
+            del chars[min(pos, len(chars) - 1)]
+        elif chars:
+            chars[min(pos, len(chars) - 1)] = chars[min(pos, len(chars) - 1)].upper()
+    return "".join(chars)
+
+
+def make_body(rng: random.Random, pool: list[str], count: int) -> str:
+    paragraphs = []
+    for _ in range(count):
+        roll = rng.random()
+        if pool and roll < 0.3:
+            paragraphs.append(rng.choice(pool))
+        elif pool and roll < 0.7:
+            paragraphs.append(mutate(rng, rng.choice(pool)))
+        elif roll < 0.75:
+            paragraphs.append(rng.choice(["", "  ", "x", "ab", "abc"]))
+        else:
+            text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 30)))
+            pool.append(text)
+            paragraphs.append(text)
+    return "\n\n".join(paragraphs)
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_matches_all_pairs_merge(seed):
+    rng = random.Random(seed)
+    pool: list[str] = []
+    a_body = make_body(rng, pool, rng.randint(0, 30))
+    b_body = make_body(rng, pool, rng.randint(0, 30))
+    assert merge_unique_paragraphs(a_body, b_body) == reference_merge(a_body, b_body)
+
+
+def test_keeps_order_and_drops_near_duplicates():
+    a_body = "First paragraph about caching.\n\nSecond one."
+    b_body = "first paragraph about caching!\n\nThird paragraph."
+    assert merge_unique_paragraphs(a_body, b_body) == [
+        "First paragraph about caching.", "Second one.", "Third paragraph.",
+    ]
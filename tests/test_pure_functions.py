@@ -8,7 +8,9 @@ import pytest
 from scripts.generate_notes import sanitize_filename, render_note_md
 from scripts.vault_writer import parse_frontmatter
 from scripts.atomize import extract_json, validate_atom_plan
+from scripts import audit_vault
 from scripts.audit_vault import NoteRecord, audit_notes, extract_wikilink_targets
+from scripts.vault_index import VaultIndex
 from scripts.enrich_thin_notes import (
     ENRICH_HEADER,
     append_enrichment,
@@ -16,6 +18,7 @@ from scripts.enrich_thin_notes import (
     is_thin_atomic,
 )
 from scripts.archive_empty_notes import archive_destination
+from scripts import process_note
 
 
 # ── sanitize_filename ─────────────────────────────────────────────────────────
@@ -224,6 +227,35 @@ class TestAuditVault:
         )
         assert links == {"Target Note", "Second Note", "Plain Note"}
 
+    def test_parallel_pair_scoring_matches_serial_report(self, monkeypatch):
+        words = ["agent", "memory", "prompt", "vault", "tools", "graph", "агент"]
+        tag_pool = ["tech/ai", "tech/tools", "productivity/pkm"]
+        notes = []
+        for i in range(60):
+            title = " ".join(words[(i * k) % len(words)] for k in range(1, 2 + i % 3))
+            notes.append(self.make_note(
+                f"{title} {i % 7}",
+                "body " * (i % 100),
+                frontmatter={"tags": tag_pool[: i % 4]},
+            ))
+        notes[3].links = {notes[10].title}
+
+        serial = audit_notes(notes, similarity_threshold=0.6)
+        monkeypatch.setattr(audit_vault, "PARALLEL_MIN_NOTES", 0)
+        parallel = audit_notes(notes, similarity_threshold=0.6, workers=3)
+        assert serial["unlinked_similar_pairs"]
+        assert json.dumps(parallel, ensure_ascii=False) == json.dumps(serial, ensure_ascii=False)
+
+    def test_pair_cache_report_matches_uncached(self, tmp_path):
+        notes = [
+            self.make_note(title, "body", frontmatter={"tags": ["tech/ai"]})
+            for title in ("Agent memory", "Agent memories", "Prompt caching", "Prompt cache")
+        ]
+        expected = audit_notes(notes, similarity_threshold=0.6)
+        with VaultIndex(tmp_path / "vault", tmp_path / "index.sqlite") as index:
+            assert audit_notes(notes, similarity_threshold=0.6, pair_cache=index) == expected
+            assert audit_notes(notes, similarity_threshold=0.6, pair_cache=index) == expected
+
 
 class TestThinNoteEnricher:
     def make_note(self, title: str, body: str):
@@ -263,3 +295,32 @@ class TestArchiveEmptyNotes:
         note = vault / "Area" / "Empty.md"
         destination = archive_destination(vault, note, stamp="2026-03-03")
         assert destination == vault / ".archive" / "empty-notes" / "2026-03-03" / "Area" / "Empty.md"
+
+
+class TestWriteEnrichResult:
+    def test_renamed_note_links_point_at_sanitized_file(self, tmp_path, monkeypatch):
+        vault = tmp_path / "vault"
+        (vault / "Notes").mkdir(parents=True)
+        original = vault / "Old idea.md"
+        original.write_text("---\ntitle: Old idea\n---\nBody\n", encoding="utf-8")
+        other = vault / "Other.md"
+        other.write_text("See [[Old idea|the idea]].\n", encoding="utf-8")
+        monkeypatch.setattr(process_note, "load_registry", lambda: {})
+        monkeypatch.setattr(process_note, "save_registry", lambda registry: None)
+
+        note = {
+            "title": "A/B testing: why?",
+            "original_title": "Old idea",
+            "note_type": "atomic",
+            "tags": ["dev/python"],
+            "source_doc": "",
+            "date": "2026-01-01",
+            "body": "Body",
+        }
+        config = {"vault": {"vault_path": str(vault), "notes_folder": "Notes"}}
+        process_note.write_enrich_result({"note": note}, original, config)
+
+        stem = sanitize_filename("A/B testing: why?")
+        assert (vault / "Notes" / f"{stem}.md").exists()
+        assert not original.exists()
+        assert other.read_text(encoding="utf-8") == f"See [[{stem}|the idea]].\n"
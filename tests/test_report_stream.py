@@ -0,0 +1,85 @@
+"""Tests for streaming JSONL reports and their bounded summaries."""
+
+import json
+import random
+from pathlib import Path
+
+import pytest
+
+from scripts.audit_vault import (
+    REPORT_SECTIONS,
+    NoteRecord,
+    audit_notes,
+    iter_audit_records,
+    stream_audit,
+)
+from scripts.report_stream import JsonlWriter, TopN
+
+
+@pytest.mark.parametrize("n", [0, 1, 3, 10, 100])
+def test_top_n_matches_stable_sort(n):
+    rng = random.Random(n)
+    items = [(rng.randint(0, 5), idx) for idx in range(60)]
+    top = TopN(n, key=lambda item: item[0])
+    for item in items:
+        top.push(item)
+    assert top.items() == sorted(items, key=lambda item: item[0])[:n]
+    assert top.seen == len(items)
+
+
+def test_jsonl_writer_replaces_target_only_on_success(tmp_path):
+    target = tmp_path / "report.jsonl"
+    with JsonlWriter(target) as writer:
+        writer.write({"title": "Заметка", "score": 0.5})
+    assert target.read_text(encoding="utf-8") == '{"title": "Заметка", "score": 0.5}\n'
+    assert writer.records == 1 and not writer.to_stdout
+
+    with pytest.raises(RuntimeError):
+        with JsonlWriter(target) as writer:
+            writer.write({"partial": True})
+            raise RuntimeError("interrupted")
+    assert target.read_text(encoding="utf-8") == '{"title": "Заметка", "score": 0.5}\n'
+    assert list(tmp_path.iterdir()) == [target]
+
+
+def make_notes() -> list[NoteRecord]:
+    words = ["agent", "memory", "prompt", "vault", "tools", "graph"]
+    notes = []
+    for i in range(40):
+        title = " ".join(words[(i * k) % len(words)] for k in range(1, 2 + i % 3))
+        notes.append(NoteRecord(
+            path=Path(f"/tmp/{i}.md"),
+            title=f"{title} {i % 5}",
+            note_type="atomic" if i % 9 else "",
+            source_doc="",
+            frontmatter={} if i % 7 else {"tags": ["tech/ai"]},
+            body="body " * (i * 7 % 120),
+            tags={"tech/ai"} if i % 2 else set(),
+            links=set(),
+        ))
+    return notes
+
+
+def test_streamed_audit_matches_full_report(tmp_path):
+    notes = make_notes()
+    report = audit_notes(notes, similarity_threshold=0.6)
+    assert len(report["unlinked_similar_pairs"]) > 5
+
+    target = tmp_path / "audit.jsonl"
+    with JsonlWriter(target) as writer:
+        trimmed = stream_audit(
+            iter_audit_records(notes, similarity_threshold=0.6), writer,
+            total_notes=len(notes), limit=5,
+        )
+
+    assert trimmed == {
+        "summary": report["summary"],
+        **{section: items[:5] for section, items in report.items() if section != "summary"},
+    }
+
+    lines = [json.loads(line) for line in target.read_text(encoding="utf-8").splitlines()]
+    sections: dict[str, list[dict]] = {name: [] for name in REPORT_SECTIONS}
+    for line in lines:
+        sections[line.pop("section")].append(line)
+    sections["unlinked_similar_pairs"].sort(key=lambda item: (-item["score"], item["a"], item["b"]))
+    assert {"summary": report["summary"], **sections} == report
@@ -0,0 +1,370 @@
+"""Tests for the rewrite backend wrapper, its response cache and warm sessions."""
+
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from scripts import rewrite_backend
+from scripts.rewrite_backend import (
+    ANCHOR_CHARS,
+    AmbiguousSplice,
+    BackendPool,
+    BackendSession,
+    BackendSessionError,
+    ContinuationStats,
+    ResponseCache,
+    call_claude,
+    call_rewriter,
+    continuation_prompt,
+    estimate_tokens,
+    pack_batches,
+    splice_continuation,
+)
+from scripts.json_stream import JsonStream
+
+
+def reply(number: int) -> str:
+    return f'{{"response": {number}}}'
+
+
+def fake_claude(monkeypatch, replies=None):
+    calls: list[str] = []
+
+    def call_claude(prompt, **kwargs):
+        calls.append(prompt)
+        return replies[len(calls) - 1] if replies else reply(len(calls))
+
+    monkeypatch.setattr(rewrite_backend, "call_claude", call_claude)
+    monkeypatch.delenv("OBSIDIAN_DATAWEAVE_MODEL_TAG", raising=False)
+    return calls
+
+
+class TestPackBatches:
+    def test_estimate_counts_cyrillic_denser(self):
+        assert estimate_tokens("a" * 400) == 101
+        assert estimate_tokens("я" * 400) == 201
+
+    def test_first_fit_decreasing_keeps_input_order(self):
+        assert pack_batches([3, 5, 2, 4, 1], 6) == [[0], [1, 4], [2, 3]]
+        assert pack_batches([1, 1, 1, 1], 2) == [[0, 1], [2, 3]]
+
+    def test_oversized_items_get_their_own_batch(self):
+        assert pack_batches([10, 1, 1], 5) == [[0], [1, 2]]
+        assert pack_batches([], 5) == []
+
+
+class TestResponseCache:
+    def test_replay_skips_the_backend(self, tmp_path, monkeypatch):
+        calls = fake_claude(monkeypatch)
+        cache = ResponseCache(tmp_path)
+        assert call_rewriter("prompt", backend="claude", cache=cache) == ("claude", reply(1))
+        assert call_rewriter("prompt", backend="claude", cache=cache) == ("claude", reply(1))
+        assert calls == ["prompt"]
+        assert (cache.hits, cache.misses) == (1, 1)
+
+        assert call_rewriter("prompt", backend="claude")[1] == reply(2)
+        assert call_rewriter("other", backend="claude", cache=cache)[1] == reply(3)
+        assert call_rewriter("prompt", backend="claude", cache=cache, model_tag="m2")[1] == reply(4)
+
+    def test_refresh_calls_again_and_overwrites(self, tmp_path, monkeypatch):
+        calls = fake_claude(monkeypatch)
+        call_rewriter("prompt", backend="claude", cache=ResponseCache(tmp_path))
+        refreshed = call_rewriter("prompt", backend="claude", cache=ResponseCache(tmp_path, refresh=True))
+        assert refreshed[1] == reply(2)
+        assert call_rewriter("prompt", backend="claude", cache=ResponseCache(tmp_path))[1] == reply(2)
+        assert len(calls) == 2
+
+    def test_incomplete_json_is_not_stored(self, tmp_path, monkeypatch):
+        calls = fake_claude(monkeypatch, ['{"notes": [{"title": "cut', "not json", reply(3)])
+        cache = ResponseCache(tmp_path)
+        assert call_rewriter("prompt", backend="claude", cache=cache)[1] == '{"notes": [{"title": "cut'
+        assert call_rewriter("prompt", backend="claude", cache=cache)[1] == "not json"
+        assert call_rewriter("prompt", backend="claude", cache=cache)[1] == reply(3)
+        assert call_rewriter("prompt", backend="claude", cache=cache)[1] == reply(3)
+        assert len(calls) == 3
+
+    def test_key_depends_on_backend_and_model_tag(self):
+        keys = {
+            ResponseCache.key("p", "claude"),
+            ResponseCache.key("p", "codex"),
+            ResponseCache.key("p", "claude", "model-b"),
+            ResponseCache.key("p\0", "claude"),
+        }
+        assert len(keys) == 4
+
+    def test_expired_entries_miss_and_are_removed(self, tmp_path):
+        cache = ResponseCache(tmp_path, max_age_seconds=60)
+        key = cache.key("prompt", "claude")
+        cache.put(key, "old", backend="claude")
+        path = next(tmp_path.glob("*/*.json"))
+        assert json.loads(path.read_text(encoding="utf-8"))["response"] == "old"
+
+        stale = time.time() - 120
+        os.utime(path, (stale, stale))
+        assert cache.get(key) is None
+        assert not path.exists()
+
+    def test_size_limit_evicts_least_recently_used(self, tmp_path):
+        cache = ResponseCache(tmp_path, max_bytes=10 ** 9)
+        keys = [cache.key(f"prompt {i}", "claude") for i in range(3)]
+        for age, key in zip((30, 20, 10), keys):
+            cache.put(key, "x" * 1000, backend="claude")
+            stamp = time.time() - age
+            os.utime(cache._path(key), (stamp, stamp))
+        assert cache.get(keys[0]) == "x" * 1000          # now the most recent
+
+        cache.max_bytes = sum(cache._path(keys[i]).stat().st_size for i in (0, 2))
+        assert cache.prune() == 1
+        assert cache.get(keys[1]) is None
+        assert cache.get(keys[0]) is not None and cache.get(keys[2]) is not None
+
+    def test_corrupt_entry_is_a_miss(self, tmp_path):
+        cache = ResponseCache(tmp_path)
+        key = cache.key("prompt", "claude")
+        cache._path(key).parent.mkdir(parents=True)
+        cache._path(key).write_text("{not json", encoding="utf-8")
+        assert cache.get(key) is None
+
+
+FAKE_CLI = [sys.executable, str(Path(__file__).with_name("fake_backend_cli.py"))]
+
+
+def fake_pool(size=1, **kwargs) -> BackendPool:
+    return BackendPool(size, command=FAKE_CLI, **kwargs)
+
+
+class TestBackendPool:
+    def test_each_call_takes_a_prestarted_process(self):
+        pool = fake_pool()
+        try:
+            first = call_claude("one", pool=pool)
+            standby_pid = pool._idle[0].pid
+            second = call_claude("two", pool=pool)
+        finally:
+            pool.close()
+        pid, turn, text = first.split(":")
+        assert (turn, text) == ("1", "one")
+        assert second == f"{standby_pid}:1:two"
+        assert standby_pid != int(pid)
+        assert pool.started == 3
+
+    def test_session_answers_one_prompt(self):
+        session = BackendSession(FAKE_CLI).start()
+        try:
+            assert session.ask("a", 5).endswith(":1:a")
+            assert not session.healthy()
+            with pytest.raises(BackendSessionError, match="already answered"):
+                session.ask("b", 5)
+        finally:
+            session.close()
+
+    def test_dead_session_is_replaced(self):
+        pool = fake_pool()
+        try:
+            with pool.acquire() as session:
+                first_pid = session.pid
+                with pytest.raises(BackendSessionError, match="exited with code 3"):
+                    session.ask("CRASH", 5)
+            with pool.acquire() as session:
+                assert session.pid != first_pid
+                assert session.ask("again", 5).endswith(":1:again")
+        finally:
+            pool.close()
+        assert pool.started == 3
+
+    def test_error_result_raises(self):
+        session = BackendSession(FAKE_CLI).start()
+        try:
+            with pytest.raises(BackendSessionError, match="returned an error"):
+                session.ask("ERROR", 5)
+        finally:
+            session.close()
+
+    def test_stale_standby_is_replaced(self):
+        pool = fake_pool(idle_timeout=0.05)
+        try:
+            with pool.acquire() as session:
+                session.ask("a", 5)
+            [stale] = pool._idle
+            stale_pid = stale.pid
+            time.sleep(0.1)
+            with pool.acquire() as session:
+                assert session.pid != stale_pid
+                assert session.ask("b", 5).endswith(":1:b")
+        finally:
+            pool.close()
+        assert not stale.healthy()
+        assert pool.started == 4
+
+    def test_timeout_kills_the_session(self):
+        session = BackendSession(FAKE_CLI).start()
+        with pytest.raises(subprocess.TimeoutExpired):
+            session.ask("SLOW", 0.2)
+        assert not session.healthy()
+
+    def test_close_shuts_down_standby_sessions(self):
+        pool = fake_pool(2)
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            answers = list(executor.map(lambda p: call_claude(p, pool=pool), ["x", "y", "z"]))
+        sessions = list(pool._idle)
+        assert [answer.split(":", 1)[1] for answer in answers] == ["1:x", "1:y", "1:z"]
+        assert sessions and all(session.healthy() for session in sessions)
+        pool.close()
+        assert all(not session.healthy() for session in sessions)
+        with pytest.raises(BackendSessionError, match="closed"):
+            with pool.acquire():
+                pass
+
+    def test_notes_stream_to_callback(self):
+        pool = fake_pool()
+        seen: list[tuple[int, dict]] = []
+        prompt = json.dumps({"notes": [{"id": "a"}, {"id": "b"}]})
+        try:
+            response = call_claude(
+                prompt, pool=pool, on_note=lambda note, index: seen.append((index, note))
+            )
+        finally:
+            pool.close()
+        assert response.endswith(prompt)
+        assert seen == [(0, {"id": "a"}), (1, {"id": "b"})]
+
+
+class TestStructuralContinuation:
+    PLAN = {
+        "notes": [
+            {"id": f"n{i}", "title": f"Note {i}", "body": f"Body of note {i}. " * 20}
+            for i in range(4)
+        ]
+    }
+
+    def cut(self, marker: str) -> tuple[str, str]:
+        text = json.dumps(self.PLAN)
+        at = text.index(marker)
+        return text[:at], text[at:]
+
+    def test_prompt_names_the_open_path(self):
+        head, _ = self.cut("note 2. Body")
+        stream = JsonStream()
+        stream.feed(head)
+        prompt = continuation_prompt(stream)
+        assert "inside the string value at notes[2].body" in prompt
+        assert repr('"}]}') in prompt
+        assert head[-200:] in prompt
+
+    def test_splice_trims_an_anchor_and_fences(self):
+        head, rest = self.cut("note 2. Body")
+        spliced, trimmed = splice_continuation(
+            head, "```json\n" + head[-40:] + rest + "\n```", anchor=40
+        )
+        assert trimmed == 40
+        assert json.loads(spliced) == self.PLAN
+        assert splice_continuation(head, rest, anchor=40) is None  # echo missing
+        assert splice_continuation(head, rest) == (json.dumps(self.PLAN), 0)
+
+    def test_splice_accepts_a_still_open_prefix(self):
+        head, rest = self.cut("note 1. Body")
+        spliced, _ = splice_continuation(head, rest[:300])
+        stream = JsonStream()
+        stream.feed(spliced)
+        assert stream.truncated and stream.repaired() is not None
+
+    def test_splice_rejects_a_restart_or_a_bad_seam(self):
+        head, _ = self.cut('{"id": "n2"')
+        assert splice_continuation(head, json.dumps(self.PLAN)) is None
+        assert splice_continuation(head, '"body": 1}]}') is None
+        assert splice_continuation(head, "") is None
+        assert splice_continuation(head, ', "a\nb": 1}]}') is None
+
+    def test_echoed_tail_is_ambiguous(self):
+        head, rest = self.cut("note 2. Body")
+        for size in (2, 6, 40):
+            with pytest.raises(AmbiguousSplice):
+                splice_continuation(head, head[-size:] + rest)
+        # Echoing an opening quote only fits one way, so the echo is trimmed
+        assert splice_continuation(head, head[-15:] + rest) == (json.dumps(self.PLAN), 15)
+
+    def round_trip(self, kept: str, rest: str) -> str:
+        """Splice the exact remainder, re-asking with an anchor as call_claude does."""
+        try:
+            spliced = splice_continuation(kept, rest)
+        except AmbiguousSplice:
+            anchor = min(ANCHOR_CHARS, len(kept))
+            spliced = splice_continuation(kept, kept[-anchor:] + rest, anchor=anchor)
+        assert spliced is not None, (kept, rest)
+        return spliced[0]
+
+    def test_repeated_list_items_are_never_trimmed(self):
+        text = json.dumps({"tags": ["epsilon", "beta", "beta", "nu", "nu"], "n": 1}, indent=1)
+        for marker in (',\n  "beta",\n  "nu"', ',\n  "nu"\n'):
+            at = text.rindex(marker)
+            with pytest.raises(AmbiguousSplice):
+                splice_continuation(text[:at], text[at:])
+            assert self.round_trip(text[:at], text[at:]) == text
+
+    def test_exact_remainder_round_trips(self):
+        rng = random.Random(7)
+        words = ["alpha", "beta", "nu", "beta", "Текст", "epsilon"]
+        for _ in range(300):
+            doc = {"notes": [
+                {
+                    "title": " ".join(rng.choices(words, k=rng.randint(1, 3))),
+                    "tags": rng.choices(words, k=rng.randint(0, 5)),
+                    "body": " ".join(rng.choices(words, k=rng.randint(0, 30))),
+                }
+                for _ in range(rng.randint(1, 3))
+            ]}
+            text = json.dumps(doc, ensure_ascii=False, indent=rng.choice([None, 1]))
+            stream = JsonStream()
+            stream.feed(text[:rng.randrange(1, len(text))])
+            kept = stream.text[:stream.resume_offset()]
+            assert self.round_trip(kept, text[len(kept):]) == text
+
+    def test_call_claude_continues_from_the_resume_point(self, monkeypatch):
+        head, rest = self.cut('"title": "Note 2"')
+        replies = [head + '"tit', ", " + rest]  # resumes after "n2", before the comma
+        prompts: list[str] = []
+
+        def run_claude(prompt, *, on_text=None, **kwargs):
+            prompts.append(prompt)
+            text = replies[len(prompts) - 1]
+            if on_text is not None:
+                on_text(text)
+            return subprocess.CompletedProcess([], 0, text, "")
+
+        monkeypatch.setattr(rewrite_backend, "_run_claude", run_claude)
+        monkeypatch.setattr(rewrite_backend, "continuation_stats", ContinuationStats())
+        seen: list[dict] = []
+        response = call_claude("plan please", on_note=lambda note, index: seen.append(note))
+
+        assert json.loads(response) == self.PLAN
+        assert seen == self.PLAN["notes"]
+        assert "inside the object at notes[2]" in prompts[1]
+        stats = rewrite_backend.continuation_stats
+        assert (stats.requested, stats.spliced, stats.rejected) == (1, 1, 0)
+        assert stats.prompt_tokens_saved > 0
+
+    def test_ambiguous_seam_is_asked_again_with_an_anchor(self, monkeypatch):
+        head, rest = self.cut("note 2. Body")
+        replies = [head, head[-20:] + rest, head[-40:] + rest]
+        prompts: list[str] = []
+
+        def run_claude(prompt, *, on_text=None, **kwargs):
+            prompts.append(prompt)
+            text = replies[len(prompts) - 1]
+            if on_text is not None:
+                on_text(text)
+            return subprocess.CompletedProcess([], 0, text, "")
+
+        monkeypatch.setattr(rewrite_backend, "_run_claude", run_claude)
+        monkeypatch.setattr(rewrite_backend, "continuation_stats", ContinuationStats())
+        assert json.loads(call_claude("plan please")) == self.PLAN
+        assert "Begin by repeating the last 40 characters" in prompts[2]
+        stats = rewrite_backend.continuation_stats
+        assert (stats.requested, stats.ambiguous, stats.spliced, stats.rejected) == (2, 1, 1, 0)
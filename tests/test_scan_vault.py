@@ -0,0 +1,48 @@
+"""Tests for the pruning vault walker and scan_vault."""
+
+import os
+from pathlib import Path
+
+from scripts.scan_vault import iter_vault_files, relative_posix, scan_vault
+
+
+def touch(path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("body\n", encoding="utf-8")
+
+
+class TestIterVaultFiles:
+    def test_prunes_skip_dirs_at_any_depth(self, tmp_path):
+        touch(tmp_path / "Root.md")
+        touch(tmp_path / "Area" / "Note.md")
+        touch(tmp_path / "Area" / ".trash" / "Deleted.md")
+        touch(tmp_path / ".git" / "objects" / "ab.md")
+        touch(tmp_path / ".smart-env" / "cache.md")
+        touch(tmp_path / "Area" / "image.png")
+
+        found = sorted(relative_posix(entry, tmp_path) for entry in iter_vault_files(tmp_path))
+        assert found == ["Area/Note.md", "Root.md"]
+
+    def test_skip_hidden_prunes_all_dot_dirs(self, tmp_path):
+        touch(tmp_path / ".custom" / "Hidden.md")
+        touch(tmp_path / "Visible.md")
+
+        assert {e.name for e in iter_vault_files(tmp_path)} == {"Hidden.md", "Visible.md"}
+        assert {e.name for e in iter_vault_files(tmp_path, skip_hidden=True)} == {"Visible.md"}
+
+    def test_does_not_follow_directory_symlinks(self, tmp_path):
+        touch(tmp_path / "real" / "Note.md")
+        os.symlink(tmp_path / "real", tmp_path / "link")
+
+        assert [relative_posix(e, tmp_path) for e in iter_vault_files(tmp_path)] == ["real/Note.md"]
+
+
+class TestScanVault:
+    def test_groups_titles_by_folder(self, tmp_path):
+        touch(tmp_path / "Root.md")
+        touch(tmp_path / "Area" / "B.md")
+        touch(tmp_path / "Area" / "A.md")
+        touch(tmp_path / ".archive" / "Old.md")
+
+        result = scan_vault(tmp_path, exclude={"Root.md"})
+        assert result == {"titles": ["A", "B"], "notes_by_folder": {"Area": ["A", "B"]}}
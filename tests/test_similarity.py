@@ -0,0 +1,182 @@
+"""Tests for shared similarity scoring primitives."""
+
+import random
+from difflib import SequenceMatcher
+from types import SimpleNamespace
+
+import pytest
+
+from scripts import similarity
+from scripts.similarity import (
+    AUDIT_WEIGHTS,
+    DEDUP_WEIGHTS,
+    PruneStats,
+    SimilarityCorpus,
+    TagEncoder,
+    bounded_title_score,
+    cached_pairs_above,
+    tag_jaccard,
+    tag_jaccard_many,
+    tag_mask,
+    title_features,
+)
+from scripts.vault_index import VaultIndex
+
+
+def set_jaccard(a: set[str], b: set[str]) -> float:
+    union = a | b
+    return len(a & b) / len(union) if union else 0.0
+
+
+class TestTagMasks:
+    def test_encoder_assigns_stable_bits(self):
+        encoder = TagEncoder(["tech/ai", "tech/tools"])
+        assert encoder.encode(["tech/tools", "tech/ai"]) == 0b11
+        assert encoder.encode(["new/tag"]) == 0b100
+        assert encoder.encode(["new/tag"]) == 0b100
+        assert len(encoder) == 3
+
+    def test_jaccard_matches_set_jaccard(self):
+        tag_sets = [
+            set(),
+            {"tech/ai"},
+            {"tech/ai", "tech/tools"},
+            {"tech/tools", "productivity/pkm", "science/biology"},
+            {"productivity/pkm"},
+        ]
+        masks = [tag_mask(tags) for tags in tag_sets]
+        for a, mask_a in zip(tag_sets, masks):
+            expected = [set_jaccard(a, b) for b in tag_sets]
+            assert tag_jaccard_many(mask_a, masks) == expected
+            assert [tag_jaccard(mask_a, mask_b) for mask_b in masks] == expected
+
+
+class TestBoundedTitleScore:
+    TITLES = [
+        "", "a", "Agent memory", "agent memory systems", "Memory of agents",
+        "Claude Agent SDK tools", "Система инструментов агента", "Инструменты агента",
+        "zzz", "Prompt caching in practice", "prompt cache",
+    ]
+
+    def test_matches_unbounded_score(self):
+        def weighted(ratio: float) -> float:
+            return 0.7 * ratio + 0.3 * 0.5
+
+        stats = PruneStats()
+        for threshold in (0.0, 0.3, 0.5, 0.72, 0.9):
+            for a in self.TITLES:
+                for b in self.TITLES:
+                    fa, fb = title_features(a), title_features(b)
+                    full = weighted(SequenceMatcher(None, a.lower(), b.lower()).ratio())
+                    expected = full if full >= threshold else None
+                    assert bounded_title_score(fa, fb, threshold, weighted, stats) == expected
+        assert stats.pruned > 0
+        assert stats.scored > 0
+
+
+class TestSimilarityCorpus:
+    WORDS = ["agent", "memory", "prompt", "vault", "tools", "graph", "агент", "память"]
+    TAGS = ["tech/ai", "tech/tools", "productivity/pkm", "science/biology"]
+
+    def make_corpus(self, weights, seed: int = 3, size: int = 50) -> SimilarityCorpus:
+        rng = random.Random(seed)
+        titles = [
+            " ".join(rng.choice(self.WORDS) for _ in range(rng.randint(1, 3)))
+            + ("" if rng.random() < 0.5 else f" {i}")
+            for i in range(size)
+        ]
+        titles[0] = titles[1] = ""
+        tags = [rng.sample(self.TAGS, rng.randint(0, 2)) for _ in range(size)]
+        return SimilarityCorpus(titles, [tag_mask(t) for t in tags], weights)
+
+    @staticmethod
+    def reference(corpus: SimilarityCorpus, a: int, b: int) -> float:
+        w = corpus.weights
+        fa, fb = corpus.features[a], corpus.features[b]
+        title_sim = SequenceMatcher(None, fa.lower, fb.lower).ratio()
+        tag_sim = tag_jaccard(corpus.masks[a], corpus.masks[b])
+        union = fa.tokens | fb.tokens
+        token_sim = len(fa.tokens & fb.tokens) / len(union) if union else 0.0
+        return w.title * title_sim + w.tags * tag_sim + w.tokens * token_sim
+
+    @pytest.mark.parametrize("weights", [DEDUP_WEIGHTS, AUDIT_WEIGHTS])
+    @pytest.mark.parametrize("threshold", [0.0, 0.3, 0.55, 0.72, 0.9])
+    def test_pairs_above_matches_brute_force(self, weights, threshold):
+        corpus = self.make_corpus(weights)
+        expected = [
+            (i, j, self.reference(corpus, i, j))
+            for i in range(len(corpus))
+            for j in range(i + 1, len(corpus))
+            if self.reference(corpus, i, j) >= threshold
+        ]
+        assert corpus.pairs_above(threshold) == expected
+        assert (
+            corpus.pairs_above(threshold, rows=range(0, 20))
+            + corpus.pairs_above(threshold, rows=range(20, len(corpus)))
+        ) == expected
+
+    def test_top_k_matches_sorted_scores(self):
+        corpus = self.make_corpus(AUDIT_WEIGHTS)
+        for idx in (2, 10, 33):
+            ranked = sorted(
+                ((corpus.score(idx, j), j) for j in range(len(corpus)) if j != idx),
+                key=lambda item: (-item[0], item[1]),
+            )
+            assert corpus.top_k(idx, 5) == ranked[:5]
+            assert corpus.top_k(idx, 5, threshold=0.6) == [r for r in ranked if r[0] >= 0.6][:5]
+
+
+class TestPairScoreCache:
+    def make_notes(self, count: int, seed: int = 5) -> list[SimpleNamespace]:
+        rng = random.Random(seed)
+        words = TestSimilarityCorpus.WORDS
+        return [
+            SimpleNamespace(
+                title=" ".join(rng.choice(words) for _ in range(rng.randint(1, 3))) + f" {i % 9}",
+                tags=rng.sample(TestSimilarityCorpus.TAGS, rng.randint(0, 2)),
+            )
+            for i in range(count)
+        ]
+
+    def check(self, notes, threshold, index):
+        corpus = SimilarityCorpus.from_notes(notes, AUDIT_WEIGHTS)
+        pairs, stats = cached_pairs_above(corpus, threshold, index)
+        assert pairs == corpus.pairs_above(threshold)
+        return stats
+
+    def test_reruns_score_only_changed_notes(self, tmp_path):
+        notes = self.make_notes(40)
+        with VaultIndex(tmp_path / "vault", tmp_path / "index.sqlite") as index:
+            first = self.check(notes, 0.6, index)
+            assert first.cached_pairs == 0 and first.stored > 0
+
+            again = self.check(notes, 0.6, index)
+            assert again.scored_pairs == 0
+            assert again.hit_rate == 1.0
+
+            notes[3] = SimpleNamespace(title="agent memory 4", tags=["tech/ai"])
+            del notes[10]
+            notes.append(SimpleNamespace(title=notes[0].title, tags=list(notes[0].tags)))
+            changed = self.check(notes, 0.6, index)
+            assert changed.evicted > 0
+            assert changed.cached_pairs == 39 * 38 // 2  # only the edited note is new
+
+            assert self.check(notes, 0.8, index).scored_pairs == 0
+
+    def test_parallel_fresh_scoring_matches_serial(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(similarity, "PARALLEL_MIN_FRESH", 0)
+        notes = self.make_notes(40)
+        corpus = SimilarityCorpus.from_notes(notes, AUDIT_WEIGHTS)
+        with VaultIndex(tmp_path / "vault", tmp_path / "index.sqlite") as index:
+            pairs, stats = cached_pairs_above(corpus, 0.6, index, workers=2)
+            assert pairs == corpus.pairs_above(0.6)
+            assert stats.stored > 0
+            assert self.check(notes, 0.6, index).scored_pairs == 0
+
+    def test_lower_threshold_rebuilds_cache(self, tmp_path):
+        notes = self.make_notes(30)
+        with VaultIndex(tmp_path / "vault", tmp_path / "index.sqlite") as index:
+            self.check(notes, 0.8, index)
+            lowered = self.check(notes, 0.5, index)
+            assert lowered.cached_pairs == 0
+            assert self.check(notes, 0.6, index).hit_rate == 1.0
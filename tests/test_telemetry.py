@@ -0,0 +1,88 @@
+"""Tests for backend call telemetry and its per-call-site summary."""
+
+import json
+import subprocess
+
+import pytest
+
+from scripts import rewrite_backend
+from scripts.rewrite_backend import ResponseCache, call_rewriter
+from scripts.telemetry import (
+    TelemetrySink,
+    format_summary,
+    load_records,
+    percentile,
+    summarize_calls,
+)
+
+
+@pytest.fixture
+def sink(tmp_path, monkeypatch):
+    sink = TelemetrySink()
+    sink.enable(tmp_path / "staging" / "telemetry.jsonl")
+    monkeypatch.setattr(rewrite_backend, "telemetry", sink)
+    monkeypatch.delenv("OBSIDIAN_DATAWEAVE_MODEL_TAG", raising=False)
+    return sink
+
+
+class TestTelemetry:
+    def test_percentile_is_nearest_rank(self):
+        values = [float(v) for v in range(1, 21)]
+        assert percentile(values, 50) == 10.0
+        assert percentile(values, 95) == 19.0
+        assert percentile([3.0], 95) == 3.0
+
+    def test_calls_are_recorded_with_call_site(self, sink, tmp_path, monkeypatch):
+        replies = iter([
+            subprocess.CompletedProcess([], 1, "", "boom"),
+            subprocess.CompletedProcess([], 0, '["ответ"]', ""),
+        ])
+        monkeypatch.setattr(rewrite_backend, "_run_claude", lambda prompt, **kwargs: next(replies))
+        monkeypatch.setattr(rewrite_backend.time, "sleep", lambda seconds: None)
+
+        cache = ResponseCache(tmp_path / "cache")
+        call_rewriter("промпт", backend="claude", cache=cache, call_site="atomize")
+        call_rewriter("промпт", backend="claude", cache=cache, call_site="atomize")
+
+        records = load_records(sink.path)
+        assert records == sink.records
+        first, second = records
+        assert first["call_site"] == "atomize"
+        assert (first["cache"], first["attempts"], first["ok"]) == ("miss", 2, True)
+        assert (first["prompt_bytes"], first["response_bytes"]) == (12, 14)
+        assert (second["cache"], second["attempts"]) == ("hit", 0)
+
+    def test_failed_calls_are_recorded(self, sink, monkeypatch):
+        def run_claude(prompt, **kwargs):
+            raise subprocess.TimeoutExpired("claude", 1)
+
+        monkeypatch.setattr(rewrite_backend, "_run_claude", run_claude)
+        monkeypatch.setattr(rewrite_backend, "write_debug_prompt", lambda prompt, prefix: "debug")
+        with pytest.raises(RuntimeError):
+            call_rewriter("prompt", backend="claude", call_site="dedup_vault.verify")
+        (record,) = sink.records
+        assert record["ok"] is False and record["error"].startswith("RuntimeError")
+        assert record["attempts"] == 1
+
+    def test_summary_groups_by_call_site(self):
+        records = [
+            {"call_site": "atomize", "duration_s": d, "prompt_bytes": 2048, "attempts": 1}
+            for d in (1.0, 2.0, 10.0)
+        ] + [
+            {"call_site": "dedup_vault.verify", "duration_s": 4.0, "attempts": 3, "ok": False,
+             "continuations": 1, "cache": "hit"},
+        ]
+        rows = summarize_calls(records)
+        assert [row["call_site"] for row in rows] == ["atomize", "dedup_vault.verify"]
+        assert (rows[0]["calls"], rows[0]["p50_s"], rows[0]["p95_s"]) == (3, 2.0, 10.0)
+        assert rows[0]["prompt_kb"] == 6.0
+        assert (rows[1]["errors"], rows[1]["retries"], rows[1]["continuations"]) == (1, 2, 1)
+        assert rows[1]["cache_hits"] == 1
+        table = format_summary(rows).splitlines()
+        assert table[0].split()[:3] == ["call_site", "calls", "errors"]
+        assert len(table) == 4
+
+    def test_corrupt_lines_are_skipped(self, tmp_path):
+        path = tmp_path / "telemetry.jsonl"
+        path.write_text(json.dumps({"call_site": "a"}) + "\n{broken\n\n", encoding="utf-8")
+        assert load_records(path) == [{"call_site": "a"}]
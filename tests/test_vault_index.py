@@ -0,0 +1,213 @@
+"""Tests for the persistent incremental vault index."""
+
+import os
+from pathlib import Path
+
+from scripts.audit_vault import iter_notes
+from scripts.body_index import sync_body_terms
+from scripts.dedup_vault import deep_scan_vault, update_wikilinks
+from scripts.rebuild_processed import rebuild_registry
+from scripts.vault_index import VaultIndex, load_indexed_notes, load_parsed_notes
+
+
+NOTE = (
+    "---\n"
+    "tags:\n"
+    "  - tech/ai\n"
+    "date: 2026-03-01\n"
+    'source_doc: "Doc.docx"\n'
+    "note_type: atomic\n"
+    "---\n"
+    "\n"
+    "Body with [[Other Note|alias]] and [[Third#Heading]].\n"
+)
+
+
+def write(path: Path, text: str) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+    return path
+
+
+def bump_mtime(path: Path) -> None:
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+class TestVaultIndex:
+    def test_refresh_parses_only_changed_files(self, tmp_path):
+        vault = tmp_path / "vault"
+        index_path = tmp_path / "index.sqlite"
+        first = write(vault / "Notes" / "First.md", NOTE)
+        write(vault / "Notes" / "Second.md", NOTE)
+        write(vault / ".archive" / "Old.md", NOTE)
+
+        with VaultIndex(vault, index_path) as index:
+            stats = index.refresh()
+            assert (stats.added, stats.updated, stats.removed) == (2, 0, 0)
+
+            stats = index.refresh()
+            assert stats.parsed == 0
+            assert stats.unchanged == 2
+
+            write(first, NOTE + "\nMore text.\n")
+            bump_mtime(first)
+            (vault / "Notes" / "Second.md").unlink()
+            stats = index.refresh()
+            assert (stats.added, stats.updated, stats.removed) == (0, 1, 1)
+            assert [note.stem for note in index.notes()] == ["First"]
+
+    def test_indexed_fields(self, tmp_path):
+        vault = tmp_path / "vault"
+        write(vault / "Notes" / "First.md", NOTE)
+
+        [note] = load_indexed_notes(vault, index_path=tmp_path / "index.sqlite")
+        assert note.title == "First"
+        assert note.tags == ["tech/ai"]
+        assert note.frontmatter["date"] == "2026-03-01"
+        assert note.frontmatter["source_doc"] == "Doc.docx"
+        assert note.links == ["Other Note", "Third"]
+        assert note.word_count == 6
+        assert len(note.content_hash) == 40
+
+    def test_folder_filter_and_stem_lookup(self, tmp_path):
+        vault = tmp_path / "vault"
+        index_path = tmp_path / "index.sqlite"
+        write(vault / "A" / "One.md", NOTE)
+        write(vault / "AB" / "Two.md", NOTE)
+
+        with VaultIndex(vault, index_path) as index:
+            index.refresh()
+            assert [note.stem for note in index.notes("A")] == ["One"]
+            assert index.paths_by_stem("Two") == [vault / "AB" / "Two.md"]
+
+    def test_non_string_frontmatter_keys(self, tmp_path):
+        write(tmp_path / "vault" / "Dated.md", "---\n2024-01-01: x\ntags: [a]\n---\n\nBody\n")
+        [note] = load_indexed_notes(tmp_path / "vault", index_path=tmp_path / "index.sqlite")
+        assert note.frontmatter == {"2024-01-01": "x", "tags": ["a"]}
+
+    def test_unreadable_file_drops_its_rows(self, tmp_path):
+        vault = tmp_path / "vault"
+        note = write(vault / "Note.md", NOTE)
+        with VaultIndex(vault, tmp_path / "index.sqlite") as index:
+            index.refresh()
+            note.write_bytes(b"\xff\xfe not utf-8")
+            bump_mtime(note)
+            assert index.refresh().removed == 1
+            assert index.notes() == []
+            assert index.backlinks(["Other Note"]) == []
+
+    def test_index_resets_for_another_vault(self, tmp_path):
+        index_path = tmp_path / "index.sqlite"
+        write(tmp_path / "v1" / "One.md", NOTE)
+        write(tmp_path / "v2" / "Two.md", NOTE)
+
+        assert [n.stem for n in load_indexed_notes(tmp_path / "v1", index_path=index_path)] == ["One"]
+        assert [n.stem for n in load_indexed_notes(tmp_path / "v2", index_path=index_path)] == ["Two"]
+
+    def test_reset_clears_derived_tables(self, tmp_path):
+        index_path = tmp_path / "index.sqlite"
+        write(tmp_path / "v1" / "One.md", NOTE)
+        with VaultIndex(tmp_path / "v1", index_path) as index:
+            index.refresh()
+            sync_body_terms(index)
+            index.cache_put("minhash", [("hash", b"sig")])
+            index.pair_cache_reset("scorer", 0.5)
+            index.pair_cache_store("scorer", [("a", "b", 0.9, 0.8)], ["a", "b"])
+
+        with VaultIndex(tmp_path / "v2", index_path) as index:
+            for table in ("cache", "pair_scores", "pair_scored", "body_docs", "body_terms"):
+                assert index.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone() == (0,)
+            assert index.pair_cache_state("scorer") == (None, set())
+
+
+class TestBacklinks:
+    def test_backlinks_follow_edits_and_deletes(self, tmp_path):
+        vault = tmp_path / "vault"
+        index_path = tmp_path / "index.sqlite"
+        a = write(vault / "A.md", "See [[Target|alias]].\n")
+        write(vault / "B.md", "---\nrelated: \"[[Target#Part]]\"\n---\nNo body link.\n")
+        write(vault / "C.md", "Unrelated [[Other]].\n")
+
+        with VaultIndex(vault, index_path) as index:
+            index.refresh()
+            assert index.backlinks(["Target"]) == [vault / "A.md", vault / "B.md"]
+            assert index.backlinks(["Other", "Missing"]) == [vault / "C.md"]
+
+            write(a, "No links any more.\n")
+            bump_mtime(a)
+            (vault / "C.md").unlink()
+            index.refresh()
+            assert index.backlinks(["Target"]) == [vault / "B.md"]
+            assert index.backlinks(["Other"]) == []
+
+    def test_update_wikilinks_opens_only_referencing_files(self, tmp_path, monkeypatch):
+        vault = tmp_path / "vault"
+        index_path = tmp_path / "index.sqlite"
+        write(vault / "Linker.md", "Points to [[Old Title]].\n")
+        write(vault / "Bystander.md", "Nothing here.\n")
+        write(vault / ".archive" / "Archived.md", "Old [[Old Title]].\n")
+
+        opened: list[str] = []
+        original_read_text = Path.read_text
+
+        def spy_read_text(self, *args, **kwargs):
+            opened.append(self.name)
+            return original_read_text(self, *args, **kwargs)
+
+        with VaultIndex(vault, index_path) as index:
+            index.refresh()
+        monkeypatch.setattr(Path, "read_text", spy_read_text)
+        modified = update_wikilinks(vault, {"Old Title": "New Title"}, index_path=index_path)
+
+        assert modified == 1
+        assert opened == ["Linker.md"]
+        assert "[[New Title]]" in (vault / "Linker.md").read_text(encoding="utf-8")
+        assert "[[Old Title]]" in (vault / ".archive" / "Archived.md").read_text(encoding="utf-8")
+
+
+class TestParallelLoading:
+    def make_paths(self, root: Path) -> list[Path]:
+        paths = [
+            write(root / f"Note {i:02d}.md", NOTE.replace("Body", f"Body {i}"))
+            for i in range(12)
+        ]
+        paths.append(root / "Missing.md")
+        return paths
+
+    def test_thread_pool_matches_serial_order(self, tmp_path):
+        paths = self.make_paths(tmp_path)
+        serial = load_parsed_notes(paths)
+        assert serial[-1] is None
+        assert load_parsed_notes(paths, workers=4) == serial
+
+    def test_process_pool_matches_serial_order(self, tmp_path):
+        paths = self.make_paths(tmp_path)
+        assert load_parsed_notes(paths, workers=2, use_processes=True) == load_parsed_notes(paths)
+
+    def test_parallel_refresh_is_deterministic(self, tmp_path):
+        vault = tmp_path / "vault"
+        self.make_paths(vault)
+        serial = load_indexed_notes(vault, index_path=tmp_path / "serial.sqlite")
+        parallel = load_indexed_notes(vault, index_path=tmp_path / "parallel.sqlite", workers=4)
+        assert parallel == serial
+
+
+class TestIndexedScanners:
+    def test_scanners_read_from_index(self, tmp_path):
+        vault = tmp_path / "vault"
+        index_path = tmp_path / "index.sqlite"
+        write(vault / "Notes" / "First.md", NOTE)
+        write(vault / "MOCs" / "Doc — MOC.md", NOTE.replace("atomic", "moc"))
+
+        dedup_notes = deep_scan_vault(vault, index_path=index_path)
+        assert [note.title for note in dedup_notes] == ["First"]
+        assert dedup_notes[0].source_doc == "Doc.docx"
+
+        audit_notes = iter_notes(vault, index_path=index_path)
+        assert {note.title for note in audit_notes} == {"First", "Doc — MOC"}
+        assert next(n for n in audit_notes if n.title == "First").links == {"Other Note", "Third"}
+
+        registry = rebuild_registry(vault, index_path=index_path)
+        assert registry["Doc.docx"]["note_titles"] == ["Doc — MOC", "First"]
+        assert registry["Doc.docx"]["date"] == "2026-03-01"